@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Report the memory held by parsed schedules, in bytes per ScheduleEntry.
+
+Fetches (or replays from the cache) every schedule page of a semester,
+parses them, and measures with tracemalloc how much memory the resulting
+GroupSchedule/ScheduleEntry objects retain. For comparison, the same data
+is rebuilt with plain (dict-backed, un-interned) dataclasses, which is how
+the models were stored before they became slotted and interned, and parsed
+into columnar SpecTables, which is how generate_all holds and pickles them.
+
+Usage:
+    python scripts/bench_memory.py 2025-2 --offline --cache-dir ~/.cache/fmi-cal
+    python scripts/bench_memory.py --pages tests/fixtures/IE2.html
+"""
+
+import argparse
+import gc
+import pickle
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+# Add src to path so we can import fmi_cal
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fmi_cal.http_client import DEFAULT_CACHE_DIR, HttpClient
+from fmi_cal.models import EventType, Frequency, GroupSchedule
+from fmi_cal.scraper import (
+    DEFAULT_PARSER,
+    PARSERS,
+    fetch_specializations,
+    get_schedule_base_url,
+    parse_group_schedules,
+    parse_spec_table,
+    schedule_page_url,
+)
+
+
+@dataclass
+class PlainScheduleEntry:
+    """ScheduleEntry as it was stored before: a regular dataclass."""
+    day: str
+    start_hour: int
+    end_hour: int
+    frequency: Frequency
+    room: str
+    formation: str
+    event_type: EventType
+    subject: str
+    professor: str
+
+
+@dataclass
+class PlainGroupSchedule:
+    group: str
+    entries: list[PlainScheduleEntry]
+
+
+def _copy_str(s: str) -> str:
+    """Return an equal string that is a separate object (undoes interning)."""
+    return s.encode("utf-8").decode("utf-8")
+
+
+def to_plain(schedules: list[GroupSchedule]) -> list[PlainGroupSchedule]:
+    return [
+        PlainGroupSchedule(
+            group=_copy_str(gs.group),
+            entries=[
+                PlainScheduleEntry(
+                    day=_copy_str(e.day),
+                    start_hour=e.start_hour,
+                    end_hour=e.end_hour,
+                    frequency=e.frequency,
+                    room=_copy_str(e.room),
+                    formation=_copy_str(e.formation),
+                    event_type=e.event_type,
+                    subject=_copy_str(e.subject),
+                    professor=_copy_str(e.professor),
+                )
+                for e in gs.entries
+            ],
+        )
+        for gs in schedules
+    ]
+
+
+def retained_bytes(build):
+    """Call build() and return (result, bytes it still holds once built)."""
+    gc.collect()
+    before, _ = tracemalloc.get_traced_memory()
+    result = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    return result, after - before
+
+
+def fetch_pages(args) -> list[bytes]:
+    if args.pages:
+        return [path.read_bytes() for path in args.pages]
+
+    cache_dir = args.cache_dir
+    if args.offline and cache_dir is None:
+        cache_dir = DEFAULT_CACHE_DIR
+    with HttpClient(cache_dir=cache_dir, offline=args.offline) as client:
+        if args.semester:
+            year, sem = args.semester.split("-")
+            base_url = get_schedule_base_url(int(year), int(sem), client)
+        else:
+            base_url = get_schedule_base_url(client=client)
+        codes = list(dict.fromkeys(s.code for s in fetch_specializations(base_url, client)))
+        print(f"Fetching {len(codes)} schedule pages from {base_url}")
+        return [client.fetch(schedule_page_url(base_url, code)) for code in codes]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "semester",
+        nargs="?",
+        help="Semester override (e.g. 2025-2). Default: auto-detect.",
+    )
+    parser.add_argument("--cache-dir", type=Path, help="HTTP cache directory")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help=f"Replay pages from the cache only (default cache dir: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--pages",
+        type=Path,
+        nargs="+",
+        help="Measure these saved schedule pages instead of fetching a semester",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+        help=f"Schedule page parser backend (default: {DEFAULT_PARSER})",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    pages = fetch_pages(args)
+    # Warm up so lazy imports and module-level caches are not counted
+    to_plain(parse_group_schedules(pages[0], args.parser))
+
+    tracemalloc.start()
+    compact, compact_bytes = retained_bytes(
+        lambda: [parse_group_schedules(page, args.parser) for page in pages]
+    )
+    # The tables' vocabularies are the strings interned above, so this
+    # counts the columns only
+    tables, table_bytes = retained_bytes(
+        lambda: [parse_spec_table(page, args.parser) for page in pages]
+    )
+    plain, plain_bytes = retained_bytes(lambda: [to_plain(spec) for spec in compact])
+    tracemalloc.stop()
+
+    n_groups = sum(len(spec) for spec in compact)
+    n_entries = sum(len(gs.entries) for spec in compact for gs in spec)
+    if not n_entries:
+        sys.exit("No schedule entries parsed")
+    assert n_entries == sum(len(gs.entries) for spec in plain for gs in spec)
+    assert n_entries == sum(len(table) for table in tables)
+
+    print(f"{len(pages)} pages, {n_groups} groups, {n_entries} entries")
+    print(f"{'':<26}{'total':>12}{'per entry':>12}")
+    for label, total in (
+        ("plain dataclasses", plain_bytes),
+        ("slotted + interned", compact_bytes),
+        ("columnar SpecTable*", table_bytes),
+    ):
+        print(f"{label:<26}{total / 1024:>10.1f}KB{total / n_entries:>11.0f}B")
+    print("* not counting the interned strings it shares with the row above")
+    print(f"Saved {100 * (1 - compact_bytes / plain_bytes):.0f}%")
+    # What --jobs sends to each worker process with a spec
+    pickled_compact = sum(len(pickle.dumps(spec)) for spec in compact)
+    pickled_tables = sum(len(pickle.dumps(table)) for table in tables)
+    print(f"Pickled: {pickled_compact / 1024:.1f}KB slotted, "
+          f"{pickled_tables / 1024:.1f}KB columnar")
+
+
+if __name__ == "__main__":
+    main()
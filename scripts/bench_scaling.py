@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Measure how a full build scales with the size of the faculty.
+
+For each scale, generates a synthetic faculty (see synth_faculty.py) into
+a fresh HTTP cache, runs generate_all.py on it offline in a subprocess,
+and reads the build report it writes. Prints time and peak memory against
+input size, with the growth exponent between consecutive sizes (1.0 means
+linear):
+
+    python scripts/bench_scaling.py
+    python scripts/bench_scaling.py --scales 1 2 5 10 --jobs 4 --json scaling.json
+
+At the default 1x/10x/100x, the 100x build writes about 10 GB of .ics
+files (much less with --compact); each scale's site/ is deleted once
+measured unless --keep is given.
+"""
+
+import argparse
+import json
+import math
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Add src to path so we can import fmi_cal
+sys.path.insert(0, str(SCRIPTS_DIR.parent / "src"))
+
+from fmi_cal.scraper import DEFAULT_PARSER, PARSERS
+from synth_faculty import FacultyShape, build_faculty, seed_cache
+
+
+def run_scale(
+    scale: int, year: int, semester: int, work_dir: Path, args: argparse.Namespace
+) -> dict:
+    """Build one synthetic faculty end to end and return its measurements."""
+    run_dir = work_dir / f"scale-{scale}"
+    cache_dir = run_dir / "cache"
+    run_dir.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    pages = build_faculty(year, semester, FacultyShape(scale=scale), args.seed)
+    seed_cache(pages, cache_dir)
+    synth_seconds = time.perf_counter() - t0
+    del pages
+
+    command = [
+        sys.executable, str(SCRIPTS_DIR / "generate_all.py"), f"{year}-{semester}",
+        "--offline", "--cache-dir", str(cache_dir), "--force",
+        "--jobs", str(args.jobs), "--parser", args.parser,
+        "--report", str(run_dir / "build-report.json"),
+    ]
+    if args.compact:
+        command.append("--compact")
+    t0 = time.perf_counter()
+    subprocess.run(command, cwd=run_dir, check=True, stdout=subprocess.DEVNULL)
+    wall = time.perf_counter() - t0
+
+    report = json.loads((run_dir / "build-report.json").read_text(encoding="utf-8"))
+    if not args.keep:
+        shutil.rmtree(run_dir / "site")
+    totals = report["totals"]
+    return {
+        "scale": scale,
+        "specs": totals["specs"],
+        "entries": totals["entries"],
+        "events": totals["events"],
+        "files": totals["files"],
+        "output_bytes": totals["output_bytes"],
+        "synth_s": synth_seconds,
+        "wall_s": wall,
+        "fetch_s": report["phases"]["fetch"],
+        "generate_s": report["phases"]["generate"],
+        "peak_rss_bytes": report["peak_rss_bytes"],
+    }
+
+
+def growth(rows: list[dict], key: str) -> list[float | None]:
+    """Exponent k in key ~ entries**k between each row and the one before."""
+    exponents: list[float | None] = [None]
+    for prev, row in zip(rows, rows[1:]):
+        if prev[key] and row[key] and row["entries"] != prev["entries"]:
+            exponents.append(
+                math.log(row[key] / prev[key]) / math.log(row["entries"] / prev["entries"])
+            )
+        else:
+            exponents.append(None)
+    return exponents
+
+
+def print_curves(rows: list[dict]) -> None:
+    def fmt(k: float | None) -> str:
+        return f"{k:.2f}" if k is not None else "-"
+
+    print(
+        f"\n{'scale':>6}{'specs':>8}{'entries':>10}{'files':>9}{'output':>10}"
+        f"{'wall':>9}{'fetch':>9}{'generate':>10}{'us/event':>10}{'peak RSS':>10}"
+        f"{'time k':>8}{'RSS k':>7}"
+    )
+    for row, time_k, rss_k in zip(rows, growth(rows, "wall_s"), growth(rows, "peak_rss_bytes")):
+        rss = row["peak_rss_bytes"]
+        print(
+            f"{row['scale']:>5}x{row['specs']:>8}{row['entries']:>10}{row['files']:>9}"
+            f"{row['output_bytes'] / 1e6:>8.0f}MB"
+            f"{row['wall_s']:>8.1f}s{row['fetch_s']:>8.1f}s{row['generate_s']:>9.1f}s"
+            f"{1e6 * row['generate_s'] / max(row['events'], 1):>10.2f}"
+            f"{(rss / 2**20 if rss else 0):>8.0f}MB"
+            f"{fmt(time_k):>8}{fmt(rss_k):>7}"
+        )
+    print("\ntime k / RSS k: growth exponent vs the previous scale (1.00 = linear in entries)")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time generate_all.py on synthetic faculties of growing size",
+    )
+    parser.add_argument(
+        "--semester", default="2025-2", help="Semester of the synthetic pages (default: 2025-2)"
+    )
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[1, 10, 100],
+        help="Faculty sizes, as multiples of the real one (default: 1 10 100)",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="generate_all.py --jobs")
+    parser.add_argument(
+        "--parser", choices=PARSERS, default=DEFAULT_PARSER, help="generate_all.py --parser"
+    )
+    parser.add_argument("--compact", action="store_true", help="generate_all.py --compact")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--work-dir", type=Path, help="Keep caches and reports here (default: a temporary directory)"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep each scale's site/ output")
+    parser.add_argument("--json", type=Path, help="Also write the measurements as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    year, semester = (int(part) for part in args.semester.split("-"))
+    with tempfile.TemporaryDirectory(prefix="fmi-cal-scaling-") as tmp:
+        work_dir = args.work_dir or Path(tmp)
+        rows = []
+        for scale in sorted(args.scales):
+            print(f"Building {scale}x faculty in {work_dir / f'scale-{scale}'}...")
+            rows.append(run_scale(scale, year, semester, work_dir, args))
+    print_curves(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=1), encoding="utf-8")
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,201 @@
 #!/usr/bin/env python3
 """Generate .ics files and JSON data for every specialization/group/subgroup."""
 
+import argparse
+import asyncio
+import cProfile
+import hashlib
 import json
+import os
 import sys
 import time
 from collections import OrderedDict
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import date
 from pathlib import Path
 
 # Add src to path so we can import fmi_cal
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from fmi_cal.academic import fetch_academic_calendar, get_dates_for_entry, get_study_line
-from fmi_cal.calendar_gen import filter_entries_for_student, generate_ics
-from fmi_cal.models import AcademicCalendar, GroupSchedule, Specialization
-from fmi_cal.scraper import fetch_group_schedules, fetch_room_legend, fetch_specializations, get_schedule_base_url
+SRC_DIR = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from fmi_cal import profiling
+from fmi_cal.academic import (
+    AcademicCalendarRepository,
+    TeachingCalendarIndex,
+    build_teaching_index,
+    get_study_line,
+)
+from fmi_cal.calendar_gen import iter_ics, write_ics
+from fmi_cal.ics import EventBlockCache, format_dtstamp, source_dtstamp
+from fmi_cal.http_client import DEFAULT_CACHE_DIR, AsyncFetcher, HttpClient, async_fetcher
+from fmi_cal.models import AcademicCalendar, ScheduleEntry, Specialization
+from fmi_cal.profiling import span
+from fmi_cal.report import (
+    DEFAULT_MAX_REGRESSION,
+    DEFAULT_REPORT,
+    BuildReport,
+    check_regression,
+    parse_regression,
+)
+from fmi_cal.scraper import (
+    DEFAULT_PARSER,
+    PARSERS,
+    fetch_room_legend_async,
+    fetch_specializations,
+    get_schedule_base_url,
+    parse_spec_table,
+    schedule_page_url,
+)
+from fmi_cal.table import SpecTable
+
+# Default number of requests in flight during phase 1
+FETCH_CONCURRENCY = 16
+
+# Maps each spec code to a hash of its inputs and the files built from them
+MANIFEST_NAME = ".build-manifest.json"
 
 
 @dataclass
 class SpecFetchResult:
     """Result of fetching data for one specialization."""
     spec: Specialization
-    schedules: list[GroupSchedule]
+    table: SpecTable        # every group's entries, column by column
     acad_cal: AcademicCalendar | None
+    html_hash: str | None = None
+    last_modified: str | None = None    # Last-Modified of the schedule page
     error: str | None = None
+    # Measurements for the build report
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    html_bytes: int = 0
 
 
-def fetch_spec_data(
+async def fetch_spec_data(
     spec: Specialization,
     base_url: str,
     semester_num: int,
-    acad_cache: dict[str, AcademicCalendar],
+    calendars_loaded: "asyncio.Future[dict]",
+    repository: AcademicCalendarRepository,
+    client: AsyncFetcher,
+    parser: str = DEFAULT_PARSER,
+    track: int | None = None,
 ) -> SpecFetchResult:
-    """Fetch schedules + academic calendar for one spec. Thread-safe."""
-    try:
-        schedules = fetch_group_schedules(base_url, spec.code)
+    """Fetch + parse one spec's schedule page and look up its academic calendar.
 
+    track is the profiling row of this spec's spans (see fmi_cal.profiling).
+    """
+    try:
+        t_http = time.perf_counter()
+        with span("http", track, spec=spec.code):
+            page = await client.fetch_response(schedule_page_url(base_url, spec.code))
+        html = page.body
+        t_parse = time.perf_counter()
+        with span("parse", track, spec=spec.code, parser=parser):
+            table, parse_seconds = await asyncio.to_thread(
+                _timed_parse, html, parser
+            )
+        await calendars_loaded
         study_line = get_study_line(spec.code, spec.name)
-        cache_key = f"{study_line}-{semester_num}"
-        if cache_key not in acad_cache:
-            acad_cache[cache_key] = fetch_academic_calendar(study_line, semester_num)
-        acad_cal = acad_cache[cache_key]
-
-        return SpecFetchResult(spec=spec, schedules=schedules, acad_cal=acad_cal)
+        acad_cal = repository.get(study_line, semester_num)
+        result = SpecFetchResult(
+            spec=spec,
+            table=table,
+            acad_cal=acad_cal,
+            html_hash=sha256_hex(html),
+            last_modified=page.last_modified,
+            fetch_seconds=t_parse - t_http,
+            parse_seconds=parse_seconds,
+            html_bytes=len(html),
+        )
+        print(f"  Fetched {spec.code}")
     except Exception as e:
-        return SpecFetchResult(spec=spec, schedules=[], acad_cal=None, error=str(e))
+        result = SpecFetchResult(spec=spec, table=SpecTable(), acad_cal=None, error=str(e))
+        print(f"  ERROR {spec.code}: {e}")
+    return result
+
+
+def _timed_parse(html: bytes, parser: str) -> tuple[SpecTable, float]:
+    """parse_spec_table and the CPU time it took.
+
+    Thread CPU time, since parses on concurrent threads wait for the GIL.
+    """
+    start = time.thread_time()
+    table = parse_spec_table(html, parser)
+    return table, time.thread_time() - start
+
+
+async def fetch_all_data(
+    unique_specs: list[Specialization],
+    base_url: str,
+    semester_num: int,
+    repository: AcademicCalendarRepository,
+    client: AsyncFetcher,
+    parser: str = DEFAULT_PARSER,
+) -> tuple[dict[str, str] | Exception, list[SpecFetchResult]]:
+    """Phase 1: fetch the room legend, academic calendars and every spec concurrently.
+
+    The academic calendar page is fetched and parsed once, in the
+    background, and every spec waits for it before looking up its study
+    line's calendar.
+    """
+    calendars_loaded = asyncio.ensure_future(asyncio.to_thread(repository.load))
+    spec_tasks = [
+        fetch_spec_data(
+            spec, base_url, semester_num, calendars_loaded, repository, client, parser, track
+        )
+        for track, spec in enumerate(unique_specs, start=1)
+    ]
+
+    room_legend, *results = await asyncio.gather(
+        fetch_room_legend_async(base_url, client),
+        *spec_tasks,
+        return_exceptions=True,
+    )
+    return room_legend, results
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def generator_fingerprint() -> str:
+    """Hash of the generator sources, so code changes invalidate the manifest."""
+    h = hashlib.sha256()
+    for path in sorted((SRC_DIR / "fmi_cal").glob("*.py")) + [Path(__file__)]:
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def spec_input_key(
+    result: SpecFetchResult,
+    rooms_hash: str,
+    generator_hash: str,
+    output_mode: str = "events",
+) -> str:
+    """Hash of everything a spec's outputs are derived from."""
+    spec = result.spec
+    parts = [
+        generator_hash,
+        output_mode,
+        rooms_hash,
+        result.html_hash or "",
+        result.last_modified or "",     # sets DTSTAMP
+        sha256_hex(repr(result.acad_cal).encode("utf-8")),
+        spec.name,
+        str(spec.year),
+    ]
+    return sha256_hex("\0".join(parts).encode("utf-8"))
+
+
+def load_manifest(path: Path) -> dict[str, dict]:
+    """Return the per-spec manifest entries of the previous run, if any."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("specs", {}) if isinstance(data, dict) else {}
 
 
 def sanitize_dirname(name: str) -> str:
@@ -53,9 +203,26 @@ def sanitize_dirname(name: str) -> str:
     return name.replace("/", "-").replace("\\", "-")
 
 
-def entry_to_json(entry, acad_cal: AcademicCalendar) -> dict:
+def write_calendar(
+    path: Path,
+    entries: list[ScheduleEntry],
+    teaching_index: TeachingCalendarIndex,
+    cache: EventBlockCache,
+) -> None:
+    """Stream one .ics file straight to disk, reusing cached event blocks."""
+    if profiling.enabled():
+        # Serialize in memory first so the trace can tell it from the write
+        with span("serialize", entries=len(entries)):
+            data = b"".join(iter_ics(entries, teaching_index, cache=cache))
+        with span("write", bytes=len(data)):
+            path.write_bytes(data)
+        return
+    with path.open("wb") as f:
+        write_ics(f, entries, teaching_index, cache=cache)
+
+
+def entry_to_json(entry, dates: list[str]) -> dict:
     """Convert a ScheduleEntry to a JSON-serializable dict with pre-computed dates."""
-    dates = get_dates_for_entry(entry, acad_cal)
     return {
         "day": entry.day,
         "startHour": entry.start_hour,
@@ -66,28 +233,331 @@ def entry_to_json(entry, acad_cal: AcademicCalendar) -> dict:
         "type": entry.event_type.value,
         "subject": entry.subject,
         "professor": entry.professor,
-        "dates": [d.isoformat() for d in dates],
+        "dates": dates,
     }
 
 
-def build_spec_json(
-    schedules: list[GroupSchedule], acad_cal: AcademicCalendar
-) -> list[dict]:
+def build_spec_json(table: SpecTable, teaching_index: TeachingCalendarIndex) -> list[dict]:
     """Build JSON group data for a specialization."""
+    # Entries sharing a (day, frequency) pair share one dates tuple, so each
+    # distinct tuple is formatted only once.
+    iso_dates: dict[tuple[date, ...], list[str]] = {}
+    with span("dates"):
+        all_dates = table.dates_for_rows(range(len(table)), teaching_index)
     groups = []
-    for gs in schedules:
-        has_subgroups = "/" not in gs.group
-        entries_json = [entry_to_json(e, acad_cal) for e in gs.entries]
+    for group_id, group in enumerate(table.groups):
+        rows = table.group_rows(group_id)
+        entries_json = []
+        for row in rows:
+            dates = all_dates[row]
+            if dates not in iso_dates:
+                iso_dates[dates] = [d.isoformat() for d in dates]
+            entries_json.append(entry_to_json(table.entry(row), iso_dates[dates]))
         groups.append({
-            "name": gs.group,
-            "hasSubgroups": has_subgroups,
+            "name": group,
+            "hasSubgroups": "/" not in group,
             "entries": entries_json,
         })
     return groups
 
 
+@dataclass
+class SpecBuildJob:
+    """Picklable work item for generating one spec in a worker process."""
+    result: SpecFetchResult
+    output_dir: Path
+    data_dir: Path
+    room_legend: dict[str, str]
+    compact: bool = False
+    profile: bool = False       # record trace spans (see fmi_cal.profiling)
+    cprofile: bool = False      # run under cProfile; only set for worker processes
+
+
+@dataclass
+class SpecBuildResult:
+    """Outcome of generating one spec: files written and log lines to print."""
+    code: str
+    outputs: list[Path]
+    log: list[str]
+    error: str | None = None
+    block_hits: int = 0
+    block_misses: int = 0
+    # Measurements for the build report
+    seconds: float = 0.0
+    cpu_seconds: float = 0.0    # thread CPU time, which the throughput gate uses
+    events: int = 0
+    output_bytes: int = 0
+    trace_events: list[dict] = field(default_factory=list)
+    cprofile_stats: dict | None = None
+
+
+def generate_spec(job: SpecBuildJob) -> SpecBuildResult:
+    """Write every .ics file and the JSON data for one spec.
+
+    In a worker process, trace spans and cProfile statistics are recorded
+    here and returned with the result for the parent to merge.
+    """
+    tracer = None
+    if job.profile and not profiling.enabled():
+        tracer = profiling.enable(f"worker {os.getpid()}")
+    profiler = cProfile.Profile() if job.cprofile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        with span("spec", spec=job.result.spec.code):
+            build = _generate_spec(job)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if tracer is not None:
+            profiling.disable()
+    if tracer is not None:
+        build.trace_events = tracer.events
+    if profiler is not None:
+        profiler.create_stats()
+        build.cprofile_stats = profiler.stats
+    return build
+
+
+def write_group_calendars(
+    table: SpecTable,
+    group_id: int,
+    spec_dir: Path,
+    teaching_index: TeachingCalendarIndex,
+    cache: EventBlockCache,
+    written: list[Path],
+) -> str:
+    """Write a group's .ics files (one per subgroup variant); return its log line."""
+    group = table.groups[group_id]
+    safe_group = group.replace("/", "-")
+
+    if "/" in group:
+        # Already a subgroup-level group (e.g. "243/1"): a single calendar
+        variants = [(None, f"{safe_group}.ics")]
+    else:
+        variants = [
+            ("1", f"{safe_group}-1.ics"),
+            ("2", f"{safe_group}-2.ics"),
+            (None, f"{safe_group}-all.ics"),
+        ]
+
+    counts = []
+    for subgroup, filename in variants:
+        with span("filter", subgroup=subgroup or "all"):
+            rows = table.student_rows(group_id, subgroup)
+        counts.append(len(rows))
+        if rows:
+            path = spec_dir / filename
+            with span("ics", file=filename):
+                write_calendar(path, table.entries(rows), teaching_index, cache)
+            written.append(path)
+
+    if len(variants) == 1:
+        return f"  Group {group}: {counts[0]} entries"
+    return f"  Group {group}: {counts[0]}+{counts[1]} entries"
+
+
+def _generate_spec(job: SpecBuildJob) -> SpecBuildResult:
+    result = job.result
+    spec = result.spec
+    table = result.table
+    acad_cal = result.acad_cal
+    output_dir, data_dir, room_legend = job.output_dir, job.data_dir, job.room_legend
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    written: list[Path] = []
+    log = [f"\n[{spec.code}] {spec.name} Year {spec.year}"]
+
+    # Any failure becomes this spec's error, so the other specs still build
+    try:
+        if acad_cal is None:
+            raise ValueError("No academic calendar")
+        teaching_index = build_teaching_index(acad_cal)
+        dtstamp = source_dtstamp(teaching_index, result.last_modified)
+        # Year-wide entries recur in every group; serialize each one once
+        cache = EventBlockCache(room_legend, dtstamp=dtstamp, compact=job.compact)
+
+        spec_dir = output_dir / sanitize_dirname(spec.name) / f"Year {spec.year}"
+        spec_dir.mkdir(parents=True, exist_ok=True)
+
+        # --- Generate .ics files ---
+        for group_id, group in enumerate(table.groups):
+            with span("group", group=group):
+                log.append(write_group_calendars(
+                    table, group_id, spec_dir, teaching_index, cache, written
+                ))
+
+        # --- Generate JSON data ---
+        with span("json"):
+            spec_json = {
+                "code": spec.code,
+                "name": spec.name,
+                "year": spec.year,
+                # DTSTAMP the worker puts on calendars built from this data
+                "dtstamp": format_dtstamp(dtstamp),
+                "groups": build_spec_json(table, teaching_index),
+            }
+            with span("encode"):
+                text = json.dumps(spec_json, ensure_ascii=False)
+            json_path = data_dir / f"{spec.code}.json"
+            with span("write", bytes=len(text)):
+                json_path.write_text(text, encoding="utf-8")
+        written.append(json_path)
+        log.append(f"  Wrote {json_path}")
+    except Exception as e:
+        return SpecBuildResult(code=spec.code, outputs=written, log=log, error=str(e))
+
+    return SpecBuildResult(
+        code=spec.code,
+        outputs=written,
+        log=log,
+        block_hits=cache.hits,
+        block_misses=cache.misses,
+        seconds=time.perf_counter() - start,
+        cpu_seconds=time.thread_time() - cpu_start,
+        events=cache.events,
+        output_bytes=sum(path.stat().st_size for path in written),
+    )
+
+
+def run_builds(
+    jobs: list[SpecBuildJob], n_jobs: int, cprofile: bool = False
+) -> Iterator[SpecBuildResult]:
+    """Generate specs in order, across n_jobs worker processes when n_jobs > 1.
+
+    With cprofile, worker processes profile their jobs; in-process builds
+    are covered by the caller's profiler.
+    """
+    if n_jobs <= 1 or len(jobs) <= 1:
+        yield from map(generate_spec, jobs)
+        return
+    if cprofile:
+        jobs = [replace(job, cprofile=True) for job in jobs]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        # map() yields in submission order, so output stays deterministic
+        yield from executor.map(generate_spec, jobs)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate .ics files and JSON data for every specialization/group/subgroup",
+    )
+    parser.add_argument(
+        "semester",
+        nargs="?",
+        help="Semester override (e.g. 2025-2). Default: auto-detect.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help=f"Cache fetched pages on disk and revalidate them (e.g. {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Replay pages from the cache without touching the network "
+        f"(default cache dir: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=FETCH_CONCURRENCY,
+        help=f"Maximum concurrent HTTP requests while fetching (default: {FETCH_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+        help=f"Schedule page parser backend (default: {DEFAULT_PARSER}; lxml needs the 'fast' extra)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes for the generation phase (default: 1, 0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write one recurring event (RRULE + EXDATE) per entry and teaching "
+        "period instead of one event per occurrence",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=f"Rebuild every spec, ignoring site/{MANIFEST_NAME}",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="TRACE_JSON",
+        help="Write nested timing spans (HTTP, parse, filter, serialize, JSON, writes; "
+        "per spec and group) as a Chrome trace, for chrome://tracing, Perfetto or speedscope",
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=Path,
+        metavar="PSTATS",
+        help="Run under cProfile and write the statistics of the main thread and "
+        "the worker processes (not the fetch/parse threads)",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=DEFAULT_REPORT,
+        help="Write per-spec timings, sizes, cache hit rates and peak RSS as JSON "
+        f"(default: {DEFAULT_REPORT})",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs="+",
+        metavar="BASELINE",
+        help="Fail the build if throughput fell below that of these earlier reports "
+        "(the median of each rate)",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=parse_regression,
+        default=DEFAULT_MAX_REGRESSION,
+        help=f"Largest throughput drop --compare allows (default: {DEFAULT_MAX_REGRESSION})",
+    )
+    return parser.parse_args(argv)
+
+
 def main() -> None:
+    args = parse_args()
+    tracer = profiling.enable("generate_all") if args.profile else None
+    profiler = cProfile.Profile() if args.cprofile else None
+    worker_stats: list[dict] = []
+    if profiler is not None:
+        profiler.enable()
+    try:
+        build_site(args, worker_stats)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if tracer is not None:
+            tracer.write(args.profile)
+            print(f"Wrote {tracer.span_count()} spans to {args.profile}")
+        if profiler is not None:
+            profiler.create_stats()
+            profiling.merge_cprofile_stats([profiler.stats, *worker_stats], args.cprofile)
+            print(f"Wrote cProfile statistics to {args.cprofile}")
+
+
+def build_site(args: argparse.Namespace, worker_stats: list[dict]) -> None:
+    """Fetch everything and write the site; collects worker cProfile stats."""
     t_start = time.perf_counter()
+    report = BuildReport(config={
+        "parser": args.parser,
+        "concurrency": args.concurrency,
+        "jobs": args.jobs or os.cpu_count() or 1,
+        "compact": args.compact,
+        "offline": args.offline,
+        "force": args.force,
+    })
 
     output_dir = Path("site")
     output_dir.mkdir(exist_ok=True)
@@ -97,31 +567,27 @@ def main() -> None:
     # CNAME for GitHub Pages custom domain
     (output_dir / "CNAME").write_text("orar-fmi.rdobre.ro\n")
 
+    # One keep-alive pool shared by every fetch, sized to the fetch concurrency
+    cache_dir = args.cache_dir
+    if args.offline and cache_dir is None:
+        cache_dir = DEFAULT_CACHE_DIR
+    client = HttpClient(
+        pool_size=args.concurrency, cache_dir=cache_dir, offline=args.offline
+    )
+
     # Determine base URL
-    semester_arg = sys.argv[1] if len(sys.argv) > 1 else None
-    if semester_arg:
-        year, sem = semester_arg.split("-")
-        base_url = get_schedule_base_url(int(year), int(sem))
+    if args.semester:
+        year, sem = args.semester.split("-")
+        base_url = get_schedule_base_url(int(year), int(sem), client)
     else:
-        base_url = get_schedule_base_url()
+        base_url = get_schedule_base_url(client=client)
 
     semester_num = int(base_url.rstrip("/").split("/")[-2].split("-")[1])
     print(f"Base URL: {base_url}")
     print(f"Semester: {semester_num}")
 
-    # Fetch room legend (shared across all specs)
-    try:
-        room_legend = fetch_room_legend(base_url)
-        print(f"Room legend: {len(room_legend)} rooms")
-        rooms_path = data_dir / "rooms.json"
-        rooms_path.write_text(json.dumps(room_legend, ensure_ascii=False), encoding="utf-8")
-        print(f"Wrote {rooms_path}")
-    except Exception as e:
-        print(f"WARNING: Could not fetch room legend: {e}")
-        room_legend = {}
-
     # Fetch all specializations
-    specs = fetch_specializations(base_url)
+    specs = fetch_specializations(base_url, client)
     print(f"Found {len(specs)} specialization entries")
 
     total_files = 0
@@ -144,91 +610,138 @@ def main() -> None:
             seen_codes.add(spec.code)
             unique_specs.append(spec)
 
-    # --- Phase 1: Parallel fetch all spec data ---
+    # --- Phase 1: Concurrent fetch of all spec data on one event loop ---
     t_fetch = time.perf_counter()
-    acad_cache: dict[str, AcademicCalendar] = {}
-    results: list[SpecFetchResult] = []
-
-    print(f"\nFetching {len(unique_specs)} specializations in parallel...")
-
-    with ThreadPoolExecutor() as executor:
-        futures = {
-            executor.submit(fetch_spec_data, spec, base_url, semester_num, acad_cache): spec
-            for spec in unique_specs
-        }
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
-            if result.error:
-                print(f"  ERROR {result.spec.code}: {result.error}")
-            else:
-                print(f"  Fetched {result.spec.code}")
+
+    print(
+        f"\nFetching {len(unique_specs)} specializations "
+        f"(concurrency {args.concurrency}, parser {args.parser})..."
+    )
+
+    repository = AcademicCalendarRepository(client)
+
+    async def run_fetch():
+        async with async_fetcher(client, concurrency=args.concurrency) as fetcher:
+            return await fetch_all_data(
+                unique_specs, base_url, semester_num, repository, fetcher, args.parser
+            )
+
+    with span("phase 1: fetch"):
+        room_legend, results = asyncio.run(run_fetch())
+
+    # Room legend (shared across all specs)
+    if isinstance(room_legend, Exception):
+        print(f"WARNING: Could not fetch room legend: {room_legend}")
+        room_legend = {}
+    else:
+        print(f"Room legend: {len(room_legend)} rooms")
+        rooms_path = data_dir / "rooms.json"
+        rooms_path.write_text(json.dumps(room_legend, ensure_ascii=False), encoding="utf-8")
+        print(f"Wrote {rooms_path}")
 
     t_fetch_done = time.perf_counter()
     print(f"\nPhase 1 (fetch): {t_fetch_done - t_fetch:.1f}s")
 
-    # --- Phase 2: Sequential generation ---
+    # --- Phase 2: Generation (one worker process per job) ---
     t_gen = time.perf_counter()
 
+    manifest_path = output_dir / MANIFEST_NAME
+    previous = {} if args.force else load_manifest(manifest_path)
+    manifest: dict[str, dict] = {}
+    rooms_hash = sha256_hex(json.dumps(room_legend, sort_keys=True).encode("utf-8"))
+    generator_hash = generator_fingerprint()
+    output_mode = "compact" if args.compact else "events"
+    reused = 0
+    build_jobs: list[SpecBuildJob] = []
+    build_keys: dict[str, str] = {}
+
     for result in results:
+        code = result.spec.code
+        report.record_spec(
+            code,
+            fetch_s=result.fetch_seconds,
+            parse_s=result.parse_seconds,
+            bytes_fetched=result.html_bytes,
+            entries=len(result.table),
+        )
         if result.error:
-            errors.append(f"  ERROR fetching {result.spec.code}: {result.error}")
+            errors.append(f"  ERROR fetching {code}: {result.error}")
+            # Keep the last good outputs listed so the next run can reuse them
+            if code in previous:
+                manifest[code] = previous[code]
             continue
 
-        spec = result.spec
-        schedules = result.schedules
-        acad_cal = result.acad_cal
-        assert acad_cal is not None  # guaranteed when error is None
-
-        spec_dir = output_dir / sanitize_dirname(spec.name) / f"Year {spec.year}"
-        spec_dir.mkdir(parents=True, exist_ok=True)
-
-        print(f"\n[{spec.code}] {spec.name} Year {spec.year}")
+        key = spec_input_key(result, rooms_hash, generator_hash, output_mode)
+        prev = previous.get(code)
+        if (
+            prev is not None
+            and prev.get("key") == key
+            and all((output_dir / rel).exists() for rel in prev.get("outputs", []))
+        ):
+            manifest[code] = prev
+            total_files += sum(1 for rel in prev["outputs"] if rel.endswith(".ics"))
+            reused += 1
+            continue
 
-        # --- Generate .ics files ---
-        for group_sched in schedules:
-            group = group_sched.group
-            safe_group = group.replace("/", "-")
-            has_subgroups = "/" not in group
-
-            if has_subgroups:
-                entries_1 = filter_entries_for_student(group_sched, group, "1")
-                if entries_1:
-                    ics = generate_ics(entries_1, acad_cal, room_legend)
-                    (spec_dir / f"{safe_group}-1.ics").write_bytes(ics)
-                    total_files += 1
-
-                entries_2 = filter_entries_for_student(group_sched, group, "2")
-                if entries_2:
-                    ics = generate_ics(entries_2, acad_cal, room_legend)
-                    (spec_dir / f"{safe_group}-2.ics").write_bytes(ics)
-                    total_files += 1
-
-                entries_all = filter_entries_for_student(group_sched, group, None)
-                if entries_all:
-                    ics = generate_ics(entries_all, acad_cal, room_legend)
-                    (spec_dir / f"{safe_group}-all.ics").write_bytes(ics)
-                    total_files += 1
-
-                print(f"  Group {group}: {len(entries_1)}+{len(entries_2)} entries")
-            else:
-                entries = filter_entries_for_student(group_sched, group, None)
-                if entries:
-                    ics = generate_ics(entries, acad_cal, room_legend)
-                    (spec_dir / f"{safe_group}.ics").write_bytes(ics)
-                    total_files += 1
-                print(f"  Group {group}: {len(entries)} entries")
+        build_keys[code] = key
+        build_jobs.append(
+            SpecBuildJob(
+                result, output_dir, data_dir, room_legend, args.compact,
+                profile=args.profile is not None,
+            )
+        )
+
+    n_jobs = args.jobs or os.cpu_count() or 1
+    if n_jobs > 1:
+        print(f"\nGenerating {len(build_jobs)} specializations with {n_jobs} processes...")
+
+    rebuilt = 0
+    block_hits = block_misses = 0
+    for build in run_builds(build_jobs, n_jobs, cprofile=args.cprofile is not None):
+        for line in build.log:
+            print(line)
+        code = build.code
+        prev = previous.get(code)
+        if build.error:
+            errors.append(f"  ERROR generating {code}: {build.error}")
+            if prev is not None:
+                manifest[code] = prev
+            continue
 
-        # --- Generate JSON data ---
-        spec_json = {
-            "code": spec.code,
-            "name": spec.name,
-            "year": spec.year,
-            "groups": build_spec_json(schedules, acad_cal),
-        }
-        json_path = data_dir / f"{spec.code}.json"
-        json_path.write_text(json.dumps(spec_json, ensure_ascii=False), encoding="utf-8")
-        print(f"  Wrote {json_path}")
+        rel_outputs = [p.relative_to(output_dir).as_posix() for p in build.outputs]
+        total_files += sum(1 for p in build.outputs if p.suffix == ".ics")
+        rebuilt += 1
+        report.record_spec(
+            code,
+            generate_s=build.seconds,
+            generate_cpu_s=build.cpu_seconds,
+            events=build.events,
+            output_bytes=build.output_bytes,
+            files=len(build.outputs),
+        )
+        block_hits += build.block_hits
+        block_misses += build.block_misses
+        if build.trace_events:
+            profiling.current().extend(build.trace_events)
+        if build.cprofile_stats:
+            worker_stats.append(build.cprofile_stats)
+
+        # Remove files the previous build of this spec produced but this one did not
+        if prev is not None:
+            for rel in set(prev.get("outputs", [])) - set(rel_outputs):
+                (output_dir / rel).unlink(missing_ok=True)
+
+        manifest[code] = {"key": build_keys[code], "outputs": rel_outputs}
+
+    manifest_path.write_text(
+        json.dumps({"specs": manifest}, indent=1, sort_keys=True), encoding="utf-8"
+    )
+    print(f"\nRebuilt {rebuilt} specs, reused {reused} unchanged specs")
+    if block_hits or block_misses:
+        print(
+            f"Event blocks: {block_misses} serialized, {block_hits} reused "
+            f"({100 * block_hits / (block_hits + block_misses):.0f}% hit rate)"
+        )
 
     # Write index.json
     index_data = {
@@ -247,11 +760,30 @@ def main() -> None:
     print(f"\nPhase 2 (generate): {t_gen_done - t_gen:.1f}s")
     print(f"Total: {t_total:.1f}s")
     print(f"Done. Generated {total_files} .ics files + JSON data.")
+
+    report.phases = {"fetch": t_fetch_done - t_fetch, "generate": t_gen_done - t_gen}
+    report.cache = {
+        "http_hit_rate": client.stats.hit_rate(),
+        "event_block_hit_rate": (
+            block_hits / (block_hits + block_misses) if block_hits or block_misses else None
+        ),
+        "manifest_reuse_rate": reused / (reused + rebuilt) if reused or rebuilt else None,
+        "http_requests": client.stats.requests,
+        "http_bytes_received": client.stats.bytes_received,
+    }
+    report_data = report.write(args.report)
+    print(f"Wrote {args.report}")
+    regressed = args.compare is not None and not check_regression(
+        report_data, args.compare, args.max_regression
+    )
+
     if errors:
         print(f"\n{len(errors)} errors:")
         for e in errors:
             print(e)
         sys.exit(1)
+    if regressed:
+        sys.exit(f"Throughput regressed by more than {args.max_regression:.0%}")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Generate a static index.html with a custom calendar builder + quick download tree."""
 
+import argparse
 import html
 import json
 import re
 import shutil
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import quote
@@ -15,7 +17,9 @@ from jinja2 import Environment, FileSystemLoader
 # Add src to path so we can import fmi_cal
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from fmi_cal.academic import compute_teaching_weeks, fetch_academic_calendar
+from fmi_cal.academic import AcademicCalendarRepository, compute_teaching_weeks
+from fmi_cal.http_client import DEFAULT_CACHE_DIR, HttpClient
+from fmi_cal.report import DEFAULT_REPORT, peak_rss_bytes, update_report
 
 
 def natural_sort_key(s: str):
@@ -98,14 +102,18 @@ def build_download_tree(site_dir: Path) -> tuple[str, int]:
     return chr(10).join(parts_html), total_files
 
 
-def generate_index(site_dir: Path) -> str:
+def generate_index(
+    site_dir: Path,
+    client: HttpClient | None = None,
+    repository: AcademicCalendarRepository | None = None,
+) -> str:
     """Generate the full HTML page using Jinja2 templates."""
     download_tree, total_files = build_download_tree(site_dir)
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
 
     # Fetch academic calendar data for teaching weeks / holidays
     try:
-        calendar = fetch_academic_calendar()
+        calendar = (repository or AcademicCalendarRepository(client)).get()
         weeks = compute_teaching_weeks(calendar)
         teaching_weeks_json = json.dumps(
             [{"monday": str(monday), "week": week_num} for monday, week_num in weeks]
@@ -131,7 +139,38 @@ def generate_index(site_dir: Path) -> str:
     )
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate site/index.html from the generated site/ tree",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help=f"Cache fetched pages on disk and revalidate them (e.g. {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Replay pages from the cache without touching the network "
+        f"(default cache dir: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=DEFAULT_REPORT,
+        help=f"Add this script's timings to generate_all.py's build report (default: {DEFAULT_REPORT})",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
+    start = time.perf_counter()
+    cache_dir = args.cache_dir
+    if args.offline and cache_dir is None:
+        cache_dir = DEFAULT_CACHE_DIR
+    client = HttpClient(cache_dir=cache_dir, offline=args.offline)
+
     site_dir = Path("site")
     if not site_dir.exists():
         print("Error: site/ directory not found. Run generate_all.py first.")
@@ -139,8 +178,9 @@ def main() -> None:
 
     templates_dir = Path(__file__).resolve().parent.parent / "templates"
 
-    index_html = generate_index(site_dir)
-    (site_dir / "index.html").write_text(index_html, encoding="utf-8")
+    index_html = generate_index(site_dir, client)
+    index_bytes = index_html.encode("utf-8")
+    (site_dir / "index.html").write_bytes(index_bytes)
     print("Generated site/index.html")
 
     # Copy PWA files
@@ -162,6 +202,15 @@ def main() -> None:
             svg.unlink()
         print("Copied icons/")
 
+    update_report(args.report, "index", {
+        "seconds": time.perf_counter() - start,
+        "output_bytes": len(index_bytes),
+        "http_requests": client.stats.requests,
+        "http_hit_rate": client.stats.hit_rate(),
+        "peak_rss_bytes": peak_rss_bytes(),
+    })
+    print(f"Updated {args.report}")
+
 
 if __name__ == "__main__":
     main()
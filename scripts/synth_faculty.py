@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""Generate a synthetic faculty for scale testing.
+
+Renders the pages generate_all.py reads, in the same markup as
+cs.ubbcluj.ro and ubbcluj.ro: the tabelar index, one schedule page per
+specialization, the room legend and the academic calendar page. They are
+stored in an HTTP cache under their real URLs, so a build can replay
+them offline:
+
+    python scripts/synth_faculty.py 2025-2 --scale 10 --cache-dir /tmp/synth
+    python scripts/generate_all.py 2025-2 --offline --cache-dir /tmp/synth
+
+--output-dir writes the same pages as plain files instead.
+
+At --scale 1 the faculty is about the size of the real one (72 specs of
+7 groups with 20 entries each); the scale multiplies the number of study
+programs. Output is deterministic for a given shape and --seed.
+"""
+
+import argparse
+import random
+import sys
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add src to path so we can import fmi_cal
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fmi_cal.academic import ACADEMIC_CALENDAR_URL
+from fmi_cal.http_client import HttpCache
+from fmi_cal.scraper import SCHEDULE_ROOT, room_legend_url, schedule_page_url
+
+DAYS = ("Luni", "Marti", "Miercuri", "Joi", "Vineri")
+SLOTS = ((8, 10), (10, 12), (12, 14), (14, 16), (16, 18), (18, 20))
+WEEKDAY_NAMES = ("luni", "marti", "miercuri", "joi", "vineri", "sambata", "duminica")
+STUDY_LINES = ("romana", "romana", "engleza", "maghiara", "germana")
+AREAS = (
+    "Informatica", "Matematica", "Matematica informatica", "Ingineria informatiei",
+    "Inteligenta artificiala", "Informatica economica", "Calculatoare", "Statistica",
+)
+TITLES = ("Prof.", "Conf.", "Lect.", "Asist.", "C.d.asociat")
+
+PAGE_HEAD = """<html><head>
+<title>{title}</title>
+<link href='../style.css' rel='stylesheet' type='text/css'>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=ISO-8859-2">
+</head><body><center>
+"""
+PAGE_TAIL = "</center></body></html>\n"
+
+
+@dataclass(frozen=True)
+class FacultyShape:
+    """Sizes of a synthetic faculty; scale multiplies the study programs."""
+    programs: int = 24
+    years: int = 3
+    groups: int = 7
+    entries: int = 20       # per group table
+    rooms: int = 120
+    holidays: int = 3
+    scale: int = 1
+
+    @property
+    def spec_count(self) -> int:
+        return self.programs * self.scale * self.years
+
+
+@dataclass(frozen=True)
+class SynthSpec:
+    code: str
+    name: str
+    year: int
+    groups: tuple[str, ...]
+
+
+def spec_prefix(n: int) -> str:
+    """0 -> "SA", 25 -> "SZ", 26 -> "SBA": letters only, so codes end in the year."""
+    letters = ""
+    while True:
+        n, rem = divmod(n, 26)
+        letters = chr(ord("A") + rem) + letters
+        if n == 0:
+            return "S" + letters
+
+
+def make_specs(shape: FacultyShape) -> list[SynthSpec]:
+    specs = []
+    group_number = 100
+    for p in range(shape.programs * shape.scale):
+        line = STUDY_LINES[p % len(STUDY_LINES)]
+        name = f"{AREAS[p % len(AREAS)]} {p + 1} - linia de studiu {line}"
+        for year in range(1, shape.years + 1):
+            groups = tuple(str(group_number + g) for g in range(shape.groups))
+            group_number += shape.groups
+            specs.append(SynthSpec(f"{spec_prefix(p)}{year}", name, year, groups))
+    return specs
+
+
+def make_rooms(count: int) -> list[str]:
+    kinds = ("L", "C", "A", "MOS-S")
+    return [f"{kinds[i % len(kinds)]}{100 + i}" for i in range(count)]
+
+
+def _link(folder: str, slug: str, text: str) -> str:
+    return f'<a href="../{folder}/{slug}.html" >{text}</a>'
+
+
+def _row(day: str, hours: tuple[int, int], freq: str, room: str, formation: str,
+         kind: str, subject: tuple[str, str], professor: tuple[str, str]) -> str:
+    return (
+        "<tr align=center>\n"
+        f"<td>{day}</td>\n"
+        f'<td class="bloc">{hours[0]}-{hours[1]}</td>\n'
+        f"<td>{freq}</td>\n"
+        f"<td>{_link('sali', room.replace('/', '-'), room)}</td>\n"
+        f"<td>{formation}</td>\n"
+        f"<td>{kind}</td>\n"
+        f"<td>{_link('disc', subject[0], subject[1])}</td>\n"
+        f"<td>{_link('cadre', professor[0], professor[1])}</td>\n"
+        "</tr>\n"
+    )
+
+
+def render_schedule_page(
+    spec: SynthSpec, shape: FacultyShape, rooms: list[str], rng: random.Random
+) -> bytes:
+    """One spec's page: a "Grupa N" heading and 8-column table per group.
+
+    Courses are year-wide and repeat in every group's table, as on the
+    real pages; seminars are per group and labs per subgroup.
+    """
+    def row(formation: str, kind: str, subject: int, frequencies: tuple[str, ...]) -> tuple:
+        n = rng.randrange(500)
+        return (
+            rng.choice(DAYS),
+            rng.choice(SLOTS),
+            rng.choice(frequencies),
+            rng.choice(rooms),
+            formation,
+            kind,
+            (f"{spec.code}{subject:03d}", f"Disciplina {spec.code}-{subject}"),
+            (f"prof{n}", f"{TITLES[n % len(TITLES)]} PROFESOR{n} Nume{n % 37}"),
+        )
+
+    n_courses = round(shape.entries * 0.35)
+    n_seminars = round(shape.entries * 0.15)
+    n_labs = shape.entries - n_courses - n_seminars
+    courses = [row(spec.code, "Curs", i, ("&nbsp;",)) for i in range(n_courses)]
+
+    parts = [
+        PAGE_HEAD.format(title=f"Anul {spec.year} {spec.name}"),
+        f"<h1>Orar Anul {spec.year} {spec.name}</h1>\n",
+    ]
+    for group in spec.groups:
+        rows = courses + [
+            row(group, "Seminar", i, ("&nbsp;", "&nbsp;", "sapt. 1", "sapt. 2"))
+            for i in range(n_seminars)
+        ] + [
+            row(f"{group}/{i % 2 + 1}", "Laborator", i // 2, ("&nbsp;", "sapt. 1", "sapt. 2"))
+            for i in range(n_labs)
+        ]
+        rows.sort(key=lambda r: (DAYS.index(r[0]), r[1]))
+        parts.append(f"<h1>Grupa {group}</h1>\n")
+        parts.append(
+            "<table border=1 cellspacing=0 cellpadding=0>\n<tr align=center>\n"
+            "<th>Ziua</th>\n<th>Orele</th>\n<th>Frecventa</th>\n<th>Sala</th>\n"
+            "<th>Formatia</th>\n<th>Tipul</th>\n<th>Disciplina</th>\n<th>Cadrul didactic</th>\n"
+            "</tr>\n"
+        )
+        parts.extend(_row(*r) for r in rows)
+        parts.append("</table>\n")
+    parts.append(PAGE_TAIL)
+    return "".join(parts).encode("iso-8859-2")
+
+
+def render_index(specs: list[SynthSpec], years: int) -> bytes:
+    """The tabelar index: one row per program, an "Anul N" link per year."""
+    parts = [
+        PAGE_HEAD.format(title="Orar studenti (format tabelar)"),
+        "<h1>Orar studenti (format tabelar)</h1>\n",
+        "<table border=1 cellspacing=0 cellpadding=0>\n<tr align=center>\n<th>Studii Licenta</th>\n",
+        "<th>Anul</th>\n" * years,
+        "</tr>\n",
+    ]
+    by_name: dict[str, list[SynthSpec]] = {}
+    for spec in specs:
+        by_name.setdefault(spec.name, []).append(spec)
+    for name, program in by_name.items():
+        parts.append(f"<tr align=center>\n<td>{name}</td>\n")
+        for spec in program:
+            parts.append(f'<td><a href="{spec.code}.html" >Anul {spec.year}</a></td>\n')
+        parts.append("<td>&nbsp;</td>\n" * (years - len(program)))
+        parts.append("</tr>\n")
+    parts.append("</table>\n" + PAGE_TAIL)
+    return "".join(parts).encode("iso-8859-2")
+
+
+def render_room_legend(rooms: list[str]) -> bytes:
+    parts = [
+        PAGE_HEAD.format(title="Legenda salilor"),
+        "<h1>Legenda salilor</h1>\n",
+        "<table border=1 cellspacing=0 cellpadding=0>\n"
+        "<tr align=center>\n<th>Sala</th>\n<th>Localizarea</th>\n</tr>\n",
+    ]
+    for i, room in enumerate(rooms):
+        parts.append(
+            f'<tr>\n<td align=center><a href="{room.replace("/", "-")}.html" >{room}</a></td>\n'
+            f"<td align=left>Cladirea {i % 9 + 1}, Etaj {i % 4}, Sala {room}</td>\n</tr>\n"
+        )
+    parts.append("</table>\n" + PAGE_TAIL)
+    return "".join(parts).encode("iso-8859-2")
+
+
+def _monday_on_or_after(day: date) -> date:
+    return day + timedelta(days=-day.weekday() % 7)
+
+
+def semester_periods(year: int, semester: int) -> list[tuple[date, date, str]]:
+    """(start, end, activity) rows of a semester, shaped like the real structure."""
+    if semester == 1:
+        start = _monday_on_or_after(date(year, 9, 29))
+        first, vacation, second = 12, 2, 2
+    else:
+        start = _monday_on_or_after(date(year + 1, 2, 20))
+        first, vacation, second = 7, 1, 7
+    rows = []
+    for weeks, activity in (
+        (first, "activitate didactică"),
+        (vacation, "vacanță"),
+        (second, "activitate didactică"),
+        (3, "sesiune de examene"),
+    ):
+        end = start + timedelta(weeks=weeks, days=-1)
+        rows.append((start, end, activity))
+        start = end + timedelta(days=1)
+    return rows
+
+
+def _calendar_table(year: int, semester: int, holidays: int, rng: random.Random) -> str:
+    rows = semester_periods(year, semester)
+    teaching = [
+        start + timedelta(days=d)
+        for start, end, activity in rows if activity.startswith("activitate")
+        for d in range((end - start).days + 1)
+        if (start + timedelta(days=d)).weekday() < 5
+    ]
+    days_off = set(rng.sample(teaching, min(holidays, len(teaching))))
+
+    parts = ['<table border="0" cellpadding="0" cellspacing="0" width="100%">\n']
+    for start, end, activity in rows:
+        weeks = ((end - start).days + 1) // 7
+        notes = f"{weeks} săptămâni"
+        period_off = sorted(d for d in days_off if start <= d <= end)
+        if period_off:
+            listed = " și ".join(
+                f"{WEEKDAY_NAMES[d.weekday()]}, {d:%d.%m.%Y}, Zi liberă {i + 1}"
+                for i, d in enumerate(period_off)
+            )
+            notes += f" ({listed} - zile libere)"
+        parts.append(
+            "<tr>\n"
+            f'<td valign="top"><p><strong>{start:%d.%m.%Y} - {end:%d.%m.%Y} </strong></p></td>\n'
+            f'<td valign="top"><p>{activity} </p></td>\n'
+            f'<td valign="top"><p>{notes} </p></td>\n'
+            "</tr>\n"
+        )
+    parts.append("</table>\n")
+    return "".join(parts)
+
+
+def render_academic_calendar(year: int, holidays: int, rng: random.Random) -> bytes:
+    """The structure of the academic year: the six tables parse_academic_calendars reads.
+
+    Romanian semester 1, 2 and final-year 2, then the same three for the
+    Hungarian/German line.
+    """
+    parts = [
+        "<!doctype html>\n<html><head><meta charset=\"utf-8\"></head><body>\n",
+        f"<h1>Structura anului universitar {year}-{year + 1}</h1>\n",
+    ]
+    for line in ("Română", "Maghiară și Germană"):
+        parts.append(f"<h2>Linia de studiu {line}</h2>\n")
+        for semester, title in ((1, "SEMESTRUL I"), (2, "SEMESTRUL II"), (2, "SEMESTRUL II - AN FINAL")):
+            parts.append(f'<p align="center"><strong>{title}</strong></p>\n')
+            parts.append(_calendar_table(year, semester, holidays, rng))
+    parts.append("</body></html>\n")
+    return "".join(parts).encode("utf-8")
+
+
+def build_faculty(year: int, semester: int, shape: FacultyShape, seed: int = 0) -> dict[str, bytes]:
+    """Every page of a synthetic faculty, keyed by the URL generate_all.py fetches it from."""
+    rng = random.Random(seed)
+    base_url = f"{SCHEDULE_ROOT}/{year}-{semester}/tabelar"
+    specs = make_specs(shape)
+    rooms = make_rooms(shape.rooms)
+
+    pages = {
+        f"{base_url}/index.html": render_index(specs, shape.years),
+        room_legend_url(base_url): render_room_legend(rooms),
+        ACADEMIC_CALENDAR_URL: render_academic_calendar(year, shape.holidays, rng),
+    }
+    for spec in specs:
+        pages[schedule_page_url(base_url, spec.code)] = render_schedule_page(spec, shape, rooms, rng)
+    return pages
+
+
+def seed_cache(pages: dict[str, bytes], cache_dir: Path) -> None:
+    cache = HttpCache(cache_dir)
+    for url, body in pages.items():
+        cache.store(url, body)
+
+
+def write_files(pages: dict[str, bytes], output_dir: Path) -> None:
+    """Write pages under output_dir, mirroring their URL paths."""
+    for url, body in pages.items():
+        path = output_dir / url.split("://", 1)[1]
+        if not path.suffix:
+            path = path.with_suffix(".html")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic schedule pages for scale testing",
+    )
+    parser.add_argument("semester", help="Semester the pages are for (e.g. 2025-2)")
+    parser.add_argument("--scale", type=int, default=1, help="Multiple of the real faculty's size (default: 1)")
+    parser.add_argument("--programs", type=int, default=FacultyShape.programs,
+                        help=f"Study programs at scale 1 (default: {FacultyShape.programs})")
+    parser.add_argument("--years", type=int, default=FacultyShape.years,
+                        help=f"Years per program (default: {FacultyShape.years})")
+    parser.add_argument("--groups", type=int, default=FacultyShape.groups,
+                        help=f"Groups per spec (default: {FacultyShape.groups})")
+    parser.add_argument("--entries", type=int, default=FacultyShape.entries,
+                        help=f"Entries per group table (default: {FacultyShape.entries})")
+    parser.add_argument("--rooms", type=int, default=FacultyShape.rooms,
+                        help=f"Rooms in the legend (default: {FacultyShape.rooms})")
+    parser.add_argument("--holidays", type=int, default=FacultyShape.holidays,
+                        help=f"Days off per semester (default: {FacultyShape.holidays})")
+    parser.add_argument("--seed", type=int, default=0)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--cache-dir", type=Path, help="Store the pages in this HTTP cache (for --offline)")
+    target.add_argument("--output-dir", type=Path, help="Write the pages as files instead")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    year, semester = (int(part) for part in args.semester.split("-"))
+    shape = FacultyShape(
+        programs=args.programs,
+        years=args.years,
+        groups=args.groups,
+        entries=args.entries,
+        rooms=args.rooms,
+        holidays=args.holidays,
+        scale=args.scale,
+    )
+    pages = build_faculty(year, semester, shape, args.seed)
+    if args.cache_dir is not None:
+        seed_cache(pages, args.cache_dir)
+        target = args.cache_dir
+    else:
+        write_files(pages, args.output_dir)
+        target = args.output_dir
+    size = sum(map(len, pages.values()))
+    print(
+        f"Wrote {len(pages)} pages ({size / 1e6:.1f} MB) to {target}: "
+        f"{shape.spec_count} specs, {shape.spec_count * shape.groups} groups, "
+        f"{shape.spec_count * shape.groups * shape.entries} entries"
+    )
+
+
+if __name__ == "__main__":
+    main()
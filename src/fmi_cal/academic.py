@@ -1,10 +1,14 @@
+import asyncio
 import re
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from datetime import date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
 
-import requests
-from bs4 import BeautifulSoup
-
-from .models import AcademicCalendar, ScheduleEntry, TeachingPeriod, Frequency
+from .http_client import AsyncFetcher, HttpClient, get_default_client
+from .models import AcademicCalendar, Frequency, GroupSchedule, ScheduleEntry, TeachingPeriod
 
 ACADEMIC_CALENDAR_URL = (
     "https://www.ubbcluj.ro/ro/studenti/invatamant/structura_anului_universitar"
@@ -61,11 +65,36 @@ def get_study_line(spec_code: str, spec_name: str = "") -> str:
 
 
 def fetch_academic_calendar(
-    study_line: str = "romanian", semester: int = 2
+    study_line: str = "romanian",
+    semester: int = 2,
+    client: HttpClient | None = None,
+) -> AcademicCalendar:
+    """Scrape and parse the academic calendar from the university website.
+
+    Fetches the page on every call; use an AcademicCalendarRepository when
+    more than one calendar is needed.
+    """
+    content = (client or get_default_client()).fetch(ACADEMIC_CALENDAR_URL)
+    return parse_academic_calendar(content, study_line, semester)
+
+
+async def fetch_academic_calendar_async(
+    study_line: str,
+    semester: int,
+    client: AsyncFetcher,
+) -> AcademicCalendar:
+    """Async variant of fetch_academic_calendar."""
+    content = await client.fetch(ACADEMIC_CALENDAR_URL)
+    return await asyncio.to_thread(parse_academic_calendar, content, study_line, semester)
+
+
+def parse_academic_calendar(
+    content: bytes, study_line: str = "romanian", semester: int = 2
 ) -> AcademicCalendar:
-    """Scrape and parse the academic calendar from the university website."""
-    resp = requests.get(ACADEMIC_CALENDAR_URL, timeout=15)
-    soup = BeautifulSoup(resp.content, "html.parser")
+    """Parse the academic calendar page for one study line and semester."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
 
     tables = soup.find_all("table")
     table_idx = _TABLE_INDEX.get((study_line, semester))
@@ -78,6 +107,136 @@ def fetch_academic_calendar(
     return _parse_calendar_table(table)
 
 
+def _calendar_tables(content: bytes) -> list:
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(content, "html.parser").find_all("table")
+
+
+def parse_academic_calendars(
+    content: bytes,
+) -> dict[tuple[str, int], AcademicCalendar]:
+    """Parse every (study line, semester) calendar from the page in one pass.
+
+    Keys missing from the page are left out. Study lines that share a table
+    (Hungarian and German) share the same AcademicCalendar object.
+    """
+    tables = _calendar_tables(content)
+
+    by_table: dict[int, AcademicCalendar] = {}
+    calendars: dict[tuple[str, int], AcademicCalendar] = {}
+    for key, table_idx in _TABLE_INDEX.items():
+        if table_idx >= len(tables):
+            continue
+        if table_idx not in by_table:
+            by_table[table_idx] = _parse_calendar_table(tables[table_idx])
+        calendars[key] = by_table[table_idx]
+    return calendars
+
+
+class AcademicCalendarRepository:
+    """All academic calendars from a single fetch of the calendar page.
+
+    The page is downloaded and split into its tables the first time a
+    calendar is requested, and each table is parsed the first time one of
+    its calendars is; later calls, from any thread, are served from memory.
+    Concurrent first callers wait on a lock instead of fetching the page
+    themselves.
+
+    Failures are remembered, so a broken page is not re-fetched by every
+    caller: a failed download fails every calendar, while a table that
+    does not parse only fails the calendars read from it. Call refresh()
+    to try again.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient | None = None,
+        content: bytes | None = None,
+    ) -> None:
+        self._client = client
+        self._content = content
+        self._lock = threading.Lock()
+        self._tables: list | None = None
+        # Parsed calendar, or the error parsing it raised, by table index
+        self._calendars: dict[int, AcademicCalendar | Exception] = {}
+        self._indexes: dict[tuple[str, int], TeachingCalendarIndex] = {}
+        self._error: Exception | None = None
+
+    def load(self) -> list:
+        """Fetch the page and split it into tables (once); return the tables."""
+        tables = self._tables
+        if tables is not None:
+            return tables
+        with self._lock:
+            if self._tables is None:
+                if self._error is not None:
+                    raise self._error
+                try:
+                    content = self._content
+                    if content is None:
+                        client = self._client or get_default_client()
+                        content = client.fetch(ACADEMIC_CALENDAR_URL)
+                    self._tables = _calendar_tables(content)
+                except Exception as exc:
+                    self._error = exc
+                    raise
+            return self._tables
+
+    def get(self, study_line: str = "romanian", semester: int = 2) -> AcademicCalendar:
+        """Return the calendar for a study line and semester."""
+        tables = self.load()
+        table_idx = _TABLE_INDEX.get((study_line, semester))
+        if table_idx is None or table_idx >= len(tables):
+            raise ValueError(
+                f"Cannot find academic calendar table for {study_line} semester {semester}"
+            )
+        with self._lock:
+            calendar = self._calendars.get(table_idx)
+            if calendar is None:
+                try:
+                    calendar = _parse_calendar_table(tables[table_idx])
+                except Exception as exc:
+                    calendar = exc
+                self._calendars[table_idx] = calendar
+        if isinstance(calendar, Exception):
+            raise calendar
+        return calendar
+
+    def teaching_index(
+        self, study_line: str = "romanian", semester: int = 2
+    ) -> "TeachingCalendarIndex":
+        """Return the (memoized) TeachingCalendarIndex for a calendar."""
+        key = (study_line, semester)
+        index = self._indexes.get(key)
+        if index is None:
+            index = build_teaching_index(self.get(study_line, semester))
+            with self._lock:
+                index = self._indexes.setdefault(key, index)
+        return index
+
+    def refresh(self) -> None:
+        """Forget the loaded page (or error); the next call fetches it again."""
+        with self._lock:
+            self._tables = None
+            self._calendars = {}
+            self._indexes = {}
+            self._error = None
+
+
+_default_repository: AcademicCalendarRepository | None = None
+_default_repository_lock = threading.Lock()
+
+
+def get_default_repository() -> AcademicCalendarRepository:
+    """Return the process-wide repository, backed by the default HTTP client."""
+    global _default_repository
+    with _default_repository_lock:
+        if _default_repository is None:
+            _default_repository = AcademicCalendarRepository()
+        return _default_repository
+
+
 def _parse_date(date_str: str) -> date:
     """Parse 'DD.MM.YYYY' -> date."""
     parts = date_str.strip().split(".")
@@ -165,37 +324,111 @@ def compute_teaching_weeks(
     return weeks
 
 
+@dataclass(frozen=True)
+class TeachingCalendarIndex:
+    """Precomputed occurrence dates for an academic calendar.
+
+    Maps every (weekday, frequency) pair to the sorted dates an entry with
+    that day and frequency occurs on, so expanding an entry is a single
+    lookup instead of a walk over all teaching weeks.
+
+    The mapping is read-only and the index is hashable, so it can key
+    caches (see EventBlockCache).
+    """
+
+    dates: Mapping[tuple[int, Frequency], tuple[date, ...]]
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        dates = MappingProxyType(dict(self.dates))
+        object.__setattr__(self, "dates", dates)
+        object.__setattr__(self, "_hash", hash(frozenset(dates.items())))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        # MappingProxyType does not pickle
+        return type(self), (dict(self.dates),)
+
+    @classmethod
+    def from_calendar(cls, calendar: AcademicCalendar) -> "TeachingCalendarIndex":
+        holidays_set = set(calendar.holidays)
+        buckets: dict[tuple[int, Frequency], list[date]] = {
+            (day, freq): [] for day in range(7) for freq in Frequency
+        }
+
+        for monday, week_num in compute_teaching_weeks(calendar):
+            parity = Frequency.WEEK_1 if week_num % 2 == 1 else Frequency.WEEK_2
+            for day_offset in range(7):
+                event_date = monday + timedelta(days=day_offset)
+
+                # Verify the date falls within a teaching period
+                in_period = any(
+                    p.start <= event_date <= p.end for p in calendar.teaching_periods
+                )
+                if not in_period or event_date in holidays_set:
+                    continue
+
+                buckets[(day_offset, Frequency.EVERY_WEEK)].append(event_date)
+                buckets[(day_offset, parity)].append(event_date)
+
+        return cls(dates={key: tuple(sorted(ds)) for key, ds in buckets.items()})
+
+    def dates_for(self, entry: ScheduleEntry) -> tuple[date, ...]:
+        """Return the dates a schedule entry occurs on (empty for unknown days)."""
+        day_offset = DAY_MAP.get(entry.day)
+        if day_offset is None:
+            return ()
+        return self.dates[(day_offset, entry.frequency)]
+
+
+def build_teaching_index(
+    calendar: AcademicCalendar | TeachingCalendarIndex,
+) -> TeachingCalendarIndex:
+    """Return a TeachingCalendarIndex for the calendar (no-op if already one).
+
+    Indexes are memoized per calendar, so passing the same AcademicCalendar
+    again returns the same index object.
+    """
+    if isinstance(calendar, TeachingCalendarIndex):
+        return calendar
+    return _calendar_index(calendar)
+
+
+# A page holds at most a handful of calendars
+@lru_cache(maxsize=16)
+def _calendar_index(calendar: AcademicCalendar) -> TeachingCalendarIndex:
+    return TeachingCalendarIndex.from_calendar(calendar)
+
+
 def get_dates_for_entry(
-    entry: ScheduleEntry, calendar: AcademicCalendar
+    entry: ScheduleEntry, calendar: AcademicCalendar | TeachingCalendarIndex
 ) -> list[date]:
-    """Return all concrete dates a schedule entry occurs on."""
-    day_offset = DAY_MAP.get(entry.day)
-    if day_offset is None:
-        return []
-
-    weeks = compute_teaching_weeks(calendar)
-    holidays_set = set(calendar.holidays)
-    dates: list[date] = []
-
-    for monday, week_num in weeks:
-        # Check frequency
-        if entry.frequency == Frequency.WEEK_1 and week_num % 2 == 0:
-            continue
-        if entry.frequency == Frequency.WEEK_2 and week_num % 2 == 1:
-            continue
+    """Return all concrete dates a schedule entry occurs on.
 
-        event_date = monday + timedelta(days=day_offset)
+    The calendar's index is built on the first call and reused after that.
+    """
+    return list(build_teaching_index(calendar).dates_for(entry))
 
-        # Verify the date falls within a teaching period
-        in_period = any(
-            p.start <= event_date <= p.end for p in calendar.teaching_periods
-        )
-        if not in_period:
-            continue
 
-        if event_date in holidays_set:
-            continue
+def get_dates_for_entries(
+    entries: list[ScheduleEntry],
+    calendar: AcademicCalendar | TeachingCalendarIndex,
+) -> list[tuple[date, ...]]:
+    """Expand a batch of entries in one pass, in input order.
+
+    The index is built once and entries sharing a (day, frequency) pair
+    share the same dates tuple.
+    """
+    lookup = build_teaching_index(calendar).dates
+    return [lookup.get((DAY_MAP.get(e.day), e.frequency), ()) for e in entries]
 
-        dates.append(event_date)
 
-    return sorted(dates)
+def get_dates_for_schedules(
+    schedules: list[GroupSchedule],
+    calendar: AcademicCalendar | TeachingCalendarIndex,
+) -> list[list[tuple[date, ...]]]:
+    """Expand every entry of a whole specialization, one list per group."""
+    index = build_teaching_index(calendar)
+    return [get_dates_for_entries(gs.entries, index) for gs in schedules]
@@ -0,0 +1,314 @@
+"""`fmi-cal batch`: generate many users' calendars in one process.
+
+Reads a list of preferences (the same keys as ~/.config/fmi-cal/config.yaml)
+from a YAML, JSON or CSV file:
+
+    - spec_code: IE2
+      group: "921"
+      subgroup: "1"
+      excluded_subjects: [Ingineria sistemelor soft]
+      output: alice.ics          # optional, relative to --output-dir
+
+CSV files have one row per user with the same column names; list columns
+(include_types, excluded_subjects) are separated by ";".
+
+The schedule URL, the specialization list, the room legend and the
+academic calendar page are fetched once, and each distinct
+specialization's schedule page once.
+All calendars are then written on a thread pool, sharing one
+EventBlockCache (whose hit counters are approximate across threads), and
+a per-item summary is printed.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .academic import AcademicCalendarRepository, get_study_line
+from .calendar_gen import apply_user_filters, filter_entries_for_student, write_ics
+from .config import preferences_from_dict
+from .http_client import DEFAULT_CACHE_DIR, HttpClient, async_fetcher
+from .ics import EventBlockCache
+from .models import EventType, GroupSchedule, UserPreferences
+from .scraper import (
+    DEFAULT_PARSER,
+    PARSERS,
+    fetch_all_specs_async,
+    fetch_room_legend_async,
+    fetch_specializations,
+    get_schedule_base_url,
+    parse_semester,
+)
+
+# Calendars written at the same time
+DEFAULT_JOBS = 8
+
+LIST_COLUMNS = ("include_types", "excluded_subjects")
+
+
+@dataclass
+class BatchItem:
+    prefs: UserPreferences
+    output: Path
+
+
+@dataclass
+class BatchResult:
+    item: BatchItem
+    events: int = 0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def default_output_name(prefs: UserPreferences) -> str:
+    """File name for a user, like the CLI default (IE2_921.ics, IE2_921_1.ics)."""
+    parts = [prefs.spec_code, prefs.group]
+    if prefs.subgroup:
+        parts.append(prefs.subgroup)
+    return "_".join(parts).replace("/", "-") + ".ics"
+
+
+def _read_records(path: Path) -> list[dict]:
+    text = path.read_text(encoding="utf-8")
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        records = []
+        for row in csv.DictReader(text.splitlines()):
+            record = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            for column in LIST_COLUMNS:
+                if record.get(column):
+                    record[column] = [s.strip() for s in record[column].split(";") if s.strip()]
+                else:
+                    record.pop(column, None)
+            records.append(record)
+        return records
+    if suffix == ".json":
+        data = json.loads(text)
+    elif suffix in (".yaml", ".yml"):
+        import yaml
+
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}") from e
+    else:
+        raise ValueError(f"Unsupported batch file type: {path.suffix} (use .yaml, .json or .csv)")
+    if isinstance(data, dict):
+        data = data.get("users")
+    if not isinstance(data, list):
+        raise ValueError("Batch file must contain a list of preferences (or a 'users' list)")
+    return data
+
+
+def load_batch(path: Path, output_dir: Path = Path(".")) -> list[BatchItem]:
+    """Read a batch file into BatchItems with resolved output paths."""
+    items = []
+    seen: dict[Path, int] = {}
+    for number, record in enumerate(_read_records(path), start=1):
+        if not isinstance(record, dict):
+            raise ValueError(f"Item {number}: expected a mapping, got {record!r}")
+        try:
+            prefs = preferences_from_dict(record)
+        except KeyError as e:
+            raise ValueError(f"Item {number}: missing {e.args[0]}") from e
+        except ValueError as e:
+            raise ValueError(f"Item {number}: {e}") from e
+        output = output_dir / (record.get("output") or default_output_name(prefs))
+        if output in seen:
+            raise ValueError(f"Item {number}: output {output} is also used by item {seen[output]}")
+        seen[output] = number
+        items.append(BatchItem(prefs=prefs, output=output))
+    return items
+
+
+async def fetch_batch_schedules(
+    base_url: str,
+    spec_codes: list[str],
+    repository: AcademicCalendarRepository,
+    client: HttpClient,
+    concurrency: int,
+    parser: str,
+) -> tuple[dict[str, list[GroupSchedule] | Exception], dict[str, str]]:
+    """Fetch the room legend and each distinct schedule page once.
+
+    The academic calendars load alongside. Returns the schedules by spec
+    code and the room legend, which is empty if it could not be fetched.
+    """
+    calendars_loaded = asyncio.ensure_future(asyncio.to_thread(repository.load))
+    async with async_fetcher(client, concurrency=concurrency) as fetcher:
+        room_legend, schedules = await asyncio.gather(
+            fetch_room_legend_async(base_url, fetcher),
+            fetch_all_specs_async(base_url, spec_codes, fetcher, parser=parser),
+            return_exceptions=True,
+        )
+    try:
+        await calendars_loaded
+    except Exception:
+        pass    # Reported per item by repository.teaching_index
+    if isinstance(schedules, Exception):
+        raise schedules
+    if isinstance(room_legend, Exception):
+        print(f"WARNING: Could not fetch room legend: {room_legend}", flush=True)
+        room_legend = {}
+    return schedules, room_legend
+
+
+def generate_item(
+    item: BatchItem,
+    schedules: list[GroupSchedule] | Exception,
+    spec_name: str,
+    repository: AcademicCalendarRepository,
+    semester_num: int,
+    cache: EventBlockCache,
+) -> BatchResult:
+    """Filter and write one user's calendar; errors end up in the result."""
+    prefs = item.prefs
+    try:
+        if isinstance(schedules, Exception):
+            raise schedules
+        group_schedule = next((s for s in schedules if s.group == prefs.group), None)
+        if group_schedule is None:
+            raise ValueError(f"Group {prefs.group} not found in {prefs.spec_code}")
+
+        entries = filter_entries_for_student(group_schedule, prefs.group, prefs.subgroup)
+        entries = apply_user_filters(
+            entries,
+            [EventType(t) for t in prefs.include_types],
+            prefs.excluded_subjects,
+        )
+        index = repository.teaching_index(
+            get_study_line(prefs.spec_code, spec_name), semester_num
+        )
+        item.output.parent.mkdir(parents=True, exist_ok=True)
+        with item.output.open("wb") as f:
+            write_ics(f, entries, index, cache=cache)
+    except Exception as e:
+        return BatchResult(item, error=str(e))
+    return BatchResult(item, events=len(entries))
+
+
+def generate_batch(
+    items: list[BatchItem],
+    schedules: dict[str, list[GroupSchedule] | Exception],
+    spec_names: dict[str, str],
+    repository: AcademicCalendarRepository,
+    semester_num: int,
+    room_legend: dict[str, str] | None = None,
+    compact: bool = False,
+    jobs: int = DEFAULT_JOBS,
+) -> list[BatchResult]:
+    """Write every item's calendar concurrently; results are in item order."""
+    cache = EventBlockCache(room_legend, compact=compact)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [
+            pool.submit(
+                generate_item,
+                item,
+                schedules.get(
+                    item.prefs.spec_code,
+                    ValueError(f"Specialization {item.prefs.spec_code} was not fetched"),
+                ),
+                spec_names.get(item.prefs.spec_code, ""),
+                repository,
+                semester_num,
+                cache,
+            )
+            for item in items
+        ]
+        return [f.result() for f in futures]
+
+
+def print_summary(results: list[BatchResult]) -> None:
+    for result in results:
+        prefs = result.item.prefs
+        label = f"{prefs.spec_code} {prefs.group}/{prefs.subgroup or 'all'}"
+        if result.ok:
+            print(f"  OK    {label}: {result.item.output} ({result.events} entries)")
+        else:
+            print(f"  FAIL  {label}: {result.error}")
+    failed = sum(1 for r in results if not r.ok)
+    print(f"\n{len(results) - failed} succeeded, {failed} failed")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="fmi-cal batch",
+        description="Generate .ics files for a list of users in one run",
+    )
+    parser.add_argument("file", type=Path, help="Preferences list (.yaml, .json or .csv)")
+    parser.add_argument(
+        "--output-dir", "-o", type=Path, default=Path("."), help="Directory for the .ics files"
+    )
+    parser.add_argument(
+        "--semester", type=parse_semester, help="Semester override (e.g. 2025-2)"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write recurring events (RRULE + EXDATE) instead of one event per occurrence",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=DEFAULT_JOBS, help="Calendars written at the same time"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Concurrent HTTP requests"
+    )
+    parser.add_argument("--cache-dir", type=Path, help="Cache fetched pages on disk")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help=f"Serve pages from the cache only (default cache dir: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+        help=f"Schedule page parser backend (default: {DEFAULT_PARSER})",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    try:
+        items = load_batch(args.file, args.output_dir)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Cannot read {args.file}: {e}")
+    if not items:
+        sys.exit(f"No users in {args.file}")
+
+    cache_dir = args.cache_dir
+    if args.offline and cache_dir is None:
+        cache_dir = DEFAULT_CACHE_DIR
+    with HttpClient(
+        pool_size=args.concurrency, cache_dir=cache_dir, offline=args.offline
+    ) as client:
+        year, sem = args.semester or (None, None)
+        print("Detecting schedule URL...", flush=True)
+        base_url = get_schedule_base_url(year, sem, client)
+        semester_num = int(base_url.rstrip("/").split("/")[-2].split("-")[1])
+        print(f"Using: {base_url}")
+
+        spec_names = {s.code: s.name for s in reversed(fetch_specializations(base_url, client))}
+        codes = list(dict.fromkeys(item.prefs.spec_code for item in items))
+        print(f"Fetching {len(codes)} specializations for {len(items)} users...", flush=True)
+        repository = AcademicCalendarRepository(client)
+        schedules, room_legend = asyncio.run(fetch_batch_schedules(
+            base_url, codes, repository, client, args.concurrency, args.parser
+        ))
+
+    results = generate_batch(
+        items, schedules, spec_names, repository, semester_num, room_legend,
+        args.compact, args.jobs,
+    )
+    print_summary(results)
+    if any(not r.ok for r in results):
+        sys.exit(1)
@@ -1,23 +1,60 @@
-from datetime import datetime
+import weakref
+from collections import Counter
+from collections.abc import Iterator
+from datetime import date, datetime
+from typing import BinaryIO
 from zoneinfo import ZoneInfo
 
-from icalendar import Calendar, Event
-
-from .academic import get_dates_for_entry
+from .academic import (
+    TeachingCalendarIndex,
+    build_teaching_index,
+    get_dates_for_entries,
+    get_dates_for_entry,
+)
+from .ics import (
+    TYPE_PREFIX,
+    EventBlockCache,
+    event_location,
+    event_uid,
+    iter_calendar,
+    serialize_calendar,
+    source_dtstamp,
+)
 from .models import (
     AcademicCalendar,
     EventType,
+    FormationIndex,
     GroupSchedule,
     ScheduleEntry,
 )
 
 TIMEZONE = ZoneInfo("Europe/Bucharest")
 
-TYPE_PREFIX = {
-    EventType.CURS: "[C]",
-    EventType.SEMINAR: "[S]",
-    EventType.LABORATOR: "[L]",
-}
+ICS_BACKENDS = ("native", "icalendar")
+
+# Formation indexes by id() of their GroupSchedule, then by group. Keyed by
+# identity because hashing a schedule hashes every entry; an entry is
+# dropped when its schedule is garbage collected.
+_formation_indexes: dict[int, dict[str, FormationIndex]] = {}
+
+
+def formation_index(group_schedule: GroupSchedule, group: str | None = None) -> FormationIndex:
+    """Bucket a schedule's entries by formation relative to group (default: its own).
+
+    Built in one pass on first use and cached for the schedule's lifetime.
+    """
+    group = group_schedule.group if group is None else group
+    key = id(group_schedule)
+    indexes = _formation_indexes.get(key)
+    if indexes is None:
+        indexes = _formation_indexes.setdefault(key, {})
+        weakref.finalize(group_schedule, _formation_indexes.pop, key, None)
+    index = indexes.get(group)
+    if index is not None:
+        return index
+
+    index = FormationIndex.build((e.formation for e in group_schedule.entries), group)
+    return indexes.setdefault(group, index)
 
 
 def filter_entries_for_student(
@@ -34,32 +71,13 @@ def filter_entries_for_student(
 
     Excludes the other subgroup (e.g. "921/2" when subgroup="1").
     If subgroup is None, include both subgroups.
-    """
-    result: list[ScheduleEntry] = []
-
-    for entry in group_schedule.entries:
-        formation = entry.formation
-
-        # Year-wide code (doesn't start with digit) — always include
-        if not formation[0].isdigit():
-            result.append(entry)
-            continue
-
-        # Exact match with group (handles both "921" and "243/1" style groups)
-        if formation == group:
-            result.append(entry)
-            continue
 
-        # Check if it's a subgroup of this group (e.g. "921/1" for group "921")
-        if "/" in formation and "/" not in group:
-            entry_group, entry_sub = formation.split("/", 1)
-            if entry_group != group:
-                continue
-            if subgroup is not None and entry_sub != subgroup:
-                continue
-            result.append(entry)
-
-    return result
+    The entries are looked up in the group schedule's formation_index, so
+    repeated calls (e.g. for subgroup "1", "2" and None) scan the entries
+    only once.
+    """
+    entries = group_schedule.entries
+    return [entries[i] for i in formation_index(group_schedule, group).positions(subgroup)]
 
 
 def apply_user_filters(
@@ -77,26 +95,111 @@ def apply_user_filters(
 
 def generate_ics(
     entries: list[ScheduleEntry],
-    calendar: AcademicCalendar,
+    calendar: AcademicCalendar | TeachingCalendarIndex,
     room_legend: dict[str, str] | None = None,
+    backend: str = "native",
+    compact: bool = False,
 ) -> bytes:
     """Generate an .ics file as bytes.
 
-    Creates individual events for each occurrence (not RRULE),
+    By default creates individual events for each occurrence (not RRULE),
     since vacation gaps and week parity make individual events simpler.
+    compact=True instead writes one weekly RRULE per entry and teaching
+    period with EXDATEs for the gaps; check it with verify_compact_ics.
+
+    The "native" backend writes RFC 5545 text directly (see fmi_cal.ics);
+    "icalendar" builds an icalendar object graph and is kept as a
+    reference implementation (per-occurrence output only).
+
+    Output is deterministic: UIDs come from the entry and date, DTSTAMP
+    from the academic calendar (see source_dtstamp).
+    """
+    if backend not in ICS_BACKENDS:
+        raise ValueError(f"Unknown ICS backend: {backend}")
+
+    index = build_teaching_index(calendar)
+    entry_dates = get_dates_for_entries(entries, index)
+    dtstamp = source_dtstamp(index)
+    if backend == "icalendar":
+        if compact:
+            raise ValueError("Compact output requires the native backend")
+        return _generate_ics_icalendar(entries, entry_dates, room_legend, dtstamp)
+    return serialize_calendar(entries, entry_dates, room_legend, dtstamp, compact)
+
+
+def iter_ics(
+    entries: list[ScheduleEntry],
+    calendar: AcademicCalendar | TeachingCalendarIndex,
+    room_legend: dict[str, str] | None = None,
+    cache: EventBlockCache | None = None,
+    compact: bool | None = None,
+) -> Iterator[bytes]:
+    """Yield the same .ics as generate_ics in chunks, one entry at a time.
+
+    Dates are expanded lazily, so peak memory does not grow with the
+    number of entries in the calendar.
+
+    With a cache, event blocks already serialized for another calendar are
+    reused, with the cache's room legend and compact setting. Passing a
+    room_legend or compact that differs from them raises ValueError.
+    """
+    index = build_teaching_index(calendar)
+    if cache is not None:
+        if room_legend is not None and room_legend != cache.room_legend:
+            raise ValueError("room_legend differs from the cache's room legend")
+        if compact is not None and compact != cache.compact:
+            raise ValueError(f"compact={compact} differs from the cache's compact={cache.compact}")
+        return cache.iter_calendar(entries, index)
+    return iter_calendar(
+        entries,
+        (index.dates_for(e) for e in entries),
+        room_legend,
+        source_dtstamp(index),
+        bool(compact),
+    )
+
+
+def write_ics(
+    fp: BinaryIO,
+    entries: list[ScheduleEntry],
+    calendar: AcademicCalendar | TeachingCalendarIndex,
+    room_legend: dict[str, str] | None = None,
+    cache: EventBlockCache | None = None,
+    compact: bool | None = None,
+) -> int:
+    """Stream an .ics file to a binary file object. Returns bytes written.
+
+    See iter_ics for the cache, room_legend and compact arguments.
     """
+    written = 0
+    for chunk in iter_ics(entries, calendar, room_legend, cache, compact):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def _generate_ics_icalendar(
+    entries: list[ScheduleEntry],
+    entry_dates: list[tuple[date, ...]],
+    room_legend: dict[str, str] | None,
+    dtstamp: datetime,
+) -> bytes:
+    # Only the reference backend needs icalendar; it is slow to import
+    from icalendar import Calendar, Event
+
     cal = Calendar()
     cal.add("prodid", "-//FMI Cal Generator//UBB Cluj//RO")
     cal.add("version", "2.0")
     cal.add("x-wr-calname", "FMI Schedule")
     cal.add("x-wr-timezone", "Europe/Bucharest")
 
-    for entry in entries:
-        dates = get_dates_for_entry(entry, calendar)
+    for entry, dates in zip(entries, entry_dates):
         prefix = TYPE_PREFIX.get(entry.event_type, "")
 
         for event_date in dates:
             event = Event()
+            event.add("uid", event_uid(entry, event_date))
+            event.add("dtstamp", dtstamp)
             event.add("summary", f"{prefix} {entry.subject}")
             event.add(
                 "dtstart",
@@ -121,13 +224,83 @@ def generate_ics(
                 ),
             )
             if entry.room:
-                loc = entry.room
-                if room_legend and entry.room in room_legend:
-                    loc = f"{entry.room}, {room_legend[entry.room]}"
-                event.add("location", loc)
+                event.add("location", event_location(entry, room_legend))
             if entry.professor:
                 event.add("description", entry.professor)
 
             cal.add_component(event)
 
     return cal.to_ical()
+
+
+def expand_ics_occurrences(ics_bytes: bytes) -> list[tuple]:
+    """Expand every VEVENT of an .ics file, following RRULE and EXDATE.
+
+    Returns sorted (summary, start, end, location, description) tuples,
+    with start and end as local wall-clock times.
+    """
+    from dateutil.rrule import rrulestr
+    from icalendar import Calendar
+
+    occurrences: list[tuple] = []
+    for event in Calendar.from_ical(ics_bytes).walk("VEVENT"):
+        start = event.decoded("dtstart")
+        duration = event.decoded("dtend") - start
+        details = (
+            str(event.get("location", "")),
+            str(event.get("description", "")),
+        )
+
+        starts = [start]
+        rrule = event.get("rrule")
+        if rrule is not None:
+            rule = rrulestr(rrule.to_ical().decode("utf-8"), dtstart=start)
+            exdate_props = event.get("exdate", [])
+            if not isinstance(exdate_props, list):
+                exdate_props = [exdate_props]
+            excluded = {
+                d.dt.replace(tzinfo=None) for prop in exdate_props for d in prop.dts
+            }
+            starts = [dt for dt in rule if dt.replace(tzinfo=None) not in excluded]
+
+        for dt in starts:
+            occurrences.append((
+                str(event.get("summary")),
+                dt.replace(tzinfo=None),
+                (dt + duration).replace(tzinfo=None),
+                *details,
+            ))
+    return sorted(occurrences)
+
+
+def verify_compact_ics(
+    ics_bytes: bytes,
+    entries: list[ScheduleEntry],
+    calendar: AcademicCalendar | TeachingCalendarIndex,
+    room_legend: dict[str, str] | None = None,
+) -> list[str]:
+    """Check that an .ics file expands to exactly the entries' occurrences.
+
+    The expected occurrences come from get_dates_for_entry. Returns a
+    description of each missing or unexpected occurrence; an empty list
+    means the calendar is correct.
+    """
+    index = build_teaching_index(calendar)
+    expected: list[tuple] = []
+    for entry in entries:
+        summary = f"{TYPE_PREFIX.get(entry.event_type, '')} {entry.subject}"
+        location = event_location(entry, room_legend) if entry.room else ""
+        for d in get_dates_for_entry(entry, index):
+            expected.append((
+                summary,
+                datetime(d.year, d.month, d.day, entry.start_hour),
+                datetime(d.year, d.month, d.day, entry.end_hour),
+                location,
+                entry.professor,
+            ))
+
+    actual = Counter(expand_ics_occurrences(ics_bytes))
+    wanted = Counter(expected)
+    problems = [f"missing: {occ}" for occ in sorted((wanted - actual).elements())]
+    problems += [f"unexpected: {occ}" for occ in sorted((actual - wanted).elements())]
+    return problems
@@ -1,21 +1,29 @@
 import argparse
+import importlib
 import sys
 from pathlib import Path
 
-from InquirerPy import inquirer
-from InquirerPy.base.control import Choice
-
-from .academic import fetch_academic_calendar, get_study_line
-from .calendar_gen import apply_user_filters, filter_entries_for_student, generate_ics
+from .academic import get_default_repository, get_study_line
+from .calendar_gen import apply_user_filters, filter_entries_for_student, write_ics
 from .config import load_config, save_config
-from .models import EventType, UserPreferences
-from .scraper import fetch_group_schedules, fetch_specializations, get_schedule_base_url
+from .metadata import MetadataCache
+from .models import EventType, Specialization, UserPreferences
+from .scraper import fetch_group_schedules, parse_semester
+
+# Subcommand name -> module (relative to this package) with a main(argv)
+SUBCOMMANDS = {
+    "batch": ".batch",
+    "serve": ".server",
+}
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         prog="fmi-cal",
         description="Generate Google Calendar .ics files from UBB Cluj CS schedules",
+        epilog="Subcommands: " + ", ".join(
+            f"fmi-cal {name} --help" for name in SUBCOMMANDS
+        ),
     )
     parser.add_argument("--spec", help="Specialization code (e.g. IE2)")
     parser.add_argument("--group", help="Group number (e.g. 923)")
@@ -26,30 +34,52 @@ def parse_args() -> argparse.Namespace:
         help="Include all events without filtering",
     )
     parser.add_argument("--output", "-o", help="Output .ics file path")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write recurring events (RRULE + EXDATE) instead of one event per occurrence",
+    )
     parser.add_argument(
         "--semester",
+        type=parse_semester,
         help="Semester override (e.g. 2025-2)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore the cached schedule URL and specialization list and fetch them again",
+    )
+    return parser.parse_args(argv)
+
 
+def _inquirer():
+    """Import InquirerPy for a prompt; fully specified runs never load it."""
+    from InquirerPy import inquirer
+    from InquirerPy.base.control import Choice
 
-def _parse_semester_arg(semester_str: str) -> tuple[int, int]:
-    """Parse '2025-2' into (2025, 2)."""
-    parts = semester_str.split("-")
-    return int(parts[0]), int(parts[1])
+    return inquirer, Choice
 
 
-def main() -> None:
-    args = parse_args()
+def main(argv: list[str] | None = None) -> None:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in SUBCOMMANDS:
+        module = importlib.import_module(SUBCOMMANDS[argv[0]], __package__)
+        module.main(argv[1:])
+        return
+
+    args = parse_args(argv)
     saved = load_config()
 
     # 1. Determine semester / base URL
-    year, sem = None, None
-    if args.semester:
-        year, sem = _parse_semester_arg(args.semester)
+    year, sem = args.semester or (None, None)
+
+    metadata = MetadataCache()
+    if args.refresh:
+        metadata.clear()
 
     print("Detecting schedule URL...", flush=True)
-    base_url = get_schedule_base_url(year, sem)
+    base_url = metadata.schedule_base_url(year, sem)
     print(f"Using: {base_url}")
 
     # Derive semester number from base URL for academic calendar
@@ -61,6 +91,7 @@ def main() -> None:
 
     if not spec_code:
         if saved:
+            inquirer, Choice = _inquirer()
             use_saved = inquirer.confirm(
                 message=f"Use saved config? (spec={saved.spec_code}, group={saved.group}, subgroup={saved.subgroup})",
                 default=True,
@@ -69,10 +100,13 @@ def main() -> None:
                 spec_code = saved.spec_code
 
         if not spec_code:
-            spec_code, spec_name = _interactive_pick_specialization(base_url)
+            print("Fetching specializations...", flush=True)
+            spec_code, spec_name = _interactive_pick_specialization(
+                metadata.specializations(base_url)
+            )
     else:
         # If spec_code was provided via CLI, try to find the name
-        specs = fetch_specializations(base_url)
+        specs = metadata.specializations(base_url)
         for s in specs:
             if s.code == spec_code:
                 spec_name = s.name
@@ -93,6 +127,7 @@ def main() -> None:
         if saved and saved.spec_code == spec_code and saved.group in available_groups:
             group = saved.group
         else:
+            inquirer, Choice = _inquirer()
             group = inquirer.select(
                 message="Select your group:",
                 choices=available_groups,
@@ -104,6 +139,7 @@ def main() -> None:
         if saved and saved.spec_code == spec_code and saved.group == group:
             subgroup = saved.subgroup
         else:
+            inquirer, Choice = _inquirer()
             sub_choice = inquirer.select(
                 message="Select your subgroup:",
                 choices=[
@@ -133,6 +169,7 @@ def main() -> None:
         # Use saved filters if same spec/group
         use_saved_filters = False
         if saved and saved.spec_code == spec_code and saved.group == group:
+            inquirer, Choice = _inquirer()
             use_saved_filters = inquirer.confirm(
                 message="Use saved event filters?",
                 default=True,
@@ -143,6 +180,7 @@ def main() -> None:
             excluded_subjects = saved.excluded_subjects
         else:
             # Pass 1: pick event types
+            inquirer, Choice = _inquirer()
             include_types_str = inquirer.checkbox(
                 message="Include which event types? (space to toggle, enter to confirm)",
                 choices=[
@@ -178,18 +216,22 @@ def main() -> None:
     entries = apply_user_filters(entries, include_types, excluded_subjects)
     print(f"After filtering: {len(entries)} entries")
 
-    # 8. Generate .ics
+    # 8. Academic calendar
     study_line = get_study_line(spec_code, spec_name)
     print(f"Study line: {study_line} (semester {semester_num})")
     print("Fetching academic calendar...", flush=True)
-    acad_cal = fetch_academic_calendar(study_line, semester_num)
-
+    acad_cal = get_default_repository().get(study_line, semester_num)
+
+    # 9. Generate + write output
+    try:
+        room_legend = metadata.room_legend(base_url)
+    except Exception as e:
+        print(f"WARNING: Could not fetch room legend: {e}", flush=True)
+        room_legend = None
     print("Generating calendar...", flush=True)
-    ics_bytes = generate_ics(entries, acad_cal)
-
-    # 9. Write output
     output_path = args.output or f"{spec_code}_{group}.ics"
-    Path(output_path).write_bytes(ics_bytes)
+    with Path(output_path).open("wb") as f:
+        write_ics(f, entries, acad_cal, room_legend, compact=args.compact)
     print(f"Calendar saved to {output_path}")
 
     # 10. Save preferences
@@ -205,17 +247,15 @@ def main() -> None:
     print("Preferences saved.")
 
 
-def _interactive_pick_specialization(base_url: str) -> tuple[str, str]:
+def _interactive_pick_specialization(specs: list[Specialization]) -> tuple[str, str]:
     """Interactive specialization picker. Returns (code, name)."""
-    print("Fetching specializations...", flush=True)
-    specs = fetch_specializations(base_url)
-
     # Group by name
     by_name: dict[str, list] = {}
     for s in specs:
         by_name.setdefault(s.name, []).append(s)
 
     # Pick specialization name
+    inquirer, Choice = _inquirer()
     name = inquirer.select(
         message="Select specialization:",
         choices=list(by_name.keys()),
@@ -1,8 +1,6 @@
 from pathlib import Path
 
-import yaml
-
-from .models import UserPreferences
+from .models import EventType, UserPreferences
 
 CONFIG_DIR = Path.home() / ".config" / "fmi-cal"
 CONFIG_FILE = CONFIG_DIR / "config.yaml"
@@ -12,23 +10,39 @@ def load_config() -> UserPreferences | None:
     """Load saved preferences. Return None if no config file exists."""
     if not CONFIG_FILE.exists():
         return None
+    import yaml
+
     try:
         data = yaml.safe_load(CONFIG_FILE.read_text())
         if not isinstance(data, dict):
             return None
-        return UserPreferences(
-            spec_code=data["spec_code"],
-            group=str(data["group"]),
-            subgroup=str(data["subgroup"]) if data.get("subgroup") else None,
-            include_types=data.get("include_types", ["Curs", "Seminar", "Laborator"]),
-            excluded_subjects=data.get("excluded_subjects", []),
-        )
-    except (KeyError, yaml.YAMLError):
+        return preferences_from_dict(data)
+    except (KeyError, ValueError, yaml.YAMLError):
         return None
 
 
+def preferences_from_dict(data: dict) -> UserPreferences:
+    """Build UserPreferences from a config/batch mapping.
+
+    Raises KeyError if spec_code or group is missing and ValueError for an
+    unknown event type.
+    """
+    include_types = data.get("include_types") or [t.value for t in EventType]
+    for t in include_types:
+        EventType(t)
+    return UserPreferences(
+        spec_code=str(data["spec_code"]),
+        group=str(data["group"]),
+        subgroup=str(data["subgroup"]) if data.get("subgroup") else None,
+        include_types=list(include_types),
+        excluded_subjects=list(data.get("excluded_subjects") or []),
+    )
+
+
 def save_config(prefs: UserPreferences) -> None:
     """Save preferences to YAML config file."""
+    import yaml
+
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     data = {
         "spec_code": prefs.spec_code,
@@ -0,0 +1,405 @@
+"""Shared HTTP client with keep-alive connection pooling and retries."""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = 15       # seconds
+DEFAULT_POOL_SIZE = 10     # connections kept alive per host
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5      # sleeps 0.5s, 1s, 2s between retries
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "fmi-cal"
+
+
+class CacheMissError(requests.RequestException):
+    """Raised in offline mode when a URL has no cached response."""
+
+
+@dataclass
+class CachedResponse:
+    """A page body with its validators, as stored in the cache."""
+    url: str
+    body: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass
+class HttpStats:
+    """Traffic counters of an HttpClient."""
+    requests: int = 0           # GET/HEAD requests sent
+    bytes_received: int = 0     # body bytes downloaded by fetch()
+    cache_hits: int = 0         # fetch() served from the cache (304 or offline)
+    cache_misses: int = 0       # fetch() with a cache that had to download the body
+
+    def hit_rate(self) -> float | None:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+
+class HttpCache:
+    """On-disk store of response bodies with their validators.
+
+    Each URL is stored as two files named after its SHA-256: the raw body
+    and a small JSON sidecar with the ETag / Last-Modified headers.
+    Writes go through a temporary file and os.replace, so concurrent
+    readers never see a partial entry.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.body", self.directory / f"{key}.json"
+
+    def load(self, url: str) -> CachedResponse | None:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return CachedResponse(
+            url=url,
+            body=body,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        body_path, meta_path = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified}
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+class HttpClient:
+    """A pooled requests.Session that can be shared between threads.
+
+    Size the pool to the number of worker threads that will use the
+    client, so every worker keeps its own keep-alive connection.
+
+    With a cache_dir, fetch() stores page bodies on disk and revalidates
+    them with If-None-Match / If-Modified-Since. With offline=True, fetch()
+    replays cached bodies only and every network call raises
+    CacheMissError.
+
+    stats counts requests, downloaded bytes and cache hits across threads.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF,
+        cache_dir: Path | None = None,
+        offline: bool = False,
+    ) -> None:
+        if offline and cache_dir is None:
+            raise ValueError("Offline mode requires a cache directory")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.offline = offline
+        self.stats = HttpStats()
+        self._stats_lock = threading.Lock()
+        self.cache = HttpCache(cache_dir) if cache_dir is not None else None
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def get(self, url: str, timeout: float | None = None, **kwargs) -> requests.Response:
+        if self.offline:
+            raise CacheMissError(f"Offline mode: not fetching {url}")
+        self._count(requests=1)
+        return self._session.get(url, timeout=timeout or self.timeout, **kwargs)
+
+    def head(self, url: str, timeout: float | None = None, **kwargs) -> requests.Response:
+        if self.offline:
+            raise CacheMissError(f"Offline mode: not fetching {url}")
+        self._count(requests=1)
+        return self._session.head(url, timeout=timeout or self.timeout, **kwargs)
+
+    def fetch(self, url: str, timeout: float | None = None) -> bytes:
+        """GET a page and return its body, going through the cache if enabled."""
+        return self.fetch_response(url, timeout).body
+
+    def fetch_response(self, url: str, timeout: float | None = None) -> CachedResponse:
+        """Like fetch, but also return the page's ETag and Last-Modified.
+
+        A page served from the cache keeps the validators it was stored with.
+        An error status (anything but 2xx, or 304 for a cached page) raises
+        requests.HTTPError and leaves the cached copy in place, so an error
+        page is never returned as the page body.
+        """
+        if self.cache is None:
+            resp = self.get(url, timeout=timeout)
+            return self._received(url, None, resp.status_code, resp.content, resp.headers)
+
+        cached = self.cache.load(url)
+        if self.offline:
+            return self._replay(url, cached)
+        resp = self.get(url, timeout=timeout, headers=_conditional_headers(cached))
+        return self._received(url, cached, resp.status_code, resp.content, resp.headers)
+
+    def _replay(self, url: str, cached: CachedResponse | None) -> CachedResponse:
+        """Serve a page from the cache in offline mode."""
+        if cached is None:
+            raise CacheMissError(f"Offline mode: no cached response for {url}")
+        self._count(cache_hits=1)
+        return cached
+
+    def _received(
+        self,
+        url: str,
+        cached: CachedResponse | None,
+        status: int,
+        body: bytes,
+        headers: Mapping[str, str],
+    ) -> CachedResponse:
+        """The page of a GET response: count it, check it and cache it."""
+        if status == 304 and cached is not None:
+            self._count(cache_hits=1)
+            return cached
+        if self.cache is None:
+            self._count(bytes_received=len(body))
+        else:
+            self._count(cache_misses=1, bytes_received=len(body))
+        if not 200 <= status < 300:
+            raise requests.HTTPError(f"HTTP {status} for url: {url}")
+        response = CachedResponse(
+            url=url,
+            body=body,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        if self.cache is not None:
+            self.cache.store(
+                url,
+                response.body,
+                etag=response.etag,
+                last_modified=response.last_modified,
+            )
+        return response
+
+    def _count(self, **increments: int) -> None:
+        with self._stats_lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _conditional_headers(cached: CachedResponse | None) -> dict[str, str]:
+    """Request headers that revalidate a cached page."""
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+_default_client: HttpClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """Return the process-wide client used when none is injected."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+class AsyncHttpClient:
+    """Async fetch() for coroutines on one event loop, over httpx.
+
+    Needs the optional httpx package (pip install fmi-cal-generator[async]);
+    async_fetcher picks this class when it is installed. At most
+    `concurrency` requests are in flight, sharing a pool of as many
+    keep-alive connections; the others wait their turn.
+
+    Timeout, retries, the on-disk cache, offline mode and stats are those of
+    the wrapped HttpClient, so async and blocking fetches share them. A
+    client created here (client=None) is closed with this one.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient | None = None,
+        concurrency: int = DEFAULT_POOL_SIZE,
+        transport: "httpx.AsyncBaseTransport | None" = None,
+    ) -> None:
+        import httpx
+
+        self._owns_client = client is None
+        self.client = client or HttpClient(pool_size=concurrency)
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+            timeout=self.client.timeout,
+            follow_redirects=True,
+            transport=transport,
+        )
+
+    async def fetch(self, url: str, timeout: float | None = None) -> bytes:
+        return (await self.fetch_response(url, timeout)).body
+
+    async def fetch_response(self, url: str, timeout: float | None = None) -> CachedResponse:
+        """Like HttpClient.fetch_response."""
+        client = self.client
+        cached = client.cache.load(url) if client.cache is not None else None
+        if client.offline:
+            return client._replay(url, cached)
+        resp = await self._get(url, _conditional_headers(cached), timeout)
+        return client._received(url, cached, resp.status_code, resp.content, resp.headers)
+
+    async def _get(self, url: str, headers: dict[str, str], timeout: float | None):
+        """GET with the wrapped client's retries and exponential backoff."""
+        import httpx
+
+        client = self.client
+        kwargs = {"timeout": timeout} if timeout else {}
+        client._count(requests=1)
+        for attempt in range(client.retries + 1):
+            if attempt:
+                await asyncio.sleep(client.backoff_factor * 2 ** (attempt - 1))
+            last = attempt == client.retries
+            try:
+                async with self._semaphore:
+                    resp = await self._session.get(url, headers=headers, **kwargs)
+            except httpx.TransportError as exc:
+                if last:
+                    raise requests.ConnectionError(f"{exc!r} for url: {url}") from exc
+                continue
+            if last or resp.status_code not in RETRY_STATUSES:
+                return resp
+
+    async def aclose(self) -> None:
+        await self._session.aclose()
+        if self._owns_client:
+            self.client.close()
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+class ThreadPoolFetcher:
+    """Awaitable fetch() over a thread pool running HttpClient.
+
+    The fallback of async_fetcher when httpx is not installed: every fetch
+    is a blocking HttpClient.fetch (pooled, retried and cached) on a private
+    pool of `concurrency` threads, which bounds the requests in flight. A
+    client created here (client=None) is closed with this one.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient | None = None,
+        concurrency: int = DEFAULT_POOL_SIZE,
+    ) -> None:
+        self._owns_client = client is None
+        self.client = client or HttpClient(pool_size=concurrency)
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="fmi-cal-fetch"
+        )
+
+    async def fetch(self, url: str, timeout: float | None = None) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(self.client.fetch, url, timeout)
+        )
+
+    async def fetch_response(self, url: str, timeout: float | None = None) -> CachedResponse:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(self.client.fetch_response, url, timeout)
+        )
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+        if self._owns_client:
+            self.client.close()
+
+    async def __aenter__(self) -> "ThreadPoolFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+AsyncFetcher = AsyncHttpClient | ThreadPoolFetcher
+
+
+def async_fetcher(
+    client: HttpClient | None = None, concurrency: int = DEFAULT_POOL_SIZE
+) -> AsyncFetcher:
+    """An AsyncHttpClient if httpx is installed, else a ThreadPoolFetcher."""
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        return ThreadPoolFetcher(client, concurrency)
+    return AsyncHttpClient(client, concurrency)
@@ -0,0 +1,377 @@
+"""Direct RFC 5545 serializer for schedule entries.
+
+Emits the same text as worker/src/ics.js, without building an icalendar
+object graph.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from .academic import TeachingCalendarIndex, build_teaching_index
+from .models import AcademicCalendar, EventType, Frequency, ScheduleEntry
+
+TYPE_PREFIX = {
+    EventType.CURS: "[C]",
+    EventType.SEMINAR: "[S]",
+    EventType.LABORATOR: "[L]",
+}
+
+# Europe/Bucharest timezone definition (EET/EEST)
+# RFC 5545 §3.6.5: VTIMEZONE MUST be specified for each TZID referenced
+VTIMEZONE_BUCHAREST = (
+    "BEGIN:VTIMEZONE",
+    "TZID:Europe/Bucharest",
+    "BEGIN:STANDARD",
+    "DTSTART:19701025T040000",
+    "RRULE:FREQ=YEARLY;BYDAY=-1SU;BYMONTH=10",
+    "TZOFFSETFROM:+0300",
+    "TZOFFSETTO:+0200",
+    "TZNAME:EET",
+    "END:STANDARD",
+    "BEGIN:DAYLIGHT",
+    "DTSTART:19700329T030000",
+    "RRULE:FREQ=YEARLY;BYDAY=-1SU;BYMONTH=3",
+    "TZOFFSETFROM:+0200",
+    "TZOFFSETTO:+0300",
+    "TZNAME:EEST",
+    "END:DAYLIGHT",
+    "END:VTIMEZONE",
+)
+
+CALENDAR_HEADER = (
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//FMI Cal Generator//UBB Cluj//RO",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+    "X-WR-CALNAME:FMI Schedule",
+    "X-WR-TIMEZONE:Europe/Bucharest",
+) + VTIMEZONE_BUCHAREST
+
+CALENDAR_FOOTER = "END:VCALENDAR"
+
+# DTSTAMP when nothing better is known; never the wall clock, so the same
+# input always serializes to the same bytes (see source_dtstamp)
+DEFAULT_DTSTAMP = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_SLUG_SPACES = re.compile(r"\s+")
+_SLUG_INVALID = re.compile(r"[^a-zA-Z0-9\-]")
+
+
+def ics_escape(s: str) -> str:
+    """Escape a TEXT property value (RFC 5545 §3.3.11)."""
+    return (
+        s.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def ics_fold(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 §3.1).
+
+    Counts UTF-8 bytes and never splits a multi-byte sequence.
+    """
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+
+    parts: list[str] = []
+    offset = 0
+    limit = 75
+    while len(data) - offset > limit:
+        split_at = offset + limit
+        # Back up over UTF-8 continuation bytes (10xxxxxx)
+        while split_at > offset and (data[split_at] & 0xC0) == 0x80:
+            split_at -= 1
+        parts.append(data[offset:split_at].decode("utf-8"))
+        offset = split_at
+        limit = 74  # continuation lines have a leading space
+    parts.append(data[offset:].decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def format_dtstamp(moment: datetime) -> str:
+    """Format a datetime as a UTC DATE-TIME value (e.g. 20260223T080000Z)."""
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def source_dtstamp(
+    calendar: AcademicCalendar | TeachingCalendarIndex,
+    last_modified: str | None = None,
+) -> datetime:
+    """DTSTAMP for events built from a schedule page and academic calendar.
+
+    Derived from the source data, not the clock: the schedule page's HTTP
+    Last-Modified time, so the stamp moves when the schedule is edited.
+    Without a usable Last-Modified, midnight UTC of the first teaching day.
+    Rebuilding from unchanged inputs then yields identical bytes, which
+    keeps ETags, diffs and client sync stable.
+    """
+    if last_modified:
+        try:
+            modified = parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            modified = None
+        if modified is not None:
+            # HTTP dates are always GMT
+            if modified.tzinfo is None:
+                return modified.replace(tzinfo=timezone.utc)
+            return modified.astimezone(timezone.utc)
+    dates = build_teaching_index(calendar).dates.values()
+    first = min((ds[0] for ds in dates if ds), default=None)
+    if first is None:
+        return DEFAULT_DTSTAMP
+    return datetime(first.year, first.month, first.day, tzinfo=timezone.utc)
+
+
+def event_uid(entry: ScheduleEntry, event_date: date) -> str:
+    """Build the UID the worker uses: date, start hour, subject slug and type."""
+    slug = _SLUG_INVALID.sub("", _SLUG_SPACES.sub("-", entry.subject))
+    return (
+        f"{event_date:%Y%m%d}T{entry.start_hour:02d}-{slug}"
+        f"-{entry.event_type.value}@fmi-cal"
+    )
+
+
+def event_location(entry: ScheduleEntry, room_legend: dict[str, str] | None) -> str:
+    """Room code, enriched with its address from the legend when known."""
+    if room_legend and entry.room in room_legend:
+        return f"{entry.room}, {room_legend[entry.room]}"
+    return entry.room
+
+
+def serialize_events(
+    entry: ScheduleEntry,
+    dates: tuple[date, ...] | list[date],
+    room_legend: dict[str, str] | None,
+    dtstamp: str,
+    extra: Iterable[str] = (),
+) -> list[str]:
+    """Return the content lines of one VEVENT per occurrence of an entry.
+
+    extra holds more property lines (e.g. RRULE, EXDATE), written into
+    every event right after DTEND.
+    """
+    prefix = TYPE_PREFIX.get(entry.event_type, "")
+    summary = ics_fold(f"SUMMARY:{ics_escape(f'{prefix} {entry.subject}')}")
+    location = (
+        ics_fold(f"LOCATION:{ics_escape(event_location(entry, room_legend))}")
+        if entry.room
+        else None
+    )
+    description = (
+        ics_fold(f"DESCRIPTION:{ics_escape(entry.professor)}")
+        if entry.professor
+        else None
+    )
+    start = f"T{entry.start_hour:02d}0000"
+    end = f"T{entry.end_hour:02d}0000"
+    extra = list(extra)
+
+    lines: list[str] = []
+    for event_date in dates:
+        d = f"{event_date:%Y%m%d}"
+        lines.append("BEGIN:VEVENT")
+        lines.append(f"DTSTAMP:{dtstamp}")
+        lines.append(ics_fold(f"UID:{event_uid(entry, event_date)}"))
+        lines.append(f"DTSTART;TZID=Europe/Bucharest:{d}{start}")
+        lines.append(f"DTEND;TZID=Europe/Bucharest:{d}{end}")
+        lines.extend(extra)
+        lines.append(summary)
+        if location is not None:
+            lines.append(location)
+        if description is not None:
+            lines.append(description)
+        lines.append("SEQUENCE:0")
+        lines.append("END:VEVENT")
+    return lines
+
+
+def recurrence_runs(
+    dates: tuple[date, ...] | list[date], interval_weeks: int
+) -> list[tuple[date, int, list[date]]]:
+    """Split sorted occurrence dates into weekly recurrences.
+
+    Returns (first date, COUNT, EXDATEs) per run. A run continues while
+    the gap to the next date is a whole number of intervals; the skipped
+    dates (holidays, a vacation week) become EXDATEs. Any other gap, such
+    as a vacation that shifts week parity, starts a new run, so parity
+    entries get one run per teaching period.
+    """
+    step = timedelta(weeks=interval_weeks)
+    runs: list[tuple[date, int, list[date]]] = []
+    start: date | None = None
+    count = 0
+    exdates: list[date] = []
+    previous: date | None = None
+
+    for current in dates:
+        if previous is not None and (current - previous) % step == timedelta(0):
+            skipped = previous + step
+            while skipped < current:
+                exdates.append(skipped)
+                skipped += step
+                count += 1
+            count += 1
+        else:
+            if start is not None:
+                runs.append((start, count, exdates))
+            start, count, exdates = current, 1, []
+        previous = current
+
+    if start is not None:
+        runs.append((start, count, exdates))
+    return runs
+
+
+def serialize_recurring_events(
+    entry: ScheduleEntry,
+    dates: tuple[date, ...] | list[date],
+    room_legend: dict[str, str] | None,
+    dtstamp: str,
+) -> list[str]:
+    """Return one VEVENT per recurrence run of an entry (compact mode).
+
+    Each run becomes RRULE:FREQ=WEEKLY with INTERVAL 1 (every week) or 2
+    (odd/even weeks) and a COUNT, plus EXDATEs for the skipped dates. A
+    run with a single date is written as a plain event.
+    """
+    interval = 1 if entry.frequency == Frequency.EVERY_WEEK else 2
+    start = f"T{entry.start_hour:02d}0000"
+    lines: list[str] = []
+    for first, count, exdates in recurrence_runs(dates, interval):
+        extra: list[str] = []
+        if count > 1:
+            extra.append(f"RRULE:FREQ=WEEKLY;INTERVAL={interval};COUNT={count}")
+            if exdates:
+                values = ",".join(f"{d:%Y%m%d}{start}" for d in exdates)
+                extra.append(ics_fold(f"EXDATE;TZID=Europe/Bucharest:{values}"))
+        lines.extend(serialize_events(entry, (first,), room_legend, dtstamp, extra))
+    return lines
+
+
+def iter_calendar(
+    entries: Iterable[ScheduleEntry],
+    entry_dates: Iterable[tuple[date, ...]],
+    room_legend: dict[str, str] | None = None,
+    dtstamp: datetime | None = None,
+    compact: bool = False,
+) -> Iterator[bytes]:
+    """Yield an .ics file in chunks: the header, one chunk per entry, the footer.
+
+    Each entry chunk holds all VEVENTs for that entry, so only one entry is
+    materialized at a time. With compact=True, entries are written as
+    recurring events (see serialize_recurring_events).
+    """
+    stamp = format_dtstamp(dtstamp or DEFAULT_DTSTAMP)
+    serialize = serialize_recurring_events if compact else serialize_events
+    yield ("\r\n".join(CALENDAR_HEADER) + "\r\n").encode("utf-8")
+    for entry, dates in zip(entries, entry_dates):
+        if dates:
+            lines = serialize(entry, dates, room_legend, stamp)
+            yield ("\r\n".join(lines) + "\r\n").encode("utf-8")
+    yield (CALENDAR_FOOTER + "\r\n").encode("utf-8")
+
+
+def serialize_calendar(
+    entries: list[ScheduleEntry],
+    entry_dates: list[tuple[date, ...]],
+    room_legend: dict[str, str] | None = None,
+    dtstamp: datetime | None = None,
+    compact: bool = False,
+) -> bytes:
+    """Serialize entries and their occurrence dates to an .ics file."""
+    return b"".join(
+        iter_calendar(entries, entry_dates, room_legend, dtstamp, compact)
+    )
+
+
+class EventBlockCache:
+    """Serialized VEVENT blocks, shared by every calendar of a build.
+
+    A year-wide course appears in the entries of every group and of each
+    subgroup variant. The cache expands and serializes each distinct
+    (entry, teaching index) pair once and hands out the same bytes after
+    that. Blocks depend on the room legend and DTSTAMP too, so these are
+    fixed for the lifetime of the cache, as is the output mode (compact).
+    Without an explicit dtstamp, each index's source_dtstamp is used.
+
+    The cache may be shared by threads: blocks are only ever added, and
+    two threads racing on a miss serialize the same bytes. The hits,
+    misses and events counters are not locked, so with several threads
+    they are approximate.
+    """
+
+    def __init__(
+        self,
+        room_legend: dict[str, str] | None = None,
+        dtstamp: datetime | None = None,
+        compact: bool = False,
+    ) -> None:
+        self.room_legend = room_legend
+        self.compact = compact
+        self.dtstamp = format_dtstamp(dtstamp) if dtstamp is not None else None
+        self.hits = 0
+        self.misses = 0
+        self.events = 0     # VEVENTs handed out, hits included
+        # Keyed by value: an index rebuilt from the same calendar still hits
+        self._blocks: dict[tuple[ScheduleEntry, TeachingCalendarIndex], tuple[bytes, int]] = {}
+        self._stamps: dict[TeachingCalendarIndex, str] = {}
+
+    def block(self, entry: ScheduleEntry, index: TeachingCalendarIndex) -> bytes:
+        """Return the VEVENTs of one entry (empty if it has no dates)."""
+        key = (entry, index)
+        cached = self._blocks.get(key)
+        if cached is not None:
+            self.hits += 1
+            self.events += cached[1]
+            return cached[0]
+
+        self.misses += 1
+        dates = index.dates_for(entry)
+        block = b""
+        n_events = 0
+        if dates:
+            stamp = self.dtstamp or self._stamp_for(index)
+            serialize = serialize_recurring_events if self.compact else serialize_events
+            lines = serialize(entry, dates, self.room_legend, stamp)
+            block = ("\r\n".join(lines) + "\r\n").encode("utf-8")
+            n_events = lines.count("BEGIN:VEVENT")
+        self._blocks[key] = (block, n_events)
+        self.events += n_events
+        return block
+
+    def _stamp_for(self, index: TeachingCalendarIndex) -> str:
+        stamp = self._stamps.get(index)
+        if stamp is None:
+            stamp = self._stamps[index] = format_dtstamp(source_dtstamp(index))
+        return stamp
+
+    def iter_calendar(
+        self, entries: Iterable[ScheduleEntry], index: TeachingCalendarIndex
+    ) -> Iterator[bytes]:
+        """Like iter_calendar, with the event blocks taken from the cache."""
+        return self.iter_mixed_calendar((entry, index) for entry in entries)
+
+    def iter_mixed_calendar(
+        self, items: Iterable[tuple[ScheduleEntry, TeachingCalendarIndex]]
+    ) -> Iterator[bytes]:
+        """Yield one calendar combining entries expanded with different indexes."""
+        yield ("\r\n".join(CALENDAR_HEADER) + "\r\n").encode("utf-8")
+        for entry, index in items:
+            block = self.block(entry, index)
+            if block:
+                yield block
+        yield (CALENDAR_FOOTER + "\r\n").encode("utf-8")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "blocks": len(self._blocks),
+            "events": self.events,
+        }
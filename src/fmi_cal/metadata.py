@@ -0,0 +1,131 @@
+"""Small on-disk cache of schedule metadata, so repeat CLI runs skip lookups.
+
+Stored in ~/.config/fmi-cal/metadata.json, each entry with an expiry time:
+
+  - the schedule base URL resolved for a semester (saves the HEAD request
+    and the redirect page of get_schedule_base_url), once confirmed
+  - the specialization list of a base URL
+  - the room legend of a base URL
+
+Lists are keyed by their base URL, and a semester's base URL by the
+semester, so a new semester never sees the previous one's data. Resolving
+a new base URL drops the entries of every other one.
+"""
+
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from .config import CONFIG_DIR
+from .http_client import HttpClient
+from .models import Specialization
+from .scraper import (
+    fetch_room_legend,
+    fetch_specializations,
+    guess_semester,
+    resolve_schedule_base_url,
+)
+
+DEFAULT_METADATA_FILE = CONFIG_DIR / "metadata.json"
+DEFAULT_TTL = 24 * 3600     # seconds
+
+
+class MetadataCache:
+    """JSON file of resolved base URLs and parsed index pages, with a TTL.
+
+    A missing, unreadable or corrupt file behaves like an empty cache, and
+    a failed write is ignored: the cache only ever saves requests.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_METADATA_FILE,
+        ttl: float = DEFAULT_TTL,
+        client: HttpClient | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.client = client
+        self._entries: dict[str, dict] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                entries = data.get("entries") if isinstance(data, dict) else None
+            except (OSError, ValueError):
+                entries = None
+            self._entries = entries if isinstance(entries, dict) else {}
+        return self._entries
+
+    def get(self, key: str):
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self._load().get(key)
+        if not isinstance(entry, dict) or entry.get("expires", 0) <= time.time():
+            return None
+        return entry.get("value")
+
+    def put(self, key: str, value) -> None:
+        self._load()[key] = {"expires": time.time() + self.ttl, "value": value}
+        self.save()
+
+    def clear(self) -> None:
+        self._entries = {}
+        self.path.unlink(missing_ok=True)
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".metadata-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"entries": self._load()}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    # --- Cached lookups ---
+
+    def schedule_base_url(self, year: int | None = None, semester: int | None = None) -> str:
+        """Cached get_schedule_base_url for a semester (default: the current one).
+
+        A URL the site did not confirm (an unvalidated guess) is returned
+        but not cached, so the next run looks it up again.
+        """
+        year, semester = guess_semester(year, semester)
+        key = f"base_url/{year}-{semester}"
+        base_url = self.get(key)
+        if base_url is None:
+            base_url, confirmed = resolve_schedule_base_url(year, semester, self.client)
+            if confirmed:
+                self._forget_other_base_urls(base_url)
+                self.put(key, base_url)
+        return base_url
+
+    def specializations(self, base_url: str) -> list[Specialization]:
+        """Cached fetch_specializations."""
+        key = f"specializations/{base_url}"
+        cached = self.get(key)
+        if cached is not None:
+            return [Specialization(**spec) for spec in cached]
+        specs = fetch_specializations(base_url, self.client)
+        self.put(key, [asdict(spec) for spec in specs])
+        return specs
+
+    def room_legend(self, base_url: str) -> dict[str, str]:
+        """Cached fetch_room_legend."""
+        key = f"room_legend/{base_url}"
+        cached = self.get(key)
+        if cached is None:
+            cached = fetch_room_legend(base_url, self.client)
+            self.put(key, cached)
+        return cached
+
+    def _forget_other_base_urls(self, base_url: str) -> None:
+        entries = self._load()
+        for key in list(entries):
+            kind, _, arg = key.partition("/")
+            if kind == "base_url" or arg != base_url:
+                del entries[key]
@@ -1,7 +1,13 @@
+import heapq
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import date
 from enum import Enum
 
+# Scraped models are frozen and slotted: no per-instance __dict__, safe to
+# share between groups and specs, and hashable so they can key memo caches.
+# Sequence fields are stored as tuples; lists passed in are converted.
+
 
 class EventType(Enum):
     CURS = "Curs"
@@ -15,7 +21,7 @@ class Frequency(Enum):
     WEEK_2 = "sapt. 2"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Specialization:
     name: str   # "Informatica - in limba engleza"
     code: str   # "IE2" (includes year)
@@ -23,7 +29,7 @@ class Specialization:
     href: str   # "IE2.html"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ScheduleEntry:
     day: str               # "Luni", "Marti", etc.
     start_hour: int        # 12
@@ -36,24 +42,72 @@ class ScheduleEntry:
     professor: str         # "Conf. STERCA Adrian"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class FormationIndex:
+    """Positions of a group's entries, bucketed by formation.
+
+    Each bucket is sorted, so merging buckets keeps the page order.
+    Built by calendar_gen.formation_index and SpecTable.student_rows.
+    """
+    year_wide: tuple[int, ...]                         # "IE2": the whole year
+    group: tuple[int, ...]                             # "921": the whole group
+    subgroups: tuple[tuple[str, tuple[int, ...]], ...]  # "921/1" -> ("1", ...)
+
+    @classmethod
+    def build(cls, formations: Iterable[str], group: str) -> "FormationIndex":
+        """Bucket positions in one pass, by each formation's relation to group."""
+        year_wide: list[int] = []
+        whole_group: list[int] = []
+        subgroups: dict[str, list[int]] = {}
+        for i, formation in enumerate(formations):
+            if not formation[0].isdigit():
+                year_wide.append(i)
+            elif formation == group:
+                whole_group.append(i)
+            elif "/" in formation and "/" not in group:
+                entry_group, entry_sub = formation.split("/", 1)
+                if entry_group == group:
+                    subgroups.setdefault(entry_sub, []).append(i)
+        return cls(
+            year_wide=tuple(year_wide),
+            group=tuple(whole_group),
+            subgroups=tuple((sub, tuple(pos)) for sub, pos in subgroups.items()),
+        )
+
+    def positions(self, subgroup: str | None) -> list[int]:
+        """Positions on the timetable of a subgroup (None: both subgroups)."""
+        buckets = [self.year_wide, self.group]
+        buckets.extend(
+            pos for sub, pos in self.subgroups if subgroup is None or sub == subgroup
+        )
+        return list(heapq.merge(*buckets))
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class GroupSchedule:
     group: str                       # "921"
-    entries: list[ScheduleEntry]
+    entries: tuple[ScheduleEntry, ...]
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "entries", tuple(self.entries))
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class TeachingPeriod:
     start: date
     end: date
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AcademicCalendar:
-    teaching_periods: list[TeachingPeriod]
-    holidays: list[date]
+    teaching_periods: tuple[TeachingPeriod, ...]
+    holidays: tuple[date, ...]
     semester_start: date
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "teaching_periods", tuple(self.teaching_periods))
+        object.__setattr__(self, "holidays", tuple(self.holidays))
+
 
 @dataclass
 class UserPreferences:
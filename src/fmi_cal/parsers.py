@@ -0,0 +1,116 @@
+"""Fast parser backends for schedule pages.
+
+Each backend turns a raw schedule page into (group name, rows) pairs,
+where every row is the stripped text of its <td> cells. The scraper turns
+rows into ScheduleEntry objects, so all backends share the same field
+parsing. The BeautifulSoup backend lives in scraper.py.
+
+- "stream": event-driven tokenizer on the stdlib html.parser; builds no DOM
+- "lxml":   libxml2 tree via lxml.html (optional dependency)
+"""
+
+import re
+from html.parser import HTMLParser
+
+ENCODING = "iso-8859-2"
+
+GROUP_HEADER = re.compile(r"Grupa\s+(\S+)")
+
+GroupRows = list[tuple[str, list[list[str]]]]
+
+
+class _ScheduleTokenizer(HTMLParser):
+    """Collect "Grupa NNN" headers and the <td> texts of the table after each.
+
+    Mirrors the BeautifulSoup walk: a group owns the first table that
+    starts after its <h1>, and a cell's text is the concatenation of its
+    stripped text pieces (like get_text(strip=True)).
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.groups: GroupRows = []
+        self._pending: list[str] = []      # headers waiting for their table
+        self._h1_text: list[str] | None = None
+        self._table_groups: list[str] = []
+        self._table_depth = 0
+        self._rows: list[list[str]] = []
+        self._row: list[str] | None = None
+        self._cell: list[str] | None = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "h1":
+            self._h1_text = []
+        elif tag == "table":
+            if self._table_depth == 0:
+                self._table_groups, self._pending = self._pending, []
+                self._rows = []
+            self._table_depth += 1
+        elif self._table_depth and self._table_groups:
+            if tag == "tr":
+                self._row = []
+            elif tag == "td" and self._row is not None:
+                self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag == "h1" and self._h1_text is not None:
+            match = GROUP_HEADER.search("".join(self._h1_text))
+            if match:
+                self._pending.append(match.group(1))
+            self._h1_text = None
+        elif tag == "table" and self._table_depth:
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                for group in self._table_groups:
+                    self.groups.append((group, self._rows))
+                self._table_groups = []
+        elif tag == "td" and self._cell is not None:
+            self._row.append("".join(self._cell))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self._rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        text = data.strip()
+        if not text:
+            return
+        if self._cell is not None:
+            self._cell.append(text)
+        if self._h1_text is not None:
+            self._h1_text.append(text)
+
+
+def extract_group_rows_stream(content: bytes) -> GroupRows:
+    """Tokenize a schedule page without building a DOM."""
+    tokenizer = _ScheduleTokenizer()
+    tokenizer.feed(content.decode(ENCODING, errors="replace"))
+    tokenizer.close()
+    return tokenizer.groups
+
+
+def extract_group_rows_lxml(content: bytes) -> GroupRows:
+    """Parse a schedule page with lxml (requires the lxml package)."""
+    import lxml.html
+
+    parser = lxml.html.HTMLParser(encoding=ENCODING)
+    root = lxml.html.document_fromstring(content, parser=parser)
+
+    groups: GroupRows = []
+    pending: list[str] = []
+    for el in root.iter("h1", "table"):
+        if el.tag == "h1":
+            text = "".join(t.strip() for t in el.itertext())
+            match = GROUP_HEADER.search(text)
+            if match:
+                pending.append(match.group(1))
+            continue
+        if not pending:
+            continue
+        rows = [
+            ["".join(t.strip() for t in td.itertext()) for td in tr.iter("td")]
+            for tr in el.iter("tr")
+        ]
+        groups.extend((group, rows) for group in pending)
+        pending = []
+    return groups
@@ -0,0 +1,141 @@
+"""Nested timing spans, written as a Chrome trace.
+
+The output opens in chrome://tracing, https://ui.perfetto.dev and
+https://www.speedscope.app. Spans are recorded only while a tracer is
+enabled; otherwise span() does nothing, so instrumented code pays almost
+nothing in normal runs:
+
+    tracer = profiling.enable()
+    with profiling.span("parse", spec="IE2"):
+        ...
+    tracer.write("trace.json")
+
+A tracer belongs to the process that enabled it. A worker process (even a
+forked one that inherited the parent's tracer) enables its own and sends
+tracer.events back, for the parent to extend() its tracer with.
+
+The module also merges cProfile statistics from several processes into
+one pstats file (see merge_cprofile_stats).
+"""
+
+import json
+import os
+import pstats
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class Tracer:
+    """Collects complete ("X") trace events of one process."""
+
+    def __init__(self, process_name: str | None = None) -> None:
+        self.pid = os.getpid()
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+        if process_name:
+            self.events.append({
+                "name": "process_name", "ph": "M", "pid": self.pid,
+                "args": {"name": process_name},
+            })
+
+    @contextmanager
+    def span(self, name: str, track: int | None = None, **args) -> Iterator[None]:
+        """Time the body as a span named name, with args shown in the viewer.
+
+        Spans nest per thread. Interleaved work on one thread (asyncio
+        tasks) should pass a track number per task, which the viewer
+        shows as a separate row.
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": (end - start) / 1000,
+                "pid": self.pid,
+                "tid": track if track is not None else threading.get_native_id(),
+            }
+            if args:
+                event["args"] = args
+            with self._lock:
+                self.events.append(event)
+
+    def extend(self, events: Iterable[dict]) -> None:
+        with self._lock:
+            self.events.extend(events)
+
+    def write(self, path: Path) -> None:
+        data = {"traceEvents": self.events, "displayTimeUnit": "ms"}
+        Path(path).write_text(json.dumps(data), encoding="utf-8")
+
+    def span_count(self) -> int:
+        return sum(1 for e in self.events if e["ph"] == "X")
+
+
+_tracer: Tracer | None = None
+
+
+def enable(process_name: str | None = None) -> Tracer:
+    """Start recording spans in this process and return the tracer."""
+    global _tracer
+    _tracer = Tracer(process_name)
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def enabled() -> bool:
+    """Whether this process (not just a parent it was forked from) is tracing."""
+    return _tracer is not None and _tracer.pid == os.getpid()
+
+
+def current() -> Tracer | None:
+    """The tracer of this process, if tracing is on."""
+    return _tracer if enabled() else None
+
+
+@contextmanager
+def span(name: str, track: int | None = None, **args) -> Iterator[None]:
+    """Tracer.span on the active tracer; a no-op when tracing is off."""
+    tracer = current()
+    if tracer is None:
+        yield
+        return
+    with tracer.span(name, track, **args):
+        yield
+
+
+class _RawStats:
+    """Adapter that lets pstats.Stats load a cProfile stats dict."""
+
+    def __init__(self, stats: dict) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def merge_cprofile_stats(stats: Iterable[dict], path: Path) -> None:
+    """Write the sum of several cProfile.Profile.stats dicts as one pstats file.
+
+    Call profiler.create_stats() before taking profiler.stats; the dicts
+    pickle, so worker processes can return them with their results.
+    """
+    merged = None
+    for item in stats:
+        if merged is None:
+            merged = pstats.Stats(_RawStats(item))
+        else:
+            merged.add(_RawStats(item))
+    if merged is not None:
+        merged.dump_stats(path)
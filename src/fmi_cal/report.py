@@ -0,0 +1,234 @@
+"""Machine-readable build reports and the throughput regression gate.
+
+scripts/generate_all.py writes build-report.json:
+
+    config       options that change the speed of a build (parser, jobs, ...)
+    phases       wall time of each phase, in seconds
+    totals       bytes fetched, entries parsed, events emitted, output bytes
+    throughput   rates per CPU second of parsing and generation, compared
+                 against baseline reports by --compare
+    cache        HTTP cache, event block cache and manifest reuse hit rates
+    peak_rss_bytes
+    specs        the same measurements for every specialization
+
+and scripts/generate_index.py adds an "index" section to the same file.
+
+Compare a report with the median of earlier ones from the command line:
+
+    python -m fmi_cal.report build-report.json --compare baselines/*.json --max-regression 20%
+
+Rates use CPU time (thread time of each parse and of each spec's
+generation), not wall time, so they do not depend on --jobs or on other
+load on the machine.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPORT_VERSION = 2     # 2: generation rates over CPU time, not the phase wall time
+DEFAULT_REPORT = Path("build-report.json")
+DEFAULT_MAX_REGRESSION = "20%"
+
+# Per-spec counters summed into "totals"
+SPEC_TOTALS = ("bytes_fetched", "entries", "events", "output_bytes", "files")
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process or any of its finished children.
+
+    None where the resource module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rate(numerator: float, seconds: float) -> float | None:
+    return numerator / seconds if numerator and seconds > 0 else None
+
+
+@dataclass
+class BuildReport:
+    """Measurements of one site build, collected as the build runs."""
+    config: dict = field(default_factory=dict)
+    phases: dict[str, float] = field(default_factory=dict)
+    specs: dict[str, dict] = field(default_factory=dict)
+    cache: dict[str, float | None] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+
+    def record_spec(self, code: str, **metrics) -> None:
+        self.specs.setdefault(code, {}).update(metrics)
+
+    def to_dict(self) -> dict:
+        totals = {name: sum(s.get(name, 0) for s in self.specs.values()) for name in SPEC_TOTALS}
+        totals["specs"] = len(self.specs)
+        totals["rebuilt"] = sum(1 for s in self.specs.values() if "generate_s" in s)
+
+        parse_s = sum(s.get("parse_s", 0.0) for s in self.specs.values())
+        rebuilt = [s for s in self.specs.values() if "generate_s" in s]
+        generate_cpu_s = sum(s.get("generate_cpu_s", 0.0) for s in rebuilt)
+        throughput = {
+            "parse_entries_per_s": _rate(totals["entries"], parse_s),
+            "generate_events_per_s": _rate(sum(s["events"] for s in rebuilt), generate_cpu_s),
+            "generate_output_bytes_per_s": _rate(
+                sum(s["output_bytes"] for s in rebuilt), generate_cpu_s
+            ),
+        }
+        return {
+            "version": REPORT_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "config": self.config,
+            "phases": {**self.phases, "total": time.perf_counter() - self.started},
+            "totals": totals,
+            "throughput": {k: v for k, v in throughput.items() if v is not None},
+            "cache": self.cache,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "specs": self.specs,
+        }
+
+    def write(self, path: Path) -> dict:
+        data = self.to_dict()
+        write_report(path, data)
+        return data
+
+
+def write_report(path: Path, data: dict) -> None:
+    Path(path).write_text(json.dumps(data, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_report(path: Path) -> dict:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} is not a build report")
+    return data
+
+
+def update_report(path: Path, section: str, values: dict) -> None:
+    """Set one section of an existing report (or of a new one)."""
+    try:
+        data = load_report(path)
+    except (OSError, ValueError):
+        data = {"version": REPORT_VERSION}
+    data[section] = values
+    write_report(path, data)
+
+
+def parse_regression(text: str) -> float:
+    """'20%' or '0.2' -> 0.2"""
+    text = text.strip()
+    value = float(text[:-1]) / 100 if text.endswith("%") else float(text)
+    if not 0 <= value < 1:
+        raise ValueError(f"Regression threshold must be between 0% and 100%: {text}")
+    return value
+
+
+@dataclass
+class MetricChange:
+    name: str
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1
+
+
+def compare_reports(current: dict, baseline: dict, max_regression: float) -> list[MetricChange]:
+    """Compare the throughput metrics both reports have.
+
+    A metric regresses when it is more than max_regression (a fraction)
+    below its baseline value.
+    """
+    now = current.get("throughput", {})
+    before = baseline.get("throughput", {})
+    return [
+        MetricChange(
+            name=name,
+            baseline=before[name],
+            current=now[name],
+            regressed=now[name] < before[name] * (1 - max_regression),
+        )
+        for name in sorted(now.keys() & before.keys())
+        if before[name]
+    ]
+
+
+def median_throughput(reports: list[dict]) -> dict:
+    """A report holding the median of each throughput rate across reports."""
+    values: dict[str, list[float]] = {}
+    for data in reports:
+        for name, value in data.get("throughput", {}).items():
+            if value:
+                values.setdefault(name, []).append(value)
+    return {"throughput": {name: statistics.median(v) for name, v in values.items()}}
+
+
+def check_regression(
+    current: dict, baseline_paths: list[Path], max_regression: float
+) -> bool:
+    """Print the comparison with the median of baseline reports; return False on a regression.
+
+    Baselines written by another REPORT_VERSION measure differently and
+    are skipped.
+    """
+    baselines = []
+    for path in baseline_paths:
+        data = load_report(path)
+        if data.get("version") == current.get("version"):
+            baselines.append(data)
+        else:
+            print(f"Skipping {path}: report version {data.get('version')}")
+    changes = compare_reports(current, median_throughput(baselines), max_regression)
+    print(
+        f"\nThroughput vs the median of {len(baselines)} earlier report(s) "
+        f"(max regression {max_regression:.0%}):"
+    )
+    if not changes:
+        print("  No metrics in common")
+    for c in changes:
+        flag = "  REGRESSED" if c.regressed else ""
+        print(f"  {c.name:<30}{c.baseline:>14.1f} -> {c.current:>14.1f} ({c.change:+.1%}){flag}")
+    return not any(c.regressed for c in changes)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m fmi_cal.report",
+        description="Compare a build report's throughput with earlier reports",
+    )
+    parser.add_argument("report", type=Path, help="Current build-report.json")
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs="+",
+        required=True,
+        metavar="BASELINE",
+        help="Earlier reports; each rate is compared with their median",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=parse_regression,
+        default=DEFAULT_MAX_REGRESSION,
+        help=f"Largest allowed throughput drop (default: {DEFAULT_MAX_REGRESSION})",
+    )
+    args = parser.parse_args(argv)
+    if not check_regression(load_report(args.report), args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
+import argparse
+import asyncio
+import importlib.util
 import re
+import sys
+from collections.abc import Iterable
 from datetime import date
+from typing import TYPE_CHECKING
 
 import requests
-from bs4 import BeautifulSoup
 
+from .http_client import AsyncFetcher, HttpClient, async_fetcher, get_default_client
 from .models import (
     EventType,
     Frequency,
@@ -11,9 +17,23 @@ from .models import (
     ScheduleEntry,
     Specialization,
 )
+from .parsers import GroupRows, extract_group_rows_lxml, extract_group_rows_stream
+from .table import EntryFields, SpecTable
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 SCHEDULE_ROOT = "https://www.cs.ubbcluj.ro/files/orar"
 
+# Schedule page parser backends:
+#   "html.parser": BeautifulSoup tree (most lenient, slowest)
+#   "stream":      event-driven tokenizer, no DOM (fmi_cal.parsers)
+#   "lxml":        lxml.html tree (needs the optional lxml package)
+PARSERS = ("html.parser", "stream", "lxml")
+# The one default for the library, the CLI and the scripts: no DOM and no
+# extra dependency; "html.parser" stays available as the fallback
+DEFAULT_PARSER = "stream"
+
 EVENT_TYPE_MAP = {
     "Curs": EventType.CURS,
     "Seminar": EventType.SEMINAR,
@@ -21,67 +41,132 @@ EVENT_TYPE_MAP = {
 }
 
 
-def get_schedule_base_url(year: int | None = None, semester: int | None = None) -> str:
-    """Auto-detect or accept overrides for the schedule URL.
+def guess_semester(
+    year: int | None = None,
+    semester: int | None = None,
+    today: date | None = None,
+) -> tuple[int, int]:
+    """Fill in the academic year and/or semester that are not given, from the date.
 
-    URL pattern: https://www.cs.ubbcluj.ro/files/orar/{YEAR}-{SEM}/tabelar
     YEAR = academic year start (e.g. 2025 for 2025-2026)
     SEM = 1 or 2
     """
-    if year is None or semester is None:
-        today = date.today()
-        if semester is None:
-            # Sep-Jan = semester 1, Feb-Aug = semester 2
-            semester = 1 if today.month >= 9 or today.month == 1 else 2
-        if year is None:
-            # Academic year starts in September
-            if today.month >= 9:
-                year = today.year
-            else:
-                year = today.year - 1
+    today = today or date.today()
+    if semester is None:
+        # Sep-Jan = semester 1, Feb-Aug = semester 2
+        semester = 1 if today.month >= 9 or today.month == 1 else 2
+    if year is None:
+        # Academic year starts in September
+        if today.month >= 9:
+            year = today.year
+        else:
+            year = today.year - 1
+    return year, semester
+
+
+def parse_semester(text: str) -> tuple[int, int]:
+    """Parse '2025-2' into (2025, 2); the argparse type of every --semester."""
+    year, _, sem = text.partition("-")
+    if not (year.isdigit() and sem in ("1", "2")):
+        raise argparse.ArgumentTypeError(
+            f"invalid semester {text!r}, expected YEAR-SEMESTER (e.g. 2025-2)"
+        )
+    return int(year), int(sem)
+
+
+def get_schedule_base_url(
+    year: int | None = None,
+    semester: int | None = None,
+    client: HttpClient | None = None,
+) -> str:
+    """Auto-detect or accept overrides for the schedule URL.
+
+    URL pattern: https://www.cs.ubbcluj.ro/files/orar/{YEAR}-{SEM}/tabelar
+    (see guess_semester for the defaults)
+    """
+    return resolve_schedule_base_url(year, semester, client)[0]
+
+
+def resolve_schedule_base_url(
+    year: int | None = None,
+    semester: int | None = None,
+    client: HttpClient | None = None,
+) -> tuple[str, bool]:
+    """Like get_schedule_base_url, but also say whether the URL was confirmed.
+
+    False means neither the HEAD request nor the redirect page answered,
+    and the URL is only the one built from guess_semester.
+    """
+    year, semester = guess_semester(year, semester)
 
     base = f"{SCHEDULE_ROOT}/{year}-{semester}/tabelar"
+    client = client or get_default_client()
 
     # Validate the URL exists
     try:
-        resp = requests.head(f"{base}/index.html", timeout=10, allow_redirects=True)
+        resp = client.head(f"{base}/index.html", timeout=10, allow_redirects=True)
         if resp.status_code == 200:
-            return base
+            return base, True
     except requests.RequestException:
         pass
 
     # Fall back to the redirect target at /files/orar/
     try:
-        resp = requests.get(f"{SCHEDULE_ROOT}/", timeout=10, allow_redirects=False)
+        resp = client.get(f"{SCHEDULE_ROOT}/", timeout=10, allow_redirects=False)
         if resp.status_code == 200:
             # Page contains a meta refresh or link like "2025-1"
+            from bs4 import BeautifulSoup
+
             soup = BeautifulSoup(resp.content, "html.parser")
             text = soup.get_text()
             match = re.search(r"(\d{4}-[12])", text)
             if match:
-                return f"{SCHEDULE_ROOT}/{match.group(1)}/tabelar"
+                return f"{SCHEDULE_ROOT}/{match.group(1)}/tabelar", True
     except requests.RequestException:
         pass
 
-    return base
+    return base, False
+
+
+def _parse_html(content: bytes) -> "BeautifulSoup":
+    # bs4 is imported on first use; the "stream" and "lxml" parsers never need it
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(content, "html.parser", from_encoding="iso-8859-2")
 
 
-def _fetch_html(url: str) -> BeautifulSoup:
-    resp = requests.get(url, timeout=15)
-    return BeautifulSoup(resp.content, "html.parser", from_encoding="iso-8859-2")
+def _fetch_html(url: str, client: HttpClient | None = None) -> "BeautifulSoup":
+    return _parse_html((client or get_default_client()).fetch(url))
 
 
-def fetch_room_legend(base_url: str) -> dict[str, str]:
+def schedule_page_url(base_url: str, spec_code: str) -> str:
+    """URL of a specialization's schedule page (e.g. .../tabelar/IE2.html)."""
+    return f"{base_url}/{spec_code}.html"
+
+
+def fetch_room_legend(base_url: str, client: HttpClient | None = None) -> dict[str, str]:
     """Scrape the room legend table and return a mapping of room code → location.
 
     The legend lives at {semester_root}/sali/legenda.html, where base_url
     points to {semester_root}/tabelar.
     """
+    soup = _fetch_html(room_legend_url(base_url), client)
+    return _extract_room_legend(soup)
+
+
+def room_legend_url(base_url: str) -> str:
+    """URL of the room legend for a .../tabelar base URL."""
     # base_url is .../tabelar — go up one level to get semester root
     semester_root = base_url.rsplit("/", 1)[0]
-    url = f"{semester_root}/sali/legenda.html"
+    return f"{semester_root}/sali/legenda.html"
+
+
+def parse_room_legend(content: bytes) -> dict[str, str]:
+    """Parse an already-fetched room legend page."""
+    return _extract_room_legend(_parse_html(content))
+
 
-    soup = _fetch_html(url)
+def _extract_room_legend(soup: "BeautifulSoup") -> dict[str, str]:
     rooms: dict[str, str] = {}
 
     table = soup.find("table")
@@ -100,9 +185,11 @@ def fetch_room_legend(base_url: str) -> dict[str, str]:
     return rooms
 
 
-def fetch_specializations(base_url: str) -> list[Specialization]:
+def fetch_specializations(
+    base_url: str, client: HttpClient | None = None
+) -> list[Specialization]:
     """Parse the index.html page to get all available specializations."""
-    soup = _fetch_html(f"{base_url}/index.html")
+    soup = _fetch_html(f"{base_url}/index.html", client)
     specs: list[Specialization] = []
 
     for table in soup.find_all("table"):
@@ -133,10 +220,60 @@ def fetch_specializations(base_url: str) -> list[Specialization]:
     return specs
 
 
-def fetch_group_schedules(base_url: str, spec_code: str) -> list[GroupSchedule]:
+def fetch_group_schedules(
+    base_url: str,
+    spec_code: str,
+    client: HttpClient | None = None,
+    parser: str = DEFAULT_PARSER,
+) -> list[GroupSchedule]:
     """Parse a schedule page (e.g. IE2.html) and return one GroupSchedule per group."""
-    soup = _fetch_html(f"{base_url}/{spec_code}.html")
+    url = schedule_page_url(base_url, spec_code)
+    if parser == "html.parser":
+        return _schedules_from_group_rows(_group_rows_html(_fetch_html(url, client)))
+    return parse_group_schedules((client or get_default_client()).fetch(url), parser)
 
+
+def parse_group_schedules(
+    content: bytes, parser: str = DEFAULT_PARSER
+) -> list[GroupSchedule]:
+    """Parse an already-fetched schedule page (raw ISO-8859-2 bytes).
+
+    parser selects the backend (see PARSERS); every backend yields the
+    same GroupSchedule list.
+    """
+    return _schedules_from_group_rows(_extract_group_rows(content, parser))
+
+
+def parse_spec_table(content: bytes, parser: str = DEFAULT_PARSER) -> SpecTable:
+    """Parse a schedule page straight into a columnar SpecTable.
+
+    Holds the same entries as parse_group_schedules, without building a
+    ScheduleEntry per row.
+    """
+    return SpecTable.from_rows(
+        (group, filter(None, map(_entry_fields, rows)))
+        for group, rows in _extract_group_rows(content, parser)
+    )
+
+
+def available_parsers() -> list[str]:
+    """Parser backends usable in this environment (lxml is optional)."""
+    if importlib.util.find_spec("lxml") is None:
+        return [p for p in PARSERS if p != "lxml"]
+    return list(PARSERS)
+
+
+def _extract_group_rows(content: bytes, parser: str) -> GroupRows:
+    if parser == "html.parser":
+        return _group_rows_html(_parse_html(content))
+    if parser == "stream":
+        return extract_group_rows_stream(content)
+    if parser == "lxml":
+        return extract_group_rows_lxml(content)
+    raise ValueError(f"Unknown parser backend: {parser}")
+
+
+def _group_rows_html(soup: "BeautifulSoup") -> GroupRows:
     # Find all <h1> tags matching "Grupa NNN"
     group_headers = []
     for h1 in soup.find_all("h1"):
@@ -145,67 +282,140 @@ def fetch_group_schedules(base_url: str, spec_code: str) -> list[GroupSchedule]:
         if match:
             group_headers.append((match.group(1), h1))
 
-    schedules: list[GroupSchedule] = []
+    group_rows: GroupRows = []
 
     for group_name, h1_tag in group_headers:
         # The table follows the h1 tag
         table = h1_tag.find_next("table")
         if not table:
             continue
-        entries = _parse_schedule_table(table)
-        schedules.append(GroupSchedule(group=group_name, entries=entries))
+        group_rows.append((group_name, _table_rows(table)))
+
+    return group_rows
 
-    return schedules
+
+def _table_rows(table) -> list[list[str]]:
+    return [
+        [cell.get_text(strip=True) for cell in row.find_all("td")]
+        for row in table.find_all("tr")
+    ]
 
 
 def _parse_schedule_table(table) -> list[ScheduleEntry]:
-    entries: list[ScheduleEntry] = []
-    rows = table.find_all("tr")
+    return _entries_from_rows(_table_rows(table))
 
-    for row in rows:
-        cells = row.find_all("td")
-        if len(cells) < 8:
-            continue
 
-        day = cells[0].get_text(strip=True)
-        hours_text = cells[1].get_text(strip=True)
-        freq_text = cells[2].get_text(strip=True)
-        room = cells[3].get_text(strip=True)
-        formation = cells[4].get_text(strip=True)
-        type_text = cells[5].get_text(strip=True)
-        subject = cells[6].get_text(strip=True)
-        professor = cells[7].get_text(strip=True)
-
-        # Parse hours: "12-14" -> (12, 14)
-        hour_match = re.match(r"(\d+)-(\d+)", hours_text)
-        if not hour_match:
-            continue
-        start_hour = int(hour_match.group(1))
-        end_hour = int(hour_match.group(2))
-
-        # Parse frequency
-        if "sapt. 1" in freq_text:
-            frequency = Frequency.WEEK_1
-        elif "sapt. 2" in freq_text:
-            frequency = Frequency.WEEK_2
-        else:
-            frequency = Frequency.EVERY_WEEK
+def _schedules_from_group_rows(group_rows: GroupRows) -> list[GroupSchedule]:
+    return [
+        GroupSchedule(group=group, entries=_entries_from_rows(rows))
+        for group, rows in group_rows
+    ]
 
-        # Parse event type
-        event_type = EVENT_TYPE_MAP.get(type_text)
-        if event_type is None:
-            continue
 
+def _entries_from_rows(rows: Iterable[list[str]]) -> list[ScheduleEntry]:
+    """Turn table rows (the stripped text of each <td>) into schedule entries."""
+    entries: list[ScheduleEntry] = []
+    for cells in rows:
+        fields = _entry_fields(cells)
+        if fields is None:
+            continue
+        day, start_hour, end_hour, frequency, room, formation, event_type, subject, professor = fields
+        # Intern the repeated strings so every group and spec shares one copy
         entries.append(ScheduleEntry(
-            day=day,
+            day=sys.intern(day),
             start_hour=start_hour,
             end_hour=end_hour,
             frequency=frequency,
-            room=room,
-            formation=formation,
+            room=sys.intern(room),
+            formation=sys.intern(formation),
             event_type=event_type,
-            subject=subject,
-            professor=professor,
+            subject=sys.intern(subject),
+            professor=sys.intern(professor),
         ))
-
     return entries
+
+
+def _entry_fields(cells: list[str]) -> EntryFields | None:
+    """The ScheduleEntry fields of one table row, or None if it is not an entry."""
+    if len(cells) < 8:
+        return None
+
+    day, hours_text, freq_text, room, formation, type_text, subject, professor = cells[:8]
+
+    # Parse hours: "12-14" -> (12, 14)
+    hour_match = re.match(r"(\d+)-(\d+)", hours_text)
+    if not hour_match:
+        return None
+
+    # Parse frequency
+    if "sapt. 1" in freq_text:
+        frequency = Frequency.WEEK_1
+    elif "sapt. 2" in freq_text:
+        frequency = Frequency.WEEK_2
+    else:
+        frequency = Frequency.EVERY_WEEK
+
+    # Parse event type
+    event_type = EVENT_TYPE_MAP.get(type_text)
+    if event_type is None:
+        return None
+
+    return (
+        day, int(hour_match.group(1)), int(hour_match.group(2)), frequency,
+        room, formation, event_type, subject, professor,
+    )
+
+
+# --- Async fetch engine ---
+#
+# Coroutines for driving many fetches from one event loop, through an
+# AsyncHttpClient (httpx, the "async" extra) or, without httpx, a
+# ThreadPoolFetcher (see async_fetcher). Parsing runs in a worker thread so
+# the event loop stays free to schedule more requests.
+
+
+async def fetch_group_schedules_async(
+    base_url: str,
+    spec_code: str,
+    client: AsyncFetcher,
+    parser: str = DEFAULT_PARSER,
+) -> list[GroupSchedule]:
+    """Async variant of fetch_group_schedules."""
+    content = await client.fetch(schedule_page_url(base_url, spec_code))
+    return await asyncio.to_thread(parse_group_schedules, content, parser)
+
+
+async def fetch_room_legend_async(
+    base_url: str, client: AsyncFetcher
+) -> dict[str, str]:
+    """Async variant of fetch_room_legend."""
+    content = await client.fetch(room_legend_url(base_url))
+    return await asyncio.to_thread(parse_room_legend, content)
+
+
+async def fetch_all_specs_async(
+    base_url: str,
+    spec_codes: list[str],
+    client: AsyncFetcher | None = None,
+    concurrency: int = 10,
+    parser: str = DEFAULT_PARSER,
+) -> dict[str, list[GroupSchedule] | Exception]:
+    """Fetch and parse many schedule pages concurrently on one event loop.
+
+    Returns a mapping of spec code to its schedules, or to the exception
+    that fetching/parsing that spec raised.
+    """
+    owned = client is None
+    client = client or async_fetcher(concurrency=concurrency)
+    try:
+        results = await asyncio.gather(
+            *(
+                fetch_group_schedules_async(base_url, code, client, parser)
+                for code in spec_codes
+            ),
+            return_exceptions=True,
+        )
+    finally:
+        if owned:
+            await client.aclose()
+    return dict(zip(spec_codes, results))
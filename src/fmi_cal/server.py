@@ -0,0 +1,555 @@
+"""`fmi-cal serve`: self-hosted calendar subscriptions.
+
+Loads every specialization of a semester into memory once and answers the
+same URLs as the Cloudflare worker (worker/src/index.js):
+
+    /ics/<base64url>.ics    calendar parameters in the path
+    /ics?c=<base64>         calendar parameters in the query string
+
+The parameter format and the filters are Python ports of
+worker/src/decode.js and worker/src/filter.js. Generated calendars are kept
+in an LRU cache, and the schedule data is re-fetched in the background
+every --refresh-interval seconds.
+
+Short config IDs (/ics/<10 hex chars>.ics) are stored in the worker's KV
+namespace and are not available here.
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .academic import AcademicCalendarRepository, TeachingCalendarIndex, get_study_line
+from .http_client import DEFAULT_CACHE_DIR, HttpClient, async_fetcher
+from .ics import EventBlockCache
+from .models import Frequency, GroupSchedule, ScheduleEntry, Specialization
+from .scraper import (
+    DEFAULT_PARSER,
+    PARSERS,
+    fetch_all_specs_async,
+    fetch_room_legend_async,
+    fetch_specializations,
+    get_schedule_base_url,
+    parse_semester,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_REFRESH_INTERVAL = 3600   # seconds
+DEFAULT_CACHE_SIZE = 256          # generated calendars kept in memory
+
+ALL_TYPES = ("Curs", "Seminar", "Laborator")
+
+# Short config IDs of the worker's KV store: /ics/<10 hex chars>.ics
+SHORT_ID = re.compile(r"[0-9a-f]{10}")
+
+ICS_HEADERS = {
+    "Content-Type": "text/calendar; charset=utf-8",
+    "Content-Disposition": 'attachment; filename="calendar.ics"',
+    "Cache-Control": "public, max-age=3600",
+    "Access-Control-Allow-Origin": "*",
+}
+
+
+# --- Request parameters (port of worker/src/decode.js) ---
+
+
+class InvalidParams(ValueError):
+    """The calendar parameters could not be decoded."""
+
+
+@dataclass(frozen=True)
+class CalendarSelection:
+    year_code: str
+    group_index: int = 0
+    subgroup: str = "all"
+    unchecked_types: tuple[str, ...] = ()
+    excluded: tuple[str, ...] = ()              # "subject|||type"
+    lab_overrides: tuple[tuple[str, str], ...] = ()
+
+
+@dataclass(frozen=True)
+class CalendarParams:
+    calendars: tuple[CalendarSelection, ...]
+    freq: str = "all"
+
+
+def decode_b64_payload(b64: str) -> dict:
+    """Decode a (standard or URL-safe) base64 JSON payload."""
+    b64 = b64.replace(" ", "+").replace("-", "+").replace("_", "/")
+    b64 += "=" * (-len(b64) % 4)
+    try:
+        return json.loads(base64.b64decode(b64, validate=True).decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidParams(f"Invalid calendar parameter: {e}") from e
+
+
+def decode_cal_params(payload: dict) -> CalendarParams:
+    """Normalize a decoded payload: one calendar, or several under "cals"."""
+    if not isinstance(payload, dict):
+        raise InvalidParams("Calendar parameter must be a JSON object")
+    raw_cals = payload["cals"] if payload.get("cals") else [payload]
+    freq = payload.get("f") or "all"
+
+    calendars = []
+    for c in raw_cals:
+        if not isinstance(c, dict) or not c.get("s"):
+            raise InvalidParams("Missing spec code (s)")
+        try:
+            group_index = int(c.get("g", 0))
+        except (TypeError, ValueError) as e:
+            raise InvalidParams(f"Invalid group index: {c.get('g')!r}") from e
+        calendars.append(CalendarSelection(
+            year_code=str(c["s"]),
+            group_index=group_index,
+            subgroup=str(c.get("sg") or "all"),
+            unchecked_types=tuple(c.get("ut") or ()),
+            excluded=tuple(c.get("ex") or ()),
+            lab_overrides=tuple(sorted((c.get("lo") or {}).items())),
+        ))
+    return CalendarParams(calendars=tuple(calendars), freq=str(freq))
+
+
+# --- Filters (port of worker/src/filter.js) ---
+
+
+def filter_group_entries(
+    entries: tuple[ScheduleEntry, ...] | list[ScheduleEntry],
+    group_name: str,
+    selection: CalendarSelection,
+) -> list[ScheduleEntry]:
+    """Apply a calendar selection (types, exclusions, subgroup) to a group."""
+    types = set(ALL_TYPES) - set(selection.unchecked_types)
+    excluded = set(selection.excluded)
+    lab_overrides = dict(selection.lab_overrides)
+    subgroup = selection.subgroup
+
+    result = []
+    for e in entries:
+        type_name = e.event_type.value
+        if type_name not in types:
+            continue
+        if f"{e.subject}|||{type_name}" in excluded:
+            continue
+
+        f = e.formation
+        if not f[:1].isdigit() or f == group_name:
+            result.append(e)
+            continue
+        if "/" in f and "/" not in group_name:
+            entry_group, entry_sub = f.split("/", 1)
+            if entry_group != group_name:
+                continue
+            effective = subgroup
+            if subgroup == "all" and e.subject in lab_overrides:
+                effective = lab_overrides[e.subject]
+            if effective and effective != "all" and entry_sub != effective:
+                continue
+            result.append(e)
+    return result
+
+
+def filter_by_frequency(
+    items: list[tuple[ScheduleEntry, TeachingCalendarIndex]], freq: str
+) -> list[tuple[ScheduleEntry, TeachingCalendarIndex]]:
+    if freq in ("all", "current"):
+        return items
+    return [
+        (e, index) for e, index in items
+        if e.frequency == Frequency.EVERY_WEEK or e.frequency.value == freq
+    ]
+
+
+def deduplicate_entries(
+    items: list[tuple[ScheduleEntry, TeachingCalendarIndex]],
+) -> list[tuple[ScheduleEntry, TeachingCalendarIndex]]:
+    """Drop repeated entries (same slot, subject, type, formation and room)."""
+    seen = set()
+    result = []
+    for e, index in items:
+        key = (e.day, e.start_hour, e.end_hour, e.subject, e.event_type, e.formation, e.room)
+        if key not in seen:
+            seen.add(key)
+            result.append((e, index))
+    return result
+
+
+# --- In-memory schedule data ---
+
+
+@dataclass
+class SpecData:
+    spec: Specialization
+    schedules: list[GroupSchedule]
+    index: TeachingCalendarIndex
+
+
+@dataclass
+class Snapshot:
+    """Everything needed to answer requests, replaced wholesale on refresh."""
+    specs: dict[str, SpecData]
+    room_legend: dict[str, str]
+    loaded_at: float = field(default_factory=time.time)
+    blocks: EventBlockCache = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.blocks = EventBlockCache(self.room_legend)
+
+
+async def load_snapshot(
+    client: HttpClient,
+    semester: tuple[int, int] | None = None,
+    concurrency: int = 16,
+    parser: str = DEFAULT_PARSER,
+) -> Snapshot:
+    """Fetch and parse every specialization of a semester ((year, semester))."""
+    year, sem = semester or (None, None)
+    base_url = await asyncio.to_thread(get_schedule_base_url, year, sem, client)
+    semester_num = int(base_url.rstrip("/").split("/")[-2].split("-")[1])
+
+    specs = await asyncio.to_thread(fetch_specializations, base_url, client)
+    unique: dict[str, Specialization] = {}
+    for spec in specs:
+        unique.setdefault(spec.code, spec)
+
+    repository = AcademicCalendarRepository(client)
+    calendars_loaded = asyncio.ensure_future(asyncio.to_thread(repository.load))
+    async with async_fetcher(client, concurrency=concurrency) as fetcher:
+        room_legend, schedules = await asyncio.gather(
+            fetch_room_legend_async(base_url, fetcher),
+            fetch_all_specs_async(
+                base_url, list(unique), fetcher, parser=parser
+            ),
+            return_exceptions=True,
+        )
+    await calendars_loaded
+    if isinstance(schedules, Exception):
+        raise schedules
+    if isinstance(room_legend, Exception):
+        print(f"WARNING: Could not fetch room legend: {room_legend}", flush=True)
+        room_legend = {}
+
+    loaded: dict[str, SpecData] = {}
+    for spec in unique.values():
+        try:
+            result = schedules[spec.code]
+            if isinstance(result, Exception):
+                raise result
+            study_line = get_study_line(spec.code, spec.name)
+            index = repository.teaching_index(study_line, semester_num)
+        except Exception as e:
+            print(f"  ERROR {spec.code}: {e}", flush=True)
+            continue
+        loaded[spec.code] = SpecData(spec=spec, schedules=result, index=index)
+    return Snapshot(specs=loaded, room_legend=room_legend)
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used item."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# --- HTTP server ---
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes = b""
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+REASONS = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class CalendarServer:
+    """Serves calendars from a Snapshot, regenerating only on cache misses."""
+
+    def __init__(
+        self,
+        snapshot: Snapshot | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self.snapshot = snapshot
+        self.cache = LRUCache(cache_size)
+
+    def replace_snapshot(self, snapshot: Snapshot) -> None:
+        self.snapshot = snapshot
+        self.cache.clear()
+
+    def resolve_params(self, target: str) -> CalendarParams:
+        url = urlsplit(target)
+        path = unquote(url.path)
+        if path.startswith("/ics/"):
+            segment = path[len("/ics/"):]
+            if segment.endswith(".ics"):
+                segment = segment[:-len(".ics")]
+            if SHORT_ID.fullmatch(segment):
+                raise RequestError(404, "Short config IDs are only available on the hosted service")
+            return decode_cal_params(decode_b64_payload(segment))
+        if path == "/ics":
+            c = parse_qs(url.query).get("c")
+            if not c:
+                raise RequestError(400, "Missing calendar parameter")
+            return decode_cal_params(decode_b64_payload(c[0]))
+        raise RequestError(404, "Not found")
+
+    def render(self, params: CalendarParams) -> bytes:
+        snapshot = self.snapshot
+        items: list[tuple[ScheduleEntry, TeachingCalendarIndex]] = []
+        for cal in params.calendars:
+            data = snapshot.specs.get(cal.year_code)
+            if data is None:
+                raise RequestError(404, f"Unknown specialization {cal.year_code}")
+            if not 0 <= cal.group_index < len(data.schedules):
+                raise RequestError(
+                    400,
+                    f"Group index {cal.group_index} out of bounds "
+                    f"({len(data.schedules)} groups)",
+                )
+            group = data.schedules[cal.group_index]
+            items.extend(
+                (e, data.index) for e in filter_group_entries(group.entries, group.group, cal)
+            )
+
+        items = filter_by_frequency(deduplicate_entries(items), params.freq)
+        return b"".join(snapshot.blocks.iter_mixed_calendar(items))
+
+    def handle(self, method: str, target: str, headers: dict[str, str]) -> Response:
+        if method not in ("GET", "HEAD"):
+            return Response(405, b"Method not allowed")
+        if self.snapshot is None:
+            return Response(503, b"Schedule data is still loading")
+        try:
+            params = self.resolve_params(target)
+            cached = self.cache.get(params)
+            if cached is None:
+                body = self.render(params)
+                etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                cached = (body, etag)
+                self.cache.put(params, cached)
+        except InvalidParams as e:
+            return Response(400, str(e).encode("utf-8"))
+        except RequestError as e:
+            return Response(e.status, str(e).encode("utf-8"))
+
+        body, etag = cached
+        if _etag_matches(headers.get("if-none-match"), etag):
+            return Response(304, headers={
+                "ETag": etag,
+                "Cache-Control": ICS_HEADERS["Cache-Control"],
+                "Access-Control-Allow-Origin": "*",
+            })
+        return Response(200, body, {**ICS_HEADERS, "ETag": etag})
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve HTTP/1.1 requests on one connection until it is closed."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, Response(400, b"Bad request"), False)
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                )
+                try:
+                    response = self.handle(method, target, headers)
+                except Exception as e:
+                    response = Response(500, f"Internal error: {e}".encode("utf-8"))
+                await self._write(writer, response, keep_alive, head=method == "HEAD")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write(
+        writer: asyncio.StreamWriter, response: Response, keep_alive: bool, head: bool = False
+    ) -> None:
+        reason = REASONS.get(response.status, "")
+        headers = {
+            "Content-Length": str(len(response.body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **response.headers,
+        }
+        if "Content-Type" not in headers and response.body:
+            headers["Content-Type"] = "text/plain; charset=utf-8"
+        head_lines = [f"HTTP/1.1 {response.status} {reason}"]
+        head_lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1"))
+        if not head:
+            writer.write(response.body)
+        await writer.drain()
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    tags = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return any(tag in (etag, "*") for tag in tags)
+
+
+async def refresh_periodically(
+    server: CalendarServer,
+    load,
+    interval: float,
+) -> None:
+    """Reload the schedule data every interval seconds; keep the old data on failure."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            snapshot = await load()
+        except Exception as e:
+            print(f"Refresh failed, keeping data from before: {e}", flush=True)
+            continue
+        server.replace_snapshot(snapshot)
+        print(f"Refreshed {len(snapshot.specs)} specializations", flush=True)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    cache_dir = args.cache_dir
+    if args.offline and cache_dir is None:
+        cache_dir = DEFAULT_CACHE_DIR
+    client = HttpClient(
+        pool_size=args.concurrency, cache_dir=cache_dir, offline=args.offline
+    )
+
+    async def load() -> Snapshot:
+        return await load_snapshot(client, args.semester, args.concurrency, args.parser)
+
+    server = CalendarServer(cache_size=args.cache_size)
+    t_start = time.perf_counter()
+    print("Loading schedules...", flush=True)
+    server.replace_snapshot(await load())
+    print(
+        f"Loaded {len(server.snapshot.specs)} specializations "
+        f"in {time.perf_counter() - t_start:.1f}s",
+        flush=True,
+    )
+
+    tcp_server = await asyncio.start_server(server.handle_connection, args.host, args.port)
+    refresh = None
+    if args.refresh_interval > 0:
+        refresh = asyncio.ensure_future(
+            refresh_periodically(server, load, args.refresh_interval)
+        )
+    print(f"Serving on http://{args.host}:{args.port}/ics/<params>.ics", flush=True)
+    try:
+        async with tcp_server:
+            await tcp_server.serve_forever()
+    finally:
+        if refresh is not None:
+            refresh.cancel()
+        client.close()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="fmi-cal serve",
+        description="Serve custom calendar subscriptions from in-memory schedule data",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Bind address (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--semester", type=parse_semester, help="Semester override (e.g. 2025-2)"
+    )
+    parser.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=DEFAULT_REFRESH_INTERVAL,
+        help=f"Seconds between background data refreshes, 0 to disable "
+        f"(default: {DEFAULT_REFRESH_INTERVAL})",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f"Generated calendars kept in memory (default: {DEFAULT_CACHE_SIZE})",
+    )
+    parser.add_argument("--cache-dir", type=Path, help="Cache fetched pages on disk")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help=f"Serve pages from the cache only (default cache dir: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Concurrent HTTP requests while loading"
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+        help=f"Schedule page parser backend (default: {DEFAULT_PARSER})",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
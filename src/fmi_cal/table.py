@@ -0,0 +1,186 @@
+"""Columnar (struct-of-arrays) schedule of one specialization page.
+
+A SpecTable stores every entry of every group as parallel arrays, one row
+per entry, with strings dictionary-encoded into one shared vocabulary, so
+a row is a handful of small integers. generate_all parses pages straight
+into tables, holds them between its fetch and generation phases and
+pickles them to worker processes. Selections are lists of row indices
+("row masks"); ScheduleEntry objects are only built for the rows written.
+"""
+
+import sys
+from array import array
+from collections.abc import Iterable, Sequence
+from datetime import date
+
+from .academic import DAY_MAP, TeachingCalendarIndex
+from .models import EventType, FormationIndex, Frequency, GroupSchedule, ScheduleEntry
+
+FREQUENCIES = tuple(Frequency)
+EVENT_TYPES = tuple(EventType)
+
+_FREQUENCY_CODE = {f: i for i, f in enumerate(FREQUENCIES)}
+_EVENT_TYPE_CODE = {t: i for i, t in enumerate(EVENT_TYPES)}
+
+# Columns in ScheduleEntry field order, and those holding string ids
+_COLUMNS = (
+    "day", "start_hour", "end_hour", "frequency", "room",
+    "formation", "event_type", "subject", "professor",
+)
+_STRING_COLUMNS = frozenset({"day", "room", "formation", "subject", "professor"})
+
+# The fields of a row, in ScheduleEntry order
+EntryFields = tuple[str, int, int, Frequency, str, str, EventType, str, str]
+
+
+class SpecTable:
+    """All schedule entries of one specialization, stored column by column.
+
+    Columns (one item per row):
+      day, room, formation, subject, professor
+                            ids into strings (the shared vocabulary)
+      start_hour, end_hour
+      frequency             index into FREQUENCIES
+      event_type            index into EVENT_TYPES
+
+    A group's rows are contiguous: group i owns rows
+    group_starts[i] to group_starts[i + 1].
+    """
+
+    def __init__(self) -> None:
+        self.groups: list[str] = []
+        self.group_starts = array("I", [0])
+        self.strings: list[str] = []
+        for name in _COLUMNS:
+            setattr(self, name, array("H" if name in _STRING_COLUMNS else "B"))
+        self._init_memos()
+
+    def _init_memos(self) -> None:
+        # Filled on demand; never pickled
+        self._formation_indexes: dict[int, FormationIndex] = {}
+        self._entries: dict[int, ScheduleEntry] = {}
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state["_formation_indexes"], state["_entries"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._init_memos()
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    @classmethod
+    def from_rows(
+        cls, group_rows: Iterable[tuple[str, Iterable[EntryFields]]]
+    ) -> "SpecTable":
+        """Build a table from (group, rows) pairs; rows are ScheduleEntry fields."""
+        table = cls()
+        strings = table.strings
+        string_ids: dict[str, int] = {}
+
+        def string_id(text: str) -> int:
+            sid = string_ids.get(text)
+            if sid is None:
+                sid = string_ids[text] = len(strings)
+                # Interned, so tables and entries of every spec share one copy
+                strings.append(sys.intern(text))
+            return sid
+
+        columns: dict[str, list[int]] = {name: [] for name in _COLUMNS}
+        day, start_hour, end_hour, freq, room, formation, event_type, subject, professor = (
+            columns[name].append for name in _COLUMNS
+        )
+        for group, rows in group_rows:
+            for fields in rows:
+                day(string_id(fields[0]))
+                start_hour(fields[1])
+                end_hour(fields[2])
+                freq(_FREQUENCY_CODE[fields[3]])
+                room(string_id(fields[4]))
+                formation(string_id(fields[5]))
+                event_type(_EVENT_TYPE_CODE[fields[6]])
+                subject(string_id(fields[7]))
+                professor(string_id(fields[8]))
+            table.groups.append(group)
+            table.group_starts.append(len(columns["day"]))
+
+        # Two-byte string ids unless the vocabulary outgrows them
+        string_typecode = "H" if len(strings) <= 0xFFFF else "I"
+        for name, values in columns.items():
+            typecode = string_typecode if name in _STRING_COLUMNS else "B"
+            setattr(table, name, array(typecode, values))
+        return table
+
+    @classmethod
+    def from_schedules(cls, schedules: Iterable[GroupSchedule]) -> "SpecTable":
+        return cls.from_rows(
+            (gs.group, (
+                (e.day, e.start_hour, e.end_hour, e.frequency, e.room,
+                 e.formation, e.event_type, e.subject, e.professor)
+                for e in gs.entries
+            ))
+            for gs in schedules
+        )
+
+    def group_rows(self, group_id: int) -> range:
+        """Every row of a group, in page order."""
+        return range(self.group_starts[group_id], self.group_starts[group_id + 1])
+
+    def student_rows(self, group_id: int, subgroup: str | None) -> list[int]:
+        """Rows on a group's student timetable, in page order.
+
+        Same rules as calendar_gen.filter_entries_for_student; the group's
+        formations are bucketed once and reused for every subgroup.
+        """
+        index = self._formation_indexes.get(group_id)
+        if index is None:
+            strings, formation = self.strings, self.formation
+            index = self._formation_indexes[group_id] = FormationIndex.build(
+                (strings[formation[row]] for row in self.group_rows(group_id)),
+                self.groups[group_id],
+            )
+        start = self.group_starts[group_id]
+        return [start + pos for pos in index.positions(subgroup)]
+
+    def dates_for_rows(
+        self, rows: Iterable[int], teaching_index: TeachingCalendarIndex
+    ) -> list[tuple[date, ...]]:
+        """Expand rows to their dates; rows sharing (day, frequency) share one tuple."""
+        lookup = teaching_index.dates
+        weekdays = [DAY_MAP.get(s) for s in self.strings]
+        day, frequency = self.day, self.frequency
+        return [
+            lookup.get((weekdays[day[row]], FREQUENCIES[frequency[row]]), ())
+            for row in rows
+        ]
+
+    def entry(self, row: int) -> ScheduleEntry:
+        """The ScheduleEntry of a row, built once and then shared."""
+        entry = self._entries.get(row)
+        if entry is None:
+            strings = self.strings
+            entry = self._entries[row] = ScheduleEntry(
+                day=strings[self.day[row]],
+                start_hour=self.start_hour[row],
+                end_hour=self.end_hour[row],
+                frequency=FREQUENCIES[self.frequency[row]],
+                room=strings[self.room[row]],
+                formation=strings[self.formation[row]],
+                event_type=EVENT_TYPES[self.event_type[row]],
+                subject=strings[self.subject[row]],
+                professor=strings[self.professor[row]],
+            )
+        return entry
+
+    def entries(self, rows: Sequence[int]) -> list[ScheduleEntry]:
+        return [self.entry(row) for row in rows]
+
+    def to_schedules(self) -> list[GroupSchedule]:
+        """The GroupSchedule list parse_group_schedules returns for the same page."""
+        return [
+            GroupSchedule(group=group, entries=self.entries(self.group_rows(i)))
+            for i, group in enumerate(self.groups)
+        ]
@@ -0,0 +1,61 @@
+"""Shared inputs for the benchmarks: the bundled fixture pages, parsed once."""
+
+import importlib.util
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from fmi_cal.academic import build_teaching_index, parse_academic_calendars
+from fmi_cal.scraper import parse_group_schedules, parse_spec_table
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+SCRIPTS_DIR = Path(__file__).parent.parent.parent / "scripts"
+
+
+def fixture_client() -> MagicMock:
+    """HttpClient stand-in whose fetch() serves the fixture page named by the URL."""
+    client = MagicMock()
+    client.fetch.side_effect = lambda url, *args, **kwargs: (
+        FIXTURES / url.rsplit("/", 1)[-1]
+    ).read_bytes()
+    return client
+
+
+@pytest.fixture(scope="session")
+def ie2_html() -> bytes:
+    return (FIXTURES / "IE2.html").read_bytes()
+
+
+@pytest.fixture(scope="session")
+def calendar_html() -> bytes:
+    return (FIXTURES / "academic_calendar.html").read_bytes()
+
+
+@pytest.fixture(scope="session")
+def schedules(ie2_html):
+    return parse_group_schedules(ie2_html)
+
+
+@pytest.fixture(scope="session")
+def spec_table(ie2_html):
+    return parse_spec_table(ie2_html)
+
+
+@pytest.fixture(scope="session")
+def academic_calendar(calendar_html):
+    return parse_academic_calendars(calendar_html)[("romanian", 2)]
+
+
+@pytest.fixture(scope="session")
+def teaching_index(academic_calendar):
+    return build_teaching_index(academic_calendar)
+
+
+@pytest.fixture(scope="session")
+def generate_all():
+    """scripts/generate_all.py, imported as a module."""
+    spec = importlib.util.spec_from_file_location("generate_all", SCRIPTS_DIR / "generate_all.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fmi_cal.academic import (  # noqa: E402
+    TeachingCalendarIndex,
+    compute_teaching_weeks,
+    get_dates_for_entry,
+    get_dates_for_schedules,
+    parse_academic_calendars,
+)
+
+
+def test_parse_academic_calendars(benchmark, calendar_html):
+    calendars = benchmark(parse_academic_calendars, calendar_html)
+    assert ("romanian", 2) in calendars
+
+
+def test_compute_teaching_weeks(benchmark, academic_calendar):
+    weeks = benchmark(compute_teaching_weeks, academic_calendar)
+    assert len(weeks) >= 12
+
+
+def test_build_teaching_index(benchmark, academic_calendar):
+    benchmark(TeachingCalendarIndex.from_calendar, academic_calendar)
+
+
+@pytest.mark.parametrize("prebuilt", [True, False], ids=["index", "calendar"])
+def test_get_dates_for_entry(benchmark, schedules, academic_calendar, teaching_index, prebuilt):
+    """Every entry of the spec, one call each."""
+    calendar = teaching_index if prebuilt else academic_calendar
+    entries = [e for gs in schedules for e in gs.entries]
+    dates = benchmark(lambda: [get_dates_for_entry(e, calendar) for e in entries])
+    assert any(dates)
+
+
+def test_get_dates_for_schedules(benchmark, schedules, teaching_index):
+    benchmark(get_dates_for_schedules, schedules, teaching_index)
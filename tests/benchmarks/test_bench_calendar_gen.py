@@ -0,0 +1,54 @@
+import copy
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fmi_cal.calendar_gen import filter_entries_for_student, generate_ics  # noqa: E402
+from fmi_cal.models import GroupSchedule  # noqa: E402
+
+VARIANTS = ("1", "2", None)
+
+
+@pytest.fixture(scope="module")
+def student_entries(schedules):
+    """The largest calendar in the spec: a group's entries, both subgroups."""
+    return max(
+        (filter_entries_for_student(gs, gs.group, None) for gs in schedules), key=len
+    )
+
+
+def test_filter_entries_for_student(benchmark, schedules):
+    """Every subgroup variant of every group, from fresh (unindexed) schedules."""
+    def run():
+        fresh = [GroupSchedule(group=gs.group, entries=gs.entries) for gs in schedules]
+        return [filter_entries_for_student(gs, gs.group, sub) for gs in fresh for sub in VARIANTS]
+
+    assert any(benchmark(run))
+
+
+def test_student_rows(benchmark, spec_table):
+    """The same variants as above, as row masks over a fresh (unindexed) table."""
+    def run():
+        fresh = copy.copy(spec_table)
+        return [
+            fresh.entries(fresh.student_rows(group_id, sub))
+            for group_id in range(len(fresh.groups)) for sub in VARIANTS
+        ]
+
+    assert any(benchmark(run))
+
+
+@pytest.mark.parametrize(
+    "backend,compact",
+    [("native", False), ("native", True), ("icalendar", False)],
+    ids=["native", "compact", "icalendar"],
+)
+def test_generate_ics(benchmark, student_entries, teaching_index, backend, compact):
+    ics = benchmark(generate_ics, student_entries, teaching_index, None, backend, compact)
+    assert ics.startswith(b"BEGIN:VCALENDAR")
+
+
+def test_build_spec_json(benchmark, generate_all, spec_table, teaching_index):
+    groups = benchmark(generate_all.build_spec_json, copy.copy(spec_table), teaching_index)
+    assert len(groups) == len(spec_table.groups)
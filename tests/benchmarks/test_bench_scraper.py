@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fmi_cal.scraper import (  # noqa: E402
+    _parse_html,
+    _parse_schedule_table,
+    available_parsers,
+    fetch_group_schedules,
+    fetch_specializations,
+    parse_spec_table,
+)
+
+from .conftest import fixture_client  # noqa: E402
+
+BASE_URL = "https://www.cs.ubbcluj.ro/files/orar/2025-2/tabelar"
+
+
+def test_parse_schedule_table(benchmark, ie2_html):
+    tables = _parse_html(ie2_html).find_all("table")
+    entries = benchmark(lambda: [_parse_schedule_table(t) for t in tables])
+    assert sum(map(len, entries)) > 0
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_fetch_group_schedules(benchmark, parser):
+    client = fixture_client()
+    schedules = benchmark(fetch_group_schedules, BASE_URL, "IE2", client, parser)
+    assert schedules
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_parse_spec_table(benchmark, ie2_html, parser):
+    table = benchmark(parse_spec_table, ie2_html, parser)
+    assert len(table)
+
+
+def test_fetch_specializations(benchmark):
+    specs = benchmark(fetch_specializations, BASE_URL, fixture_client())
+    assert specs
@@ -1,27 +1,65 @@
-from datetime import date
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+import pytest
+
 from bs4 import BeautifulSoup
 
 from fmi_cal.academic import (
+    DAY_MAP,
+    AcademicCalendarRepository,
+    TeachingCalendarIndex,
+    build_teaching_index,
     fetch_academic_calendar,
     compute_teaching_weeks,
+    get_dates_for_entries,
     get_dates_for_entry,
+    get_dates_for_schedules,
     get_study_line,
+    parse_academic_calendar,
+    parse_academic_calendars,
+)
+from fmi_cal.models import (
+    AcademicCalendar, Frequency, GroupSchedule, ScheduleEntry, EventType, TeachingPeriod,
 )
-from fmi_cal.models import AcademicCalendar, Frequency, ScheduleEntry, EventType, TeachingPeriod
 
 FIXTURES = Path(__file__).parent / "fixtures"
+CALENDAR_HTML = (FIXTURES / "academic_calendar.html").read_bytes()
 
 
 def _mock_requests_get(*args, **kwargs):
     """Mock requests.get to return the academic calendar fixture."""
-    mock_resp = MagicMock()
-    mock_resp.content = (FIXTURES / "academic_calendar.html").read_bytes()
+    mock_resp = MagicMock(status_code=200)
+    mock_resp.content = CALENDAR_HTML
     return mock_resp
 
 
+def _get_cal(study_line="romanian", semester=2):
+    """Fetch an academic calendar from the fixture page."""
+    with patch("fmi_cal.http_client.requests.Session.get", side_effect=_mock_requests_get):
+        return fetch_academic_calendar(study_line, semester)
+
+
+def _make_entry(day="Luni", freq=Frequency.EVERY_WEEK):
+    return ScheduleEntry(
+        day=day, start_hour=8, end_hour=10, frequency=freq,
+        room="2/I", formation="IE2", event_type=EventType.CURS,
+        subject="Test", professor="Prof",
+    )
+
+
+def _make_entries():
+    """One entry per day (including an unknown one) and frequency."""
+    return [
+        _make_entry(day, freq)
+        for day in ("Luni", "Joi", "Vineri", "Foo")
+        for freq in Frequency
+    ]
+
+
 class TestGetStudyLine:
     def test_romanian(self):
         assert get_study_line("IE2", "Informatica - in limba engleza") == "romanian"
@@ -41,8 +79,7 @@ class TestGetStudyLine:
 
 class TestFetchAcademicCalendar:
     def test_romanian_sem2(self):
-        with patch("fmi_cal.academic.requests.get", side_effect=_mock_requests_get):
-            cal = fetch_academic_calendar("romanian", 2)
+        cal = _get_cal()
 
         assert cal.semester_start == date(2026, 2, 23)
         assert len(cal.teaching_periods) == 2
@@ -52,8 +89,7 @@ class TestFetchAcademicCalendar:
         assert cal.teaching_periods[1].end == date(2026, 6, 7)
 
     def test_romanian_sem2_holidays(self):
-        with patch("fmi_cal.academic.requests.get", side_effect=_mock_requests_get):
-            cal = fetch_academic_calendar("romanian", 2)
+        cal = _get_cal()
 
         # Good Friday, May 1, Jun 1
         assert date(2026, 4, 10) in cal.holidays
@@ -61,8 +97,7 @@ class TestFetchAcademicCalendar:
         assert date(2026, 6, 1) in cal.holidays
 
     def test_hungarian_sem2(self):
-        with patch("fmi_cal.academic.requests.get", side_effect=_mock_requests_get):
-            cal = fetch_academic_calendar("hungarian", 2)
+        cal = _get_cal("hungarian")
 
         assert cal.semester_start == date(2026, 2, 23)
         assert len(cal.teaching_periods) == 2
@@ -71,25 +106,101 @@ class TestFetchAcademicCalendar:
         assert cal.teaching_periods[1].start == date(2026, 4, 13)
 
 
+class TestAcademicCalendarRepository:
+    def test_parses_every_table_in_one_pass(self):
+        content = CALENDAR_HTML
+        calendars = parse_academic_calendars(content)
+
+        for study_line, semester in calendars:
+            assert calendars[(study_line, semester)] == parse_academic_calendar(
+                content, study_line, semester
+            )
+        # Hungarian and German share a table
+        assert calendars[("german", 2)] is calendars[("hungarian", 2)]
+
+    def test_fetches_page_once(self):
+        client = MagicMock()
+        client.fetch.return_value = CALENDAR_HTML
+        repo = AcademicCalendarRepository(client)
+
+        romanian = repo.get("romanian", 2)
+        hungarian = repo.get("hungarian", 2)
+
+        client.fetch.assert_called_once()
+        assert romanian.semester_start == date(2026, 2, 23)
+        assert hungarian is repo.get("german", 2)
+
+    def test_concurrent_first_calls_fetch_once(self):
+        client = MagicMock()
+        client.fetch.return_value = CALENDAR_HTML
+        repo = AcademicCalendarRepository(client)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: repo.get("romanian", 2), range(32)))
+
+        client.fetch.assert_called_once()
+        assert all(r is results[0] for r in results)
+
+    def test_failure_is_cached_until_refresh(self):
+        client = MagicMock()
+        client.fetch.side_effect = [
+            OSError("down"),
+            CALENDAR_HTML,
+        ]
+        repo = AcademicCalendarRepository(client)
+
+        for _ in range(2):
+            with pytest.raises(OSError):
+                repo.get()
+        assert client.fetch.call_count == 1
+
+        repo.refresh()
+        assert repo.get().semester_start == date(2026, 2, 23)
+
+    def test_broken_table_fails_only_its_calendars(self):
+        soup = BeautifulSoup(CALENDAR_HTML, "html.parser")
+        # The Hungarian/German semester 2 table loses its rows
+        for row in soup.find_all("table")[4].find_all("tr"):
+            row.decompose()
+        repo = AcademicCalendarRepository(content=str(soup).encode("utf-8"))
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="No teaching periods"):
+                repo.get("hungarian", 2)
+        with pytest.raises(ValueError):
+            repo.teaching_index("german", 2)
+        assert repo.get("romanian", 2).semester_start == date(2026, 2, 23)
+        assert repo.get("hungarian", 1).teaching_periods
+
+    def test_unknown_key(self):
+        repo = AcademicCalendarRepository(content=CALENDAR_HTML)
+        with pytest.raises(ValueError):
+            repo.get("romanian", 3)
+
+    def test_teaching_index_memoized(self):
+        repo = AcademicCalendarRepository(content=CALENDAR_HTML)
+        index = repo.teaching_index("romanian", 2)
+
+        assert index is repo.teaching_index("romanian", 2)
+        assert index == TeachingCalendarIndex.from_calendar(repo.get("romanian", 2))
+
+
 class TestComputeTeachingWeeks:
     def test_14_teaching_weeks(self):
-        with patch("fmi_cal.academic.requests.get", side_effect=_mock_requests_get):
-            cal = fetch_academic_calendar("romanian", 2)
+        cal = _get_cal()
 
         weeks = compute_teaching_weeks(cal)
         assert len(weeks) == 14
 
     def test_week_numbering_sequential(self):
-        with patch("fmi_cal.academic.requests.get", side_effect=_mock_requests_get):
-            cal = fetch_academic_calendar("romanian", 2)
+        cal = _get_cal()
 
         weeks = compute_teaching_weeks(cal)
         week_nums = [num for _, num in weeks]
         assert week_nums == list(range(1, 15))
 
     def test_no_week_during_easter(self):
-        with patch("fmi_cal.academic.requests.get", side_effect=_mock_requests_get):
-            cal = fetch_academic_calendar("romanian", 2)
+        cal = _get_cal()
 
         weeks = compute_teaching_weeks(cal)
         mondays = [monday for monday, _ in weeks]
@@ -98,20 +209,9 @@ class TestComputeTeachingWeeks:
 
 
 class TestGetDatesForEntry:
-    def _make_entry(self, day="Luni", start=14, end=16, freq=Frequency.EVERY_WEEK):
-        return ScheduleEntry(
-            day=day, start_hour=start, end_hour=end, frequency=freq,
-            room="2/I", formation="IE2", event_type=EventType.CURS,
-            subject="Test", professor="Prof",
-        )
-
-    def _get_cal(self):
-        with patch("fmi_cal.academic.requests.get", side_effect=_mock_requests_get):
-            return fetch_academic_calendar("romanian", 2)
-
     def test_every_week_monday(self):
-        cal = self._get_cal()
-        entry = self._make_entry("Luni", freq=Frequency.EVERY_WEEK)
+        cal = _get_cal()
+        entry = _make_entry("Luni")
         dates = get_dates_for_entry(entry, cal)
 
         # 14 weeks minus Jun 1 (holiday, Monday) = 13
@@ -120,24 +220,24 @@ class TestGetDatesForEntry:
         assert date(2026, 6, 1) not in dates  # Holiday
 
     def test_week1_only(self):
-        cal = self._get_cal()
-        entry = self._make_entry("Joi", freq=Frequency.WEEK_1)
+        cal = _get_cal()
+        entry = _make_entry("Joi", freq=Frequency.WEEK_1)
         dates = get_dates_for_entry(entry, cal)
 
         # Odd weeks: 1,3,5,7,9,11,13 = 7 Thursdays
         assert len(dates) == 7
 
     def test_week2_only(self):
-        cal = self._get_cal()
-        entry = self._make_entry("Joi", freq=Frequency.WEEK_2)
+        cal = _get_cal()
+        entry = _make_entry("Joi", freq=Frequency.WEEK_2)
         dates = get_dates_for_entry(entry, cal)
 
         # Even weeks: 2,4,6,8,10,12,14 = 7 Thursdays
         assert len(dates) == 7
 
     def test_no_events_during_easter(self):
-        cal = self._get_cal()
-        entry = self._make_entry("Luni", freq=Frequency.EVERY_WEEK)
+        cal = _get_cal()
+        entry = _make_entry("Luni")
         dates = get_dates_for_entry(entry, cal)
 
         # No dates between Apr 13 and Apr 19
@@ -145,9 +245,77 @@ class TestGetDatesForEntry:
         assert len(easter_dates) == 0
 
     def test_friday_good_friday_excluded(self):
-        cal = self._get_cal()
-        entry = self._make_entry("Vineri", freq=Frequency.EVERY_WEEK)
+        cal = _get_cal()
+        entry = _make_entry("Vineri", freq=Frequency.EVERY_WEEK)
         dates = get_dates_for_entry(entry, cal)
 
         assert date(2026, 4, 10) not in dates  # Good Friday
         assert date(2026, 5, 1) not in dates   # Labor Day is also Friday
+
+
+class TestTeachingCalendarIndex:
+    def test_matches_per_week_walk(self):
+        cal = _get_cal()
+        index = TeachingCalendarIndex.from_calendar(cal)
+        holidays = set(cal.holidays)
+
+        for day, offset in DAY_MAP.items():
+            for freq in Frequency:
+                expected = []
+                for monday, week_num in compute_teaching_weeks(cal):
+                    if freq == Frequency.WEEK_1 and week_num % 2 == 0:
+                        continue
+                    if freq == Frequency.WEEK_2 and week_num % 2 == 1:
+                        continue
+                    d = monday + timedelta(days=offset)
+                    if d in holidays:
+                        continue
+                    if any(p.start <= d <= p.end for p in cal.teaching_periods):
+                        expected.append(d)
+                assert list(index.dates_for(_make_entry(day, freq))) == expected
+
+    def test_get_dates_for_entry_accepts_index(self):
+        cal = _get_cal()
+        index = TeachingCalendarIndex.from_calendar(cal)
+        entry = _make_entry("Luni", Frequency.EVERY_WEEK)
+
+        assert get_dates_for_entry(entry, index) == get_dates_for_entry(entry, cal)
+
+    def test_unknown_day(self):
+        index = TeachingCalendarIndex.from_calendar(_get_cal())
+        assert index.dates_for(_make_entry("Foo", Frequency.EVERY_WEEK)) == ()
+
+    def test_hashable_and_read_only(self):
+        cal = _get_cal()
+        index = TeachingCalendarIndex.from_calendar(cal)
+
+        assert hash(index) == hash(TeachingCalendarIndex.from_calendar(cal))
+        assert pickle.loads(pickle.dumps(index)) == index
+        with pytest.raises(TypeError):
+            index.dates[(0, Frequency.EVERY_WEEK)] = ()
+
+    def test_built_once_per_calendar(self):
+        cal = _get_cal()
+        assert build_teaching_index(cal) is build_teaching_index(cal)
+
+
+class TestBatchExpansion:
+    def test_entries_match_single_expansion(self):
+        cal = _get_cal()
+        entries = _make_entries()
+
+        batch = get_dates_for_entries(entries, cal)
+        assert [list(ds) for ds in batch] == [get_dates_for_entry(e, cal) for e in entries]
+
+    def test_schedules_one_list_per_group(self):
+        cal = _get_cal()
+        entries = _make_entries()
+        schedules = [
+            GroupSchedule(group="921", entries=entries[:3]),
+            GroupSchedule(group="922", entries=entries[3:]),
+        ]
+
+        result = get_dates_for_schedules(schedules, cal)
+        assert len(result) == 2
+        assert result[0] == get_dates_for_entries(entries[:3], cal)
+        assert result[1] == get_dates_for_entries(entries[3:], cal)
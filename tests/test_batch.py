@@ -0,0 +1,195 @@
+import asyncio
+import io
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fmi_cal.academic import AcademicCalendarRepository
+from fmi_cal.batch import (
+    BatchItem,
+    fetch_batch_schedules,
+    generate_batch,
+    load_batch,
+    parse_args,
+)
+from fmi_cal.calendar_gen import apply_user_filters, filter_entries_for_student, write_ics
+from fmi_cal.config import preferences_from_dict
+from fmi_cal.models import EventType
+from fmi_cal.http_client import ThreadPoolFetcher
+from fmi_cal.scraper import parse_group_schedules, parse_room_legend
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def schedules():
+    return parse_group_schedules((FIXTURES / "IE2.html").read_bytes())
+
+
+@pytest.fixture
+def rooms():
+    return parse_room_legend((FIXTURES / "legenda.html").read_bytes())
+
+
+@pytest.fixture
+def repository():
+    content = (FIXTURES / "academic_calendar.html").read_bytes()
+    return AcademicCalendarRepository(content=content)
+
+
+class TestPreferencesFromDict:
+    def test_defaults(self):
+        prefs = preferences_from_dict({"spec_code": "IE2", "group": 921})
+        assert prefs.group == "921"
+        assert prefs.subgroup is None
+        assert prefs.include_types == ["Curs", "Seminar", "Laborator"]
+        assert prefs.excluded_subjects == []
+
+    def test_missing_group(self):
+        with pytest.raises(KeyError):
+            preferences_from_dict({"spec_code": "IE2"})
+
+    def test_unknown_type(self):
+        with pytest.raises(ValueError):
+            preferences_from_dict({"spec_code": "IE2", "group": "921", "include_types": ["X"]})
+
+
+class TestLoadBatch:
+    def test_yaml(self, tmp_path):
+        path = tmp_path / "users.yaml"
+        path.write_text(
+            "- spec_code: IE2\n"
+            "  group: 921\n"
+            "  subgroup: 1\n"
+            "  output: alice.ics\n"
+            "- spec_code: IE2\n"
+            "  group: 922\n"
+        )
+        items = load_batch(path, tmp_path / "out")
+        assert [i.output.name for i in items] == ["alice.ics", "IE2_922.ics"]
+        assert items[0].prefs.subgroup == "1"
+
+    def test_json_users_key(self, tmp_path):
+        path = tmp_path / "users.json"
+        path.write_text(json.dumps({"users": [{"spec_code": "IE2", "group": "921"}]}))
+        assert load_batch(path)[0].prefs.spec_code == "IE2"
+
+    def test_csv_lists(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text(
+            "spec_code,group,subgroup,include_types,excluded_subjects\n"
+            "IE2,921,2,Curs;Seminar,A;B\n"
+            "IE2,922,,,\n"
+        )
+        first, second = load_batch(path)
+        assert first.prefs.include_types == ["Curs", "Seminar"]
+        assert first.prefs.excluded_subjects == ["A", "B"]
+        assert first.output.name == "IE2_921_2.ics"
+        assert second.prefs.subgroup is None
+        assert second.prefs.include_types == ["Curs", "Seminar", "Laborator"]
+
+    def test_errors_name_the_item(self, tmp_path):
+        path = tmp_path / "users.yaml"
+        path.write_text("- spec_code: IE2\n  group: 921\n- spec_code: IE2\n")
+        with pytest.raises(ValueError, match="Item 2: missing group"):
+            load_batch(path)
+
+    def test_duplicate_outputs(self, tmp_path):
+        path = tmp_path / "users.yaml"
+        path.write_text("- {spec_code: IE2, group: 921}\n- {spec_code: IE2, group: 921}\n")
+        with pytest.raises(ValueError, match="also used by item 1"):
+            load_batch(path)
+
+
+class TestGenerateBatch:
+    def test_matches_single_user_output(self, tmp_path, schedules, rooms, repository):
+        path = tmp_path / "users.yaml"
+        path.write_text(
+            "- {spec_code: IE2, group: 921, subgroup: 1}\n"
+            "- {spec_code: IE2, group: 923, include_types: [Curs]}\n"
+        )
+        items = load_batch(path, tmp_path)
+        results = generate_batch(items, {"IE2": schedules}, {}, repository, 2, rooms)
+        assert all(r.ok for r in results)
+
+        for item in items:
+            prefs = item.prefs
+            gs = next(s for s in schedules if s.group == prefs.group)
+            entries = apply_user_filters(
+                filter_entries_for_student(gs, prefs.group, prefs.subgroup),
+                [EventType(t) for t in prefs.include_types],
+                prefs.excluded_subjects,
+            )
+            expected = io.BytesIO()
+            write_ics(expected, entries, repository.get("romanian", 2), rooms)
+            assert item.output.read_bytes() == expected.getvalue()
+        # Locations carry the room legend's building
+        assert any(b"FSEGA Building" in item.output.read_bytes() for item in items)
+
+    def test_failures_are_reported_per_item(self, tmp_path, schedules, repository):
+        items = [
+            BatchItem(preferences_from_dict({"spec_code": "IE2", "group": "999"}), tmp_path / "a.ics"),
+            BatchItem(preferences_from_dict({"spec_code": "MI1", "group": "211"}), tmp_path / "b.ics"),
+            BatchItem(preferences_from_dict({"spec_code": "IE2", "group": "921"}), tmp_path / "c.ics"),
+        ]
+        schedules_by_code = {"IE2": schedules, "MI1": ConnectionError("timed out")}
+        results = generate_batch(items, schedules_by_code, {}, repository, 2)
+        assert [r.ok for r in results] == [False, False, True]
+        assert "Group 999 not found" in results[0].error
+        assert results[1].error == "timed out"
+        assert results[2].events > 0
+
+
+def _fixture_client(unreachable=()):
+    """HttpClient stand-in serving the fixture page named by the URL."""
+    def fetch(url, *args):
+        name = url.rsplit("/", 1)[-1]
+        if name in unreachable:
+            raise ConnectionError("timed out")
+        return (FIXTURES / name).read_bytes()
+
+    client = MagicMock()
+    client.fetch.side_effect = fetch
+    return client
+
+
+def _fetch_batch(client, repository):
+    with patch("fmi_cal.batch.async_fetcher", return_value=ThreadPoolFetcher(client, 2)):
+        return asyncio.run(fetch_batch_schedules(
+            "https://fake/orar/2025-2/tabelar", ["IE2"], repository, client, 2, "stream"
+        ))
+
+
+class TestFetchBatchSchedules:
+    def test_fetches_the_room_legend_with_the_schedules(self, schedules, rooms, repository):
+        client = _fixture_client()
+        fetched_schedules, room_legend = _fetch_batch(client, repository)
+
+        assert room_legend == rooms
+        assert fetched_schedules["IE2"] == schedules
+        fetched = [call.args[0] for call in client.fetch.call_args_list]
+        assert fetched.count("https://fake/orar/2025-2/sali/legenda.html") == 1
+
+    def test_missing_room_legend_is_not_fatal(self, schedules, repository, capsys):
+        fetched_schedules, room_legend = _fetch_batch(
+            _fixture_client(unreachable={"legenda.html"}), repository
+        )
+
+        assert room_legend == {}
+        assert fetched_schedules["IE2"] == schedules
+        assert "Could not fetch room legend" in capsys.readouterr().out
+
+
+class TestParseArgs:
+    def test_semester(self):
+        assert parse_args(["users.yaml", "--semester", "2025-2"]).semester == (2025, 2)
+        assert parse_args(["users.yaml"]).semester is None
+
+    @pytest.mark.parametrize("value", ["2025", "2025-3", "last-2"])
+    def test_malformed_semester_is_a_usage_error(self, value, capsys):
+        with pytest.raises(SystemExit) as exc:
+            parse_args(["users.yaml", "--semester", value])
+        assert exc.value.code == 2
+        assert "invalid semester" in capsys.readouterr().err
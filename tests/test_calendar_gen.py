@@ -1,6 +1,11 @@
+import gc
+from dataclasses import replace
 from datetime import date
 
-from fmi_cal.calendar_gen import filter_entries_for_student, apply_user_filters, generate_ics
+from fmi_cal import calendar_gen
+from fmi_cal.calendar_gen import (
+    apply_user_filters, filter_entries_for_student, formation_index, generate_ics,
+)
 from fmi_cal.models import (
     AcademicCalendar,
     EventType,
@@ -21,6 +26,18 @@ def _make_entry(**kwargs):
     return ScheduleEntry(**defaults)
 
 
+def _formation_matches(formation, group, subgroup):
+    """The matching rules of filter_entries_for_student, one entry at a time."""
+    if not formation[0].isdigit():
+        return True
+    if formation == group:
+        return True
+    if "/" in formation and "/" not in group:
+        entry_group, entry_sub = formation.split("/", 1)
+        return entry_group == group and (subgroup is None or entry_sub == subgroup)
+    return False
+
+
 def _make_group_schedule():
     """Create a realistic group schedule for group 923."""
     return GroupSchedule(group="923", entries=[
@@ -82,6 +99,57 @@ class TestFilterEntriesForStudent:
         assert "Lab B" in subjects
 
 
+    def test_keeps_page_order(self):
+        gs = GroupSchedule(group="923", entries=[
+            _make_entry(formation="923/2", subject="Lab B"),
+            _make_entry(formation="IE2", subject="Course A"),
+            _make_entry(formation="923/1", subject="Lab A"),
+            _make_entry(formation="923", subject="Seminar A"),
+        ])
+        result = filter_entries_for_student(gs, "923", None)
+        assert [e.subject for e in result] == ["Lab B", "Course A", "Lab A", "Seminar A"]
+
+    def test_matches_formation_rules(self):
+        gs = _make_group_schedule()
+        for group in ("923", "924", "923/1"):
+            for subgroup in ("1", "2", None):
+                expected = [
+                    e for e in gs.entries if _formation_matches(e.formation, group, subgroup)
+                ]
+                assert filter_entries_for_student(gs, group, subgroup) == expected
+
+
+class TestFormationIndex:
+    def test_buckets(self):
+        index = formation_index(_make_group_schedule())
+        assert index.year_wide and index.group
+        assert [sub for sub, _ in index.subgroups] == ["1", "2"]
+
+    def test_built_once_per_group(self):
+        gs = _make_group_schedule()
+        assert formation_index(gs) is formation_index(gs, "923")
+        assert formation_index(gs, "924") is not formation_index(gs, "923")
+
+    def test_index_is_hashable(self):
+        gs = _make_group_schedule()
+        assert hash(formation_index(gs)) == hash(formation_index(_make_group_schedule()))
+
+    def test_kept_outside_the_schedule(self):
+        gs = _make_group_schedule()
+        formation_index(gs)
+        assert gs == _make_group_schedule()
+        assert replace(gs, group="924") == GroupSchedule(group="924", entries=gs.entries)
+        assert formation_index(replace(gs, group="924")).group == ()
+
+    def test_dropped_with_the_schedule(self):
+        gs = _make_group_schedule()
+        formation_index(gs)
+        key = id(gs)
+        del gs
+        gc.collect()
+        assert key not in calendar_gen._formation_indexes
+
+
 class TestApplyUserFilters:
     def test_filter_by_type(self):
         entries = [
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from fmi_cal.academic import AcademicCalendarRepository
+from fmi_cal.cli import main
+from fmi_cal.metadata import MetadataCache
+from fmi_cal.scraper import parse_group_schedules
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# Modules that only specific code paths need (prompts, BeautifulSoup
+# parsing, the icalendar backend, the config file)
+LAZY_MODULES = ("InquirerPy", "prompt_toolkit", "bs4", "icalendar", "yaml")
+
+# Import time of fmi_cal.cli itself, as a fraction of the time of its
+# required dependencies (requests and asyncio) imported just before it in
+# the same interpreter, so machine speed and load cancel out. Best of
+# three runs. It is about 0.3; InquirerPy alone used to add ~0.6.
+IMPORT_BUDGET_RATIO = 0.6
+
+
+def _importtime(code: str) -> dict[str, int]:
+    """Run `python -X importtime -c code`; map module -> cumulative us."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    def test_heavy_dependencies_are_not_imported(self):
+        imported = _importtime("import fmi_cal.cli")
+        loaded = [m for m in LAZY_MODULES if m in imported]
+        assert loaded == []
+
+    def test_import_time_budget(self):
+        ratios = []
+        for _ in range(3):
+            times = _importtime("import asyncio, requests; import fmi_cal.cli")
+            ratios.append(times["fmi_cal.cli"] / (times["asyncio"] + times["requests"]))
+        assert min(ratios) < IMPORT_BUDGET_RATIO
+
+
+class TestNonInteractive:
+    def test_fully_specified_run_never_prompts(self, tmp_path):
+        schedules = parse_group_schedules((FIXTURES / "IE2.html").read_bytes())
+        content = (FIXTURES / "academic_calendar.html").read_bytes()
+        output = tmp_path / "out.ics"
+
+        metadata = MetadataCache(tmp_path / "metadata.json")
+        metadata.put("base_url/2025-2", "https://fake/files/orar/2025-2/tabelar")
+        metadata.put("specializations/https://fake/files/orar/2025-2/tabelar", [])
+        metadata.put(
+            "room_legend/https://fake/files/orar/2025-2/tabelar",
+            {"2/I": "Cladirea Centrala, etaj 2"},
+        )
+
+        with patch("fmi_cal.cli.MetadataCache", return_value=metadata), \
+             patch("fmi_cal.cli.fetch_group_schedules", return_value=schedules), \
+             patch("fmi_cal.cli.get_default_repository",
+                   return_value=AcademicCalendarRepository(content=content)), \
+             patch("fmi_cal.cli.load_config", return_value=None), \
+             patch("fmi_cal.cli.save_config") as save_config, \
+             patch("fmi_cal.cli._inquirer", MagicMock(side_effect=AssertionError("prompted"))):
+            main([
+                "--spec", "IE2", "--group", "921", "--subgroup", "1",
+                "--no-filter", "-o", str(output), "--semester", "2025-2",
+            ])
+
+        assert output.read_bytes().startswith(b"BEGIN:VCALENDAR")
+        assert b"Cladirea Centrala" in output.read_bytes()
+        save_config.assert_called_once()
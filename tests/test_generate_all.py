@@ -0,0 +1,200 @@
+import importlib.util
+import json
+import shutil
+import sys
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from fmi_cal.academic import AcademicCalendarRepository
+from fmi_cal.scraper import parse_room_legend, parse_spec_table, schedule_page_url
+from fmi_cal.table import SpecTable
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _load_script(name):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    # Registered so worker processes can unpickle references to it
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+synth = _load_script("synth_faculty")
+generate_all = _load_script("generate_all")
+
+BASE = "https://www.cs.ubbcluj.ro/files/orar/2025-2/tabelar"
+SHAPE = synth.FacultyShape(programs=2, years=2, groups=2, entries=6, rooms=5, holidays=1)
+
+
+@pytest.fixture
+def faculty(tmp_path, monkeypatch):
+    """A synthetic faculty seeded into an HTTP cache; builds write to tmp_path/site."""
+    pages = synth.build_faculty(2025, 2, SHAPE)
+    synth.seed_cache(pages, tmp_path / "cache")
+    monkeypatch.chdir(tmp_path)
+    return pages
+
+
+def _reseed(tmp_path, pages):
+    shutil.rmtree(tmp_path / "cache")
+    synth.seed_cache(pages, tmp_path / "cache")
+
+
+def _build(tmp_path, *extra):
+    """Run build_site offline; return its build report."""
+    args = generate_all.parse_args([
+        "2025-2", "--offline", "--cache-dir", str(tmp_path / "cache"),
+        "--report", str(tmp_path / "report.json"), *extra,
+    ])
+    generate_all.build_site(args, [])
+    return json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+
+
+def _manifest(tmp_path):
+    return generate_all.load_manifest(tmp_path / "site" / generate_all.MANIFEST_NAME)
+
+
+def _outputs(tmp_path):
+    site = tmp_path / "site"
+    return {p.relative_to(site).as_posix(): p.read_bytes() for p in site.rglob("*.ics")}
+
+
+class TestSpecInputKey:
+    def test_changes_with_every_input(self):
+        spec = generate_all.Specialization("Informatica", "I1", 1, "I1.html")
+        result = generate_all.SpecFetchResult(
+            spec=spec, table=SpecTable(), acad_cal=None, html_hash="page", last_modified="Mon"
+        )
+        key = generate_all.spec_input_key(result, "rooms", "code")
+
+        assert generate_all.spec_input_key(result, "rooms", "code") == key
+        assert generate_all.spec_input_key(result, "other rooms", "code") != key
+        assert generate_all.spec_input_key(result, "rooms", "new code") != key
+        assert generate_all.spec_input_key(result, "rooms", "code", "compact") != key
+        for change in ({"html_hash": "new page"}, {"last_modified": "Tue"}):
+            changed = replace(result, **change)
+            assert generate_all.spec_input_key(changed, "rooms", "code") != key
+
+
+class TestBuildManifest:
+    def test_unchanged_specs_are_reused(self, faculty, tmp_path):
+        first = _build(tmp_path)
+        outputs = _outputs(tmp_path)
+        manifest = _manifest(tmp_path)
+
+        second = _build(tmp_path)
+
+        assert first["totals"]["rebuilt"] == SHAPE.spec_count
+        assert second["totals"]["rebuilt"] == 0
+        assert second["cache"]["manifest_reuse_rate"] == 1.0
+        assert _manifest(tmp_path) == manifest
+        assert _outputs(tmp_path) == outputs
+
+    def test_missing_output_forces_a_rebuild(self, faculty, tmp_path):
+        _build(tmp_path)
+        lost = sorted(_outputs(tmp_path))[0]
+        (tmp_path / "site" / lost).unlink()
+
+        report = _build(tmp_path)
+
+        assert report["totals"]["rebuilt"] == 1
+        assert (tmp_path / "site" / lost).exists()
+
+    def test_changed_page_rebuilds_its_spec_and_drops_stale_outputs(self, faculty, tmp_path):
+        _build(tmp_path)
+        before = _outputs(tmp_path)
+        url = schedule_page_url(BASE, "SA1")
+        # The same spec with one group fewer
+        smaller = synth.build_faculty(2025, 2, synth.FacultyShape(
+            programs=2, years=2, groups=1, entries=6, rooms=5, holidays=1,
+        ))
+        _reseed(tmp_path, {**faculty, url: smaller[url]})
+
+        report = _build(tmp_path)
+
+        removed = set(before) - set(_outputs(tmp_path))
+        assert report["totals"]["rebuilt"] == 1
+        # Group 101 of SA1 is gone from the site and from the manifest
+        assert removed and all("/Year 1/101-" in rel for rel in removed)
+        assert not any("/101-" in rel for rel in _manifest(tmp_path)["SA1"]["outputs"])
+
+    def test_fetch_error_keeps_the_last_good_outputs(self, faculty, tmp_path):
+        _build(tmp_path)
+        outputs = _outputs(tmp_path)
+        manifest = _manifest(tmp_path)
+        url = schedule_page_url(BASE, "SA1")
+        _reseed(tmp_path, {u: body for u, body in faculty.items() if u != url})
+
+        with pytest.raises(SystemExit):
+            _build(tmp_path)
+
+        assert _manifest(tmp_path) == manifest
+        assert _outputs(tmp_path) == outputs
+
+    def test_generate_error_keeps_the_last_good_outputs(self, faculty, tmp_path):
+        _build(tmp_path)
+        outputs = _outputs(tmp_path)
+        manifest = _manifest(tmp_path)
+        url = schedule_page_url(BASE, "SA1")
+        _reseed(tmp_path, {**faculty, url: faculty[url] + b"<!-- edited -->"})
+
+        with patch.object(
+            generate_all, "write_group_calendars", side_effect=RuntimeError("disk full")
+        ), pytest.raises(SystemExit):
+            _build(tmp_path)
+
+        assert _manifest(tmp_path)["SA1"] == manifest["SA1"]
+        assert _outputs(tmp_path) == outputs
+
+
+def _fixture_jobs(tmp_path, broken=None):
+    """Build jobs for three specs sharing the fixture timetable."""
+    table = parse_spec_table((FIXTURES / "IE2.html").read_bytes())
+    calendar = AcademicCalendarRepository(
+        content=(FIXTURES / "academic_calendar.html").read_bytes()
+    ).get("romanian", 2)
+    rooms = parse_room_legend((FIXTURES / "legenda.html").read_bytes())
+    (tmp_path / "data").mkdir(parents=True)
+    jobs = []
+    for code, name in (("IE1", "Informatica engleza"), ("IE2", "Informatica engleza"),
+                       ("IR2", "Informatica romana")):
+        spec = generate_all.Specialization(name, code, int(code[-1]), f"{code}.html")
+        result = generate_all.SpecFetchResult(
+            spec=spec, table=table, acad_cal=None if code == broken else calendar
+        )
+        jobs.append(generate_all.SpecBuildJob(result, tmp_path, tmp_path / "data", rooms))
+    return jobs
+
+
+def _built(tmp_path, builds):
+    return [
+        (b.code, b.error, [(p.relative_to(tmp_path).as_posix(), p.read_bytes()) for p in b.outputs])
+        for b in builds
+    ]
+
+
+class TestRunBuilds:
+    def test_worker_processes_match_in_process_build(self, tmp_path, monkeypatch):
+        # Spawned workers import generate_all by name
+        monkeypatch.syspath_prepend(str(SCRIPTS_DIR))
+        serial = list(generate_all.run_builds(_fixture_jobs(tmp_path / "serial"), n_jobs=1))
+        parallel = list(generate_all.run_builds(_fixture_jobs(tmp_path / "parallel"), n_jobs=2))
+
+        assert [b.code for b in parallel] == ["IE1", "IE2", "IR2"]
+        assert _built(tmp_path / "parallel", parallel) == _built(tmp_path / "serial", serial)
+        assert all(b.events and not b.error for b in parallel)
+
+    def test_failed_spec_does_not_stop_the_others(self, tmp_path, monkeypatch):
+        monkeypatch.syspath_prepend(str(SCRIPTS_DIR))
+        builds = list(generate_all.run_builds(_fixture_jobs(tmp_path, broken="IE2"), n_jobs=2))
+
+        assert [b.code for b in builds] == ["IE1", "IE2", "IR2"]
+        assert builds[1].error and not builds[1].outputs
+        assert builds[0].outputs and builds[2].outputs
+        assert not builds[0].error and not builds[2].error
@@ -0,0 +1,275 @@
+import asyncio
+import sys
+from unittest.mock import patch, MagicMock
+
+import pytest
+import requests
+
+from fmi_cal.http_client import (
+    AsyncHttpClient,
+    CacheMissError,
+    HttpCache,
+    HttpClient,
+    ThreadPoolFetcher,
+    async_fetcher,
+    get_default_client,
+)
+from fmi_cal.scraper import fetch_room_legend
+
+
+class TestHttpClient:
+    def test_adapter_pool_and_retries(self):
+        client = HttpClient(pool_size=24, retries=5, backoff_factor=0.1)
+        adapter = client._session.get_adapter("https://www.cs.ubbcluj.ro/")
+
+        assert adapter._pool_maxsize == 24
+        assert adapter.max_retries.total == 5
+        assert adapter.max_retries.backoff_factor == 0.1
+        assert 503 in adapter.max_retries.status_forcelist
+
+    def test_fetch_uses_default_timeout(self):
+        client = HttpClient(timeout=3)
+        resp = _response(200, b"<html></html>")
+        with patch.object(client._session, "get", return_value=resp) as mock_get:
+            assert client.fetch("https://fake/page.html") == b"<html></html>"
+
+        mock_get.assert_called_once_with("https://fake/page.html", timeout=3)
+
+    def test_default_client_is_shared(self):
+        assert get_default_client() is get_default_client()
+
+    def test_injected_client_is_used(self):
+        client = MagicMock()
+        client.fetch.return_value = b"<table><tr><td>L338</td><td>FSEGA</td></tr></table>"
+
+        rooms = fetch_room_legend("https://fake/tabelar", client=client)
+
+        client.fetch.assert_called_once_with("https://fake/sali/legenda.html")
+        assert rooms == {"L338": "FSEGA"}
+
+
+def _response(status, content=b"", headers=None):
+    return MagicMock(status_code=status, content=content, headers=headers or {})
+
+
+class TestHttpCache:
+    def test_store_and_load(self, tmp_path):
+        cache = HttpCache(tmp_path)
+        cache.store("https://fake/a.html", b"body", etag='"abc"', last_modified="Mon")
+
+        cached = cache.load("https://fake/a.html")
+        assert cached.body == b"body"
+        assert cached.etag == '"abc"'
+        assert cached.last_modified == "Mon"
+        assert cache.load("https://fake/b.html") is None
+
+    def test_first_fetch_stores_validators(self, tmp_path):
+        client = HttpClient(cache_dir=tmp_path)
+        resp = _response(200, b"v1", {"ETag": '"v1"', "Last-Modified": "Mon"})
+        with patch.object(client._session, "get", return_value=resp) as mock_get:
+            assert client.fetch("https://fake/a.html") == b"v1"
+
+        assert mock_get.call_args.kwargs["headers"] == {}
+        assert client.cache.load("https://fake/a.html").etag == '"v1"'
+
+    def test_revalidates_and_reuses_on_304(self, tmp_path):
+        client = HttpClient(cache_dir=tmp_path)
+        client.cache.store("https://fake/a.html", b"v1", etag='"v1"', last_modified="Mon")
+        with patch.object(client._session, "get", return_value=_response(304)) as mock_get:
+            assert client.fetch("https://fake/a.html") == b"v1"
+
+        assert mock_get.call_args.kwargs["headers"] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon",
+        }
+
+    def test_fetch_response_keeps_last_modified(self, tmp_path):
+        client = HttpClient(cache_dir=tmp_path)
+        lm = "Mon, 02 Mar 2026 09:15:00 GMT"
+        resp = _response(200, b"v1", {"ETag": '"v1"', "Last-Modified": lm})
+        with patch.object(client._session, "get", return_value=resp):
+            assert client.fetch_response("https://fake/a.html").last_modified == lm
+        # A 304 answers with the validators stored on the first fetch
+        with patch.object(client._session, "get", return_value=_response(304)):
+            page = client.fetch_response("https://fake/a.html")
+        assert (page.body, page.last_modified) == (b"v1", lm)
+
+    def test_replaces_changed_body(self, tmp_path):
+        client = HttpClient(cache_dir=tmp_path)
+        client.cache.store("https://fake/a.html", b"v1", etag='"v1"')
+        resp = _response(200, b"v2", {"ETag": '"v2"'})
+        with patch.object(client._session, "get", return_value=resp):
+            assert client.fetch("https://fake/a.html") == b"v2"
+
+        assert client.cache.load("https://fake/a.html").body == b"v2"
+
+    def test_stats(self, tmp_path):
+        client = HttpClient(cache_dir=tmp_path)
+        with patch.object(client._session, "get", return_value=_response(200, b"v1", {"ETag": '"v1"'})):
+            client.fetch("https://fake/a.html")
+        with patch.object(client._session, "get", return_value=_response(304)):
+            client.fetch("https://fake/a.html")
+
+        stats = client.stats
+        assert (stats.requests, stats.bytes_received) == (2, 2)
+        assert (stats.cache_hits, stats.cache_misses) == (1, 1)
+        assert stats.hit_rate() == 0.5
+
+    def test_does_not_cache_errors(self, tmp_path):
+        client = HttpClient(cache_dir=tmp_path)
+        with patch.object(client._session, "get", return_value=_response(404, b"nope")):
+            with pytest.raises(requests.HTTPError):
+                client.fetch("https://fake/a.html")
+
+        assert client.cache.load("https://fake/a.html") is None
+
+    def test_error_status_keeps_cached_body(self, tmp_path):
+        client = HttpClient(cache_dir=tmp_path)
+        client.cache.store("https://fake/IE2.html", b"<html>IE2</html>", etag='"v1"')
+        error = _response(503, b"<html>Service Unavailable</html>")
+        with patch.object(client._session, "get", return_value=error):
+            with pytest.raises(requests.HTTPError):
+                client.fetch("https://fake/IE2.html")
+
+        assert client.cache.load("https://fake/IE2.html").body == b"<html>IE2</html>"
+
+    def test_error_status_without_cache_raises(self):
+        client = HttpClient()
+        with patch.object(client._session, "get", return_value=_response(500, b"oops")):
+            with pytest.raises(requests.HTTPError):
+                client.fetch("https://fake/a.html")
+
+
+class TestOfflineMode:
+    def test_requires_cache_dir(self):
+        with pytest.raises(ValueError):
+            HttpClient(offline=True)
+
+    def test_replays_cached_body(self, tmp_path):
+        HttpCache(tmp_path).store("https://fake/a.html", b"cached")
+        client = HttpClient(cache_dir=tmp_path, offline=True)
+        with patch.object(client._session, "get") as mock_get:
+            assert client.fetch("https://fake/a.html") == b"cached"
+
+        mock_get.assert_not_called()
+
+    def test_cache_miss_raises(self, tmp_path):
+        client = HttpClient(cache_dir=tmp_path, offline=True)
+        with pytest.raises(CacheMissError):
+            client.fetch("https://fake/a.html")
+        with pytest.raises(CacheMissError):
+            client.head("https://fake/a.html")
+
+
+def _mock_transport(handler):
+    httpx = pytest.importorskip("httpx")
+    return httpx.MockTransport(handler)
+
+
+class TestAsyncHttpClient:
+    def _fetch_all(self, client, transport, urls, concurrency=4):
+        async def run():
+            async with AsyncHttpClient(client, concurrency, transport=transport) as fetcher:
+                return await asyncio.gather(
+                    *(fetcher.fetch(url) for url in urls), return_exceptions=True
+                )
+        return asyncio.run(run())
+
+    def test_caches_and_revalidates(self, tmp_path):
+        httpx = pytest.importorskip("httpx")
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=b"v1", headers={"ETag": '"v1"'})
+
+        client = HttpClient(cache_dir=tmp_path)
+        transport = _mock_transport(handler)
+        assert self._fetch_all(client, transport, ["https://fake/a.html"]) == [b"v1"]
+        assert self._fetch_all(client, transport, ["https://fake/a.html"]) == [b"v1"]
+
+        assert seen == [None, '"v1"']
+        assert (client.stats.cache_hits, client.stats.cache_misses) == (1, 1)
+
+    def test_retries_then_raises_keeping_the_cached_body(self, tmp_path):
+        httpx = pytest.importorskip("httpx")
+        calls = []
+
+        def handler(request):
+            calls.append(request.url)
+            return httpx.Response(503, content=b"<html>Service Unavailable</html>")
+
+        client = HttpClient(cache_dir=tmp_path, retries=2, backoff_factor=0)
+        client.cache.store("https://fake/IE2.html", b"<html>IE2</html>", etag='"v1"')
+        [error] = self._fetch_all(client, _mock_transport(handler), ["https://fake/IE2.html"])
+
+        assert isinstance(error, requests.HTTPError)
+        assert len(calls) == 3
+        assert client.cache.load("https://fake/IE2.html").body == b"<html>IE2</html>"
+
+    def test_retries_transient_errors(self):
+        httpx = pytest.importorskip("httpx")
+        replies = [
+            httpx.ConnectError("refused"),
+            httpx.Response(502),
+            httpx.Response(200, content=b"ok"),
+        ]
+
+        def handler(request):
+            reply = replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+        client = HttpClient(retries=2, backoff_factor=0)
+        assert self._fetch_all(client, _mock_transport(handler), ["https://fake/a.html"]) == [b"ok"]
+
+    def test_bounds_requests_in_flight(self):
+        httpx = pytest.importorskip("httpx")
+        in_flight = peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, content=request.url.path.encode())
+
+        urls = [f"https://fake/{n}.html" for n in range(10)]
+        bodies = self._fetch_all(HttpClient(), _mock_transport(handler), urls, concurrency=3)
+
+        assert bodies == [f"/{n}.html".encode() for n in range(10)]
+        assert peak == 3
+
+    def test_offline_replays_the_cache(self, tmp_path):
+        HttpCache(tmp_path).store("https://fake/a.html", b"cached")
+        client = HttpClient(cache_dir=tmp_path, offline=True)
+
+        def handler(request):
+            raise AssertionError("network used offline")
+
+        bodies = self._fetch_all(client, _mock_transport(handler), ["https://fake/a.html"])
+        assert bodies == [b"cached"]
+
+
+class TestFetcherLifecycle:
+    def test_owned_client_is_closed(self):
+        fetcher = ThreadPoolFetcher(concurrency=2)
+        with patch.object(fetcher.client, "close") as close:
+            asyncio.run(fetcher.aclose())
+        close.assert_called_once()
+
+    def test_injected_client_stays_open(self):
+        client = HttpClient()
+        with patch.object(client, "close") as close:
+            asyncio.run(ThreadPoolFetcher(client, concurrency=2).aclose())
+        close.assert_not_called()
+
+    def test_falls_back_to_threads_without_httpx(self):
+        with patch.dict(sys.modules, {"httpx": None}):
+            fetcher = async_fetcher(concurrency=2)
+        assert isinstance(fetcher, ThreadPoolFetcher)
+        asyncio.run(fetcher.aclose())
@@ -0,0 +1,334 @@
+import io
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pytest
+from bs4 import BeautifulSoup
+from icalendar import Calendar
+
+from fmi_cal.academic import build_teaching_index, fetch_academic_calendar
+from fmi_cal.calendar_gen import (
+    filter_entries_for_student,
+    generate_ics,
+    iter_ics,
+    verify_compact_ics,
+    write_ics,
+)
+from fmi_cal.ics import (
+    EventBlockCache,
+    ics_escape,
+    ics_fold,
+    recurrence_runs,
+    serialize_calendar,
+    serialize_events,
+    source_dtstamp,
+)
+from fmi_cal.scraper import fetch_group_schedules, fetch_room_legend
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _fixture_soup(name):
+    content = (FIXTURES / name).read_bytes()
+    return BeautifulSoup(content, "html.parser", from_encoding="iso-8859-2")
+
+
+def _mock_requests_get(*args, **kwargs):
+    mock_resp = MagicMock(status_code=200)
+    mock_resp.content = (FIXTURES / "academic_calendar.html").read_bytes()
+    return mock_resp
+
+
+def _load_fixtures():
+    with patch("fmi_cal.scraper._fetch_html", return_value=_fixture_soup("IE2.html")):
+        schedules = fetch_group_schedules("https://fake", "IE2", parser="html.parser")
+    with patch("fmi_cal.scraper._fetch_html", return_value=_fixture_soup("legenda.html")):
+        rooms = fetch_room_legend("https://fake/tabelar")
+    with patch("fmi_cal.http_client.requests.Session.get", side_effect=_mock_requests_get):
+        cal = fetch_academic_calendar("romanian", 2)
+    return schedules, rooms, cal
+
+
+def _parsed_events(ics_bytes):
+    cal = Calendar.from_ical(ics_bytes)
+    events = []
+    for ev in cal.walk("VEVENT"):
+        events.append((
+            str(ev.get("summary")),
+            ev.decoded("dtstart"),
+            ev.decoded("dtend"),
+            str(ev.get("location", "")),
+            str(ev.get("description", "")),
+        ))
+    return sorted(events)
+
+
+class TestIcsEscape:
+    def test_special_characters(self):
+        assert ics_escape("A; B, C\\D\nE") == "A\\; B\\, C\\\\D\\nE"
+
+
+class TestIcsFold:
+    def test_short_line_unchanged(self):
+        assert ics_fold("SUMMARY:short") == "SUMMARY:short"
+
+    def test_folds_at_utf8_byte_boundaries(self):
+        line = "SUMMARY:[C] Programare în limbajul " + "ș" * 60
+        folded = ics_fold(line)
+
+        parts = folded.split("\r\n")
+        for part in parts:
+            assert len(part.encode("utf-8")) <= 75
+        assert "".join(p[1:] if i else p for i, p in enumerate(parts)) == line
+
+
+class TestNativeBackend:
+    def test_includes_vtimezone(self):
+        schedules, rooms, cal = _load_fixtures()
+        ics_text = generate_ics(schedules[0].entries, cal, rooms).decode("utf-8")
+
+        assert "BEGIN:VTIMEZONE" in ics_text
+        assert "TZID:Europe/Bucharest" in ics_text
+        assert "DTSTART;TZID=Europe/Bucharest:" in ics_text
+        assert ics_text.endswith("END:VCALENDAR\r\n")
+
+    def test_uid_matches_worker_format(self):
+        schedules, rooms, cal = _load_fixtures()
+        ics_text = generate_ics(schedules[0].entries, cal, rooms).decode("utf-8")
+
+        uids = [line for line in ics_text.split("\r\n") if line.startswith("UID:")]
+        assert uids
+        for uid in uids:
+            assert " " not in uid
+            assert uid.endswith("@fmi-cal")
+
+    def test_matches_icalendar_backend(self):
+        schedules, rooms, cal = _load_fixtures()
+
+        for gs in schedules:
+            native = generate_ics(gs.entries, cal, rooms, backend="native")
+            reference = generate_ics(gs.entries, cal, rooms, backend="icalendar")
+            assert _parsed_events(native) == _parsed_events(reference)
+
+
+class TestStreaming:
+    def _strip_dtstamp(self, ics_bytes):
+        return b"\r\n".join(
+            line for line in ics_bytes.split(b"\r\n") if not line.startswith(b"DTSTAMP:")
+        )
+
+    def test_iter_ics_matches_generate_ics(self):
+        schedules, rooms, cal = _load_fixtures()
+        entries = schedules[0].entries
+
+        chunks = list(iter_ics(entries, cal, rooms))
+        # header + one chunk per entry with dates + footer
+        assert len(chunks) > 2
+        assert chunks[0].startswith(b"BEGIN:VCALENDAR")
+        assert chunks[-1] == b"END:VCALENDAR\r\n"
+        assert self._strip_dtstamp(b"".join(chunks)) == self._strip_dtstamp(
+            generate_ics(entries, cal, rooms)
+        )
+
+    def test_write_ics_to_file_object(self):
+        schedules, rooms, cal = _load_fixtures()
+        buf = io.BytesIO()
+
+        written = write_ics(buf, schedules[0].entries, cal, rooms)
+        assert written == len(buf.getvalue())
+        assert buf.getvalue().count(b"BEGIN:VEVENT") == generate_ics(
+            schedules[0].entries, cal, rooms
+        ).count(b"BEGIN:VEVENT")
+
+
+class TestEventBlockCache:
+    STAMP = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+    def test_matches_uncached_output(self):
+        schedules, rooms, cal = _load_fixtures()
+        index = build_teaching_index(cal)
+        cache = EventBlockCache(rooms, dtstamp=self.STAMP)
+
+        for gs in schedules:
+            for subgroup in ("1", "2", None):
+                entries = filter_entries_for_student(gs, gs.group, subgroup)
+                buf = io.BytesIO()
+                write_ics(buf, entries, index, cache=cache)
+                expected = serialize_calendar(
+                    entries, [index.dates_for(e) for e in entries], rooms, self.STAMP
+                )
+                assert buf.getvalue() == expected
+
+    def test_counts_hits_across_calendars(self):
+        schedules, rooms, cal = _load_fixtures()
+        index = build_teaching_index(cal)
+        cache = EventBlockCache(rooms)
+        gs = schedules[0]
+
+        entries_1 = filter_entries_for_student(gs, gs.group, "1")
+        b"".join(iter_ics(entries_1, index, cache=cache))
+        assert cache.hits == 0
+        assert cache.misses == len(set(entries_1))
+
+        entries_all = filter_entries_for_student(gs, gs.group, None)
+        b"".join(iter_ics(entries_all, index, cache=cache))
+        assert cache.hits >= len(entries_1)
+        assert cache.stats()["blocks"] == len(set(entries_all))
+
+    def test_hits_when_calendars_rebuild_their_index(self):
+        schedules, rooms, cal = _load_fixtures()
+        entries = schedules[0].entries
+        # More calendars than build_teaching_index keeps memoized; the extra
+        # holiday falls outside the semester, so all expand to the same dates
+        calendars = [
+            replace(cal, holidays=cal.holidays + (date(2000, 1, 1) + timedelta(days=i),))
+            for i in range(21)
+        ]
+        cache = EventBlockCache(rooms)
+
+        for calendar in calendars * 2:
+            b"".join(iter_ics(entries, calendar, cache=cache))
+
+        assert cache.misses == len(set(entries))
+        assert cache.hits == len(calendars) * 2 * len(entries) - cache.misses
+
+    def test_counts_events_emitted(self):
+        schedules, rooms, cal = _load_fixtures()
+        index = build_teaching_index(cal)
+        for compact in (False, True):
+            cache = EventBlockCache(rooms, compact=compact)
+            emitted = 0
+            for gs in schedules:
+                entries = filter_entries_for_student(gs, gs.group, None)
+                emitted += b"".join(iter_ics(entries, index, cache=cache)).count(b"BEGIN:VEVENT")
+            assert cache.events == emitted
+
+
+    def test_conflicting_settings_rejected(self):
+        schedules, rooms, cal = _load_fixtures()
+        entries = schedules[0].entries
+        cache = EventBlockCache(rooms, compact=True)
+
+        with pytest.raises(ValueError, match="room_legend"):
+            iter_ics(entries, cal, {"2/I": "elsewhere"}, cache=cache)
+        with pytest.raises(ValueError, match="compact"):
+            write_ics(io.BytesIO(), entries, cal, cache=cache, compact=False)
+        # Settings that agree with the cache are accepted
+        assert b"".join(iter_ics(entries, cal, rooms, cache=cache, compact=True)) == b"".join(
+            iter_ics(entries, cal, cache=cache)
+        )
+
+
+class TestRecurrenceRuns:
+    def test_holiday_becomes_exdate(self):
+        mondays = [date(2026, 3, 2) + timedelta(weeks=i) for i in range(5)]
+        dates = mondays[:2] + mondays[3:]
+
+        assert recurrence_runs(dates, 1) == [(mondays[0], 5, [mondays[2]])]
+
+    def test_parity_shift_starts_new_run(self):
+        first = [date(2026, 3, 2), date(2026, 3, 16)]
+        # a vacation week in between moves the next odd week 3 weeks later
+        second = [date(2026, 4, 6), date(2026, 4, 20)]
+
+        assert recurrence_runs(first + second, 2) == [
+            (first[0], 2, []),
+            (second[0], 2, []),
+        ]
+
+    def test_empty(self):
+        assert recurrence_runs((), 1) == []
+
+
+class TestCompactMode:
+    def test_expands_to_same_occurrences(self):
+        schedules, rooms, cal = _load_fixtures()
+
+        for gs in schedules:
+            for subgroup in ("1", "2", None):
+                entries = filter_entries_for_student(gs, gs.group, subgroup)
+                compact = generate_ics(entries, cal, rooms, compact=True)
+                assert verify_compact_ics(compact, entries, cal, rooms) == []
+
+    def test_fewer_events(self):
+        schedules, rooms, cal = _load_fixtures()
+        entries = schedules[0].entries
+
+        compact = generate_ics(entries, cal, rooms, compact=True)
+        full = generate_ics(entries, cal, rooms)
+        assert b"RRULE:FREQ=WEEKLY;INTERVAL=" in compact
+        assert compact.count(b"BEGIN:VEVENT") < full.count(b"BEGIN:VEVENT") / 4
+
+    def test_verifier_reports_differences(self):
+        schedules, rooms, cal = _load_fixtures()
+        entries = list(schedules[0].entries)
+
+        compact = generate_ics(entries[1:], cal, rooms, compact=True)
+        problems = verify_compact_ics(compact, entries, cal, rooms)
+        assert problems
+        assert all(p.startswith("missing: ") for p in problems)
+
+    def test_cache_compact_matches_uncached(self):
+        schedules, rooms, cal = _load_fixtures()
+        stamp = datetime(2026, 2, 1, tzinfo=timezone.utc)
+        entries = schedules[0].entries
+        cache = EventBlockCache(rooms, dtstamp=stamp, compact=True)
+
+        cached = b"".join(iter_ics(entries, cal, cache=cache))
+        expected = serialize_calendar(
+            entries, _dates(entries, cal), rooms, stamp, compact=True
+        )
+        assert cached == expected
+
+    def test_extra_lines_follow_dtend(self):
+        schedules, rooms, _ = _load_fixtures()
+        entry = schedules[0].entries[0]
+        lines = serialize_events(
+            entry, (date(2026, 3, 2),), rooms, "20260301T000000Z", ["RRULE:FREQ=WEEKLY"]
+        )
+        dtend = next(i for i, line in enumerate(lines) if line.startswith("DTEND"))
+        assert lines[dtend + 1] == "RRULE:FREQ=WEEKLY"
+        assert lines[dtend + 2].startswith("SUMMARY:")
+
+    def test_icalendar_backend_rejects_compact(self):
+        schedules, rooms, cal = _load_fixtures()
+        with pytest.raises(ValueError):
+            generate_ics(schedules[0].entries, cal, rooms, backend="icalendar", compact=True)
+
+
+def _dates(entries, cal):
+    index = build_teaching_index(cal)
+    return [index.dates_for(e) for e in entries]
+
+
+class TestDeterministicOutput:
+    def test_identical_inputs_give_identical_bytes(self):
+        schedules, rooms, cal = _load_fixtures()
+        entries = schedules[0].entries
+
+        first = generate_ics(entries, cal, rooms)
+        assert generate_ics(entries, cal, rooms) == first
+        assert b"".join(iter_ics(entries, cal, rooms)) == first
+        assert b"".join(iter_ics(entries, cal, cache=EventBlockCache(rooms))) == first
+
+    def test_dtstamp_from_academic_calendar(self):
+        schedules, rooms, cal = _load_fixtures()
+        ics_text = generate_ics(schedules[0].entries, cal, rooms).decode("utf-8")
+
+        stamps = {line for line in ics_text.split("\r\n") if line.startswith("DTSTAMP:")}
+        assert stamps == {"DTSTAMP:20260223T000000Z"}
+
+    def test_dtstamp_from_schedule_last_modified(self):
+        _, _, cal = _load_fixtures()
+        assert source_dtstamp(cal, "Mon, 02 Mar 2026 11:15:00 +0200") == datetime(
+            2026, 3, 2, 9, 15, tzinfo=timezone.utc
+        )
+        assert source_dtstamp(cal, "Mon, 02 Mar 2026 09:15:00") == datetime(
+            2026, 3, 2, 9, 15, tzinfo=timezone.utc
+        )
+        # Unparseable or missing: the first teaching day
+        assert source_dtstamp(cal, "yesterday") == source_dtstamp(cal) == datetime(
+            2026, 2, 23, tzinfo=timezone.utc
+        )
@@ -0,0 +1,110 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from fmi_cal.metadata import MetadataCache
+from fmi_cal.models import Specialization
+from fmi_cal.scraper import guess_semester, resolve_schedule_base_url
+
+BASE = "https://www.cs.ubbcluj.ro/files/orar/2025-2/tabelar"
+SPECS = [Specialization(name="Informatica economica", year=2, code="IE2", href="IE2.html")]
+
+
+class TestGuessSemester:
+    def test_autumn_is_semester_1(self):
+        assert guess_semester(today=date(2025, 10, 1)) == (2025, 1)
+
+    def test_january_is_semester_1_of_previous_year(self):
+        assert guess_semester(today=date(2026, 1, 15)) == (2025, 1)
+
+    def test_spring_is_semester_2(self):
+        assert guess_semester(today=date(2026, 3, 1)) == (2025, 2)
+
+    def test_overrides_are_kept(self):
+        assert guess_semester(2024, 2, today=date(2026, 3, 1)) == (2024, 2)
+
+
+class TestResolveScheduleBaseUrl:
+    def test_confirmed_by_head(self):
+        client = MagicMock()
+        client.head.return_value = MagicMock(status_code=200)
+        assert resolve_schedule_base_url(2025, 2, client) == (BASE, True)
+
+    def test_unreachable_site_gives_unconfirmed_guess(self):
+        client = MagicMock()
+        client.head.side_effect = requests.ConnectionError("down")
+        client.get.side_effect = requests.ConnectionError("down")
+        assert resolve_schedule_base_url(2025, 2, client) == (BASE, False)
+
+
+class TestMetadataCache:
+    def test_base_url_resolved_once_per_semester(self, tmp_path):
+        path = tmp_path / "metadata.json"
+        with patch(
+            "fmi_cal.metadata.resolve_schedule_base_url", return_value=(BASE, True)
+        ) as resolve:
+            assert MetadataCache(path).schedule_base_url(2025, 2) == BASE
+            # A new process reads it back from disk
+            assert MetadataCache(path).schedule_base_url(2025, 2) == BASE
+            assert resolve.call_count == 1
+            MetadataCache(path).schedule_base_url(2025, 1)
+            assert resolve.call_count == 2
+
+    def test_unconfirmed_base_url_is_not_cached(self, tmp_path):
+        path = tmp_path / "metadata.json"
+        with patch(
+            "fmi_cal.metadata.resolve_schedule_base_url", return_value=(BASE, False)
+        ) as resolve:
+            assert MetadataCache(path).schedule_base_url(2025, 2) == BASE
+            assert MetadataCache(path).schedule_base_url(2025, 2) == BASE
+            assert resolve.call_count == 2
+
+    def test_specializations_round_trip(self, tmp_path):
+        path = tmp_path / "metadata.json"
+        with patch("fmi_cal.metadata.fetch_specializations", return_value=SPECS) as fetch:
+            assert MetadataCache(path).specializations(BASE) == SPECS
+            assert MetadataCache(path).specializations(BASE) == SPECS
+            assert fetch.call_count == 1
+
+    def test_room_legend(self, tmp_path):
+        path = tmp_path / "metadata.json"
+        rooms = {"2/I": "Cladirea Centrala"}
+        with patch("fmi_cal.metadata.fetch_room_legend", return_value=rooms) as fetch:
+            assert MetadataCache(path).room_legend(BASE) == rooms
+            assert MetadataCache(path).room_legend(BASE) == rooms
+            assert fetch.call_count == 1
+
+    def test_entries_expire(self, tmp_path):
+        cache = MetadataCache(tmp_path / "metadata.json", ttl=60)
+        with patch("fmi_cal.metadata.time.time", return_value=1000.0):
+            cache.put("key", "value")
+        with patch("fmi_cal.metadata.time.time", return_value=1059.0):
+            assert cache.get("key") == "value"
+        with patch("fmi_cal.metadata.time.time", return_value=1060.0):
+            assert cache.get("key") is None
+
+    def test_new_semester_drops_old_lists(self, tmp_path):
+        cache = MetadataCache(tmp_path / "metadata.json")
+        cache.put(f"specializations/{BASE}", [])
+        new_base = BASE.replace("2025-2", "2026-1")
+        with patch("fmi_cal.metadata.resolve_schedule_base_url", return_value=(new_base, True)):
+            cache.schedule_base_url(2026, 1)
+        assert cache.get(f"specializations/{BASE}") is None
+        assert cache.get("base_url/2026-1") == new_base
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        path = tmp_path / "metadata.json"
+        path.write_text("{not json")
+        cache = MetadataCache(path)
+        assert cache.get("base_url/2025-2") is None
+        cache.put("base_url/2025-2", BASE)
+        assert MetadataCache(path).get("base_url/2025-2") == BASE
+
+    def test_clear(self, tmp_path):
+        path = tmp_path / "metadata.json"
+        cache = MetadataCache(path)
+        cache.put("key", "value")
+        cache.clear()
+        assert not path.exists()
+        assert cache.get("key") is None
@@ -0,0 +1,49 @@
+import dataclasses
+from datetime import date
+
+import pytest
+
+from fmi_cal.models import (
+    AcademicCalendar, EventType, Frequency, GroupSchedule, ScheduleEntry, TeachingPeriod,
+)
+
+
+def _entry(**overrides):
+    fields = dict(
+        day="Luni", start_hour=8, end_hour=10, frequency=Frequency.EVERY_WEEK,
+        room="C310", formation="923", event_type=EventType.CURS,
+        subject="Baze de date", professor="Prof. POPESCU Ion",
+    )
+    fields.update(overrides)
+    return ScheduleEntry(**fields)
+
+
+class TestScheduleEntry:
+    def test_frozen(self):
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            _entry().room = "L338"
+
+    def test_slotted(self):
+        assert not hasattr(_entry(), "__dict__")
+
+    def test_usable_as_dict_key(self):
+        memo = {_entry(): 1}
+        assert memo[_entry()] == 1
+        assert _entry(room="L338") not in memo
+
+
+class TestSequenceFields:
+    def test_group_schedule_entries_become_tuple(self):
+        gs = GroupSchedule(group="923", entries=[_entry()])
+        assert gs.entries == (_entry(),)
+        assert hash(gs) == hash(GroupSchedule(group="923", entries=(_entry(),)))
+
+    def test_academic_calendar_fields_become_tuples(self):
+        cal = AcademicCalendar(
+            teaching_periods=[TeachingPeriod(date(2026, 2, 23), date(2026, 4, 12))],
+            holidays=[date(2026, 4, 10)],
+            semester_start=date(2026, 2, 23),
+        )
+        assert isinstance(cal.teaching_periods, tuple)
+        assert cal.holidays == (date(2026, 4, 10),)
+        hash(cal)
@@ -0,0 +1,78 @@
+import cProfile
+import json
+import pstats
+
+import pytest
+
+from fmi_cal import profiling
+
+
+@pytest.fixture(autouse=True)
+def _reset_tracer():
+    yield
+    profiling.disable()
+
+
+def _work():
+    return sum(range(1000))
+
+
+class TestSpans:
+    def test_noop_when_disabled(self):
+        with profiling.span("idle"):
+            pass
+        assert profiling.current() is None
+
+    def test_nested_spans(self):
+        tracer = profiling.enable("test")
+        with profiling.span("outer", spec="IE2"):
+            with profiling.span("inner"):
+                _work()
+        spans = {e["name"]: e for e in tracer.events if e["ph"] == "X"}
+        outer, inner = spans["outer"], spans["inner"]
+        assert outer["args"] == {"spec": "IE2"}
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+        assert tracer.span_count() == 2
+
+    def test_track_sets_row(self):
+        tracer = profiling.enable()
+        with profiling.span("http", 7):
+            pass
+        assert tracer.events[0]["tid"] == 7
+
+    def test_inherited_tracer_is_ignored(self):
+        tracer = profiling.enable()
+        tracer.pid = -1     # as if enabled by the parent of a forked process
+        assert not profiling.enabled()
+        with profiling.span("lost"):
+            pass
+        assert tracer.events == []
+
+    def test_write_chrome_trace(self, tmp_path):
+        tracer = profiling.enable("generate_all")
+        with profiling.span("spec"):
+            pass
+        tracer.extend([{"name": "worker", "ph": "X", "ts": 0, "dur": 1, "pid": 2, "tid": 1}])
+        path = tmp_path / "trace.json"
+        tracer.write(path)
+        data = json.loads(path.read_text())
+        assert [e["name"] for e in data["traceEvents"]] == ["process_name", "spec", "worker"]
+
+
+class TestMergeCprofileStats:
+    def test_sums_calls(self, tmp_path):
+        stats = []
+        for _ in range(2):
+            profiler = cProfile.Profile()
+            profiler.enable()
+            _work()
+            profiler.disable()
+            profiler.create_stats()
+            stats.append(profiler.stats)
+
+        path = tmp_path / "out.pstats"
+        profiling.merge_cprofile_stats(stats, path)
+        merged = pstats.Stats(str(path))
+        calls = {k[2]: v[1] for k, v in merged.stats.items()}
+        assert calls["_work"] == 2
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from fmi_cal import report
+from fmi_cal.report import BuildReport, compare_reports, median_throughput, parse_regression
+
+
+def _report(**throughput) -> dict:
+    return {"version": 1, "throughput": throughput}
+
+
+class TestBuildReport:
+    def test_totals_and_throughput(self):
+        build = BuildReport(config={"jobs": 1})
+        build.record_spec("IE2", fetch_s=0.2, parse_s=0.5, bytes_fetched=1000, entries=50)
+        # Rates use the CPU time, not generate_s or the phase's wall time
+        build.record_spec(
+            "IE2", generate_s=1.0, generate_cpu_s=2.0, events=400, output_bytes=8000, files=4
+        )
+        # Reused spec: fetched and parsed, not generated
+        build.record_spec("MI1", fetch_s=0.1, parse_s=0.5, bytes_fetched=500, entries=50)
+        build.phases = {"fetch": 1.0, "generate": 0.5}
+        data = build.to_dict()
+
+        assert data["totals"]["specs"] == 2
+        assert data["totals"]["rebuilt"] == 1
+        assert data["totals"]["bytes_fetched"] == 1500
+        assert data["throughput"] == {
+            "parse_entries_per_s": 100.0,
+            "generate_events_per_s": 200.0,
+            "generate_output_bytes_per_s": 4000.0,
+        }
+        assert data["phases"]["total"] >= 0
+        assert data["specs"]["IE2"]["events"] == 400
+
+    def test_nothing_rebuilt_has_no_generate_rates(self):
+        build = BuildReport()
+        build.record_spec("IE2", parse_s=0.5, entries=50)
+        build.phases = {"generate": 0.01}
+        assert set(build.to_dict()["throughput"]) == {"parse_entries_per_s"}
+
+    def test_update_report_keeps_other_sections(self, tmp_path):
+        path = tmp_path / "build-report.json"
+        BuildReport().write(path)
+        report.update_report(path, "index", {"seconds": 0.5})
+        data = json.loads(path.read_text())
+        assert data["index"] == {"seconds": 0.5}
+        assert "throughput" in data
+
+
+class TestCompare:
+    def test_parse_regression(self):
+        assert parse_regression("20%") == pytest.approx(0.2)
+        assert parse_regression("0.05") == pytest.approx(0.05)
+        with pytest.raises(ValueError):
+            parse_regression("150%")
+
+    def test_within_threshold(self):
+        changes = compare_reports(_report(a=85.0), _report(a=100.0), 0.2)
+        assert [c.regressed for c in changes] == [False]
+        assert changes[0].change == pytest.approx(-0.15)
+
+    def test_regression(self):
+        changes = compare_reports(_report(a=79.0, b=200.0), _report(a=100.0, b=100.0), 0.2)
+        assert {c.name: c.regressed for c in changes} == {"a": True, "b": False}
+
+    def test_only_shared_metrics(self):
+        assert compare_reports(_report(a=1.0), _report(b=1.0), 0.2) == []
+
+    def test_main_exit_status(self, tmp_path, capsys):
+        current, baseline = tmp_path / "current.json", tmp_path / "baseline.json"
+        report.write_report(current, _report(a=50.0))
+        report.write_report(baseline, _report(a=100.0))
+        with pytest.raises(SystemExit) as exc:
+            report.main([str(current), "--compare", str(baseline), "--max-regression", "20%"])
+        assert exc.value.code == 1
+        assert "REGRESSED" in capsys.readouterr().out
+        report.main([str(current), "--compare", str(baseline), "--max-regression", "60%"])
+
+    def test_median_of_baselines(self):
+        baselines = [_report(a=100.0), _report(a=40.0), _report(a=90.0, b=10.0)]
+        assert median_throughput(baselines) == {"throughput": {"a": 90.0, "b": 10.0}}
+
+    def test_one_slow_baseline_does_not_move_the_gate(self, tmp_path, capsys):
+        paths = []
+        for i, rate in enumerate([100.0, 98.0, 50.0]):
+            paths.append(tmp_path / f"baseline-{i}.json")
+            report.write_report(paths[-1], _report(a=rate))
+        old = tmp_path / "old.json"
+        report.write_report(old, {"version": 0, "throughput": {"a": 1000.0}})
+
+        assert report.check_regression(_report(a=85.0), paths + [old], 0.2)
+        assert not report.check_regression(_report(a=70.0), paths + [old], 0.2)
+        assert "Skipping" in capsys.readouterr().out
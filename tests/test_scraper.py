@@ -1,7 +1,21 @@
+import asyncio
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from fmi_cal.scraper import fetch_specializations, fetch_group_schedules, fetch_room_legend
+import pytest
+
+from fmi_cal.http_client import ThreadPoolFetcher
+
+from fmi_cal.scraper import (
+    fetch_all_specs_async,
+    fetch_room_legend_async,
+    fetch_specializations,
+    fetch_group_schedules,
+    fetch_room_legend,
+    PARSERS,
+    available_parsers,
+    parse_group_schedules,
+)
 from fmi_cal.models import EventType, Frequency
 
 FIXTURES = Path(__file__).parent / "fixtures"
@@ -37,7 +51,7 @@ class TestFetchSpecializations:
 class TestFetchGroupSchedules:
     def test_parses_all_groups(self):
         with patch("fmi_cal.scraper._fetch_html", return_value=_mock_fetch_html("IE2.html")):
-            schedules = fetch_group_schedules("https://fake", "IE2")
+            schedules = fetch_group_schedules("https://fake", "IE2", parser="html.parser")
 
         assert len(schedules) == 7
         group_names = [s.group for s in schedules]
@@ -46,14 +60,14 @@ class TestFetchGroupSchedules:
 
     def test_group_923_entry_count(self):
         with patch("fmi_cal.scraper._fetch_html", return_value=_mock_fetch_html("IE2.html")):
-            schedules = fetch_group_schedules("https://fake", "IE2")
+            schedules = fetch_group_schedules("https://fake", "IE2", parser="html.parser")
 
         g923 = next(s for s in schedules if s.group == "923")
         assert len(g923.entries) == 20
 
     def test_entry_fields(self):
         with patch("fmi_cal.scraper._fetch_html", return_value=_mock_fetch_html("IE2.html")):
-            schedules = fetch_group_schedules("https://fake", "IE2")
+            schedules = fetch_group_schedules("https://fake", "IE2", parser="html.parser")
 
         g923 = next(s for s in schedules if s.group == "923")
 
@@ -73,7 +87,7 @@ class TestFetchGroupSchedules:
 
     def test_frequency_parsing(self):
         with patch("fmi_cal.scraper._fetch_html", return_value=_mock_fetch_html("IE2.html")):
-            schedules = fetch_group_schedules("https://fake", "IE2")
+            schedules = fetch_group_schedules("https://fake", "IE2", parser="html.parser")
 
         g923 = next(s for s in schedules if s.group == "923")
 
@@ -85,6 +99,52 @@ class TestFetchGroupSchedules:
         assert len(week2_entries) > 0
         assert len(every_week) > 0
 
+    def test_parse_raw_page_matches_fetch(self):
+        with patch("fmi_cal.scraper._fetch_html", return_value=_mock_fetch_html("IE2.html")):
+            fetched = fetch_group_schedules("https://fake", "IE2", parser="html.parser")
+
+        parsed = parse_group_schedules((FIXTURES / "IE2.html").read_bytes())
+        assert parsed == fetched
+
+
+class TestParserBackends:
+    @pytest.mark.parametrize("parser", PARSERS)
+    def test_backends_agree(self, parser):
+        if parser not in available_parsers():
+            pytest.skip(f"{parser} backend not installed")
+        content = (FIXTURES / "IE2.html").read_bytes()
+
+        reference = parse_group_schedules(content, "html.parser")
+        assert parse_group_schedules(content, parser) == reference
+
+    def test_stream_handles_entities_and_nested_markup(self):
+        content = (
+            "<html><body><h1>Grupa 101</h1><table>"
+            "<tr><th>Ziua</th></tr>"
+            "<tr><td>Luni</td><td>8-10</td><td></td><td>C310</td><td>101</td>"
+            "<td>Curs</td><td><a href='x'>Baze de date &amp; SQL</a></td>"
+            "<td>Prof. <b>Ion</b></td></tr>"
+            "</table></body></html>"
+        ).encode("iso-8859-2")
+
+        assert parse_group_schedules(content, "stream") == parse_group_schedules(
+            content, "html.parser"
+        )
+
+    @pytest.mark.parametrize("parser", ["html.parser", "stream"])
+    def test_repeated_strings_are_shared(self, parser):
+        schedules = parse_group_schedules((FIXTURES / "IE2.html").read_bytes(), parser)
+        entries = [e for gs in schedules for e in gs.entries]
+
+        by_value = {}
+        for e in entries:
+            for value in (e.day, e.room, e.subject, e.professor):
+                assert by_value.setdefault(value, value) is value
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            parse_group_schedules(b"", "nope")
+
 
 class TestFetchRoomLegend:
     def test_parses_all_rooms(self):
@@ -110,5 +170,41 @@ class TestFetchRoomLegend:
             fetch_room_legend("https://www.cs.ubbcluj.ro/files/orar/2025-2/tabelar")
 
         mock.assert_called_once_with(
-            "https://www.cs.ubbcluj.ro/files/orar/2025-2/sali/legenda.html"
+            "https://www.cs.ubbcluj.ro/files/orar/2025-2/sali/legenda.html", None
         )
+
+
+def _fixture_client():
+    """ThreadPoolFetcher over a fake HttpClient that serves fixture pages."""
+    def fetch(url, timeout=None):
+        if url.endswith("legenda.html"):
+            return (FIXTURES / "legenda.html").read_bytes()
+        if url.endswith("MISSING.html"):
+            raise ValueError("404")
+        return (FIXTURES / "IE2.html").read_bytes()
+
+    http = MagicMock()
+    http.fetch.side_effect = fetch
+    return ThreadPoolFetcher(http, concurrency=2)
+
+
+class TestAsyncFetch:
+    def test_fetch_all_specs(self):
+        client = _fixture_client()
+        results = asyncio.run(fetch_all_specs_async("https://fake", ["IE2", "IE3"], client))
+
+        assert list(results) == ["IE2", "IE3"]
+        expected = parse_group_schedules((FIXTURES / "IE2.html").read_bytes())
+        assert results["IE2"] == expected
+        assert results["IE3"] == expected
+
+    def test_errors_reported_per_spec(self):
+        client = _fixture_client()
+        results = asyncio.run(fetch_all_specs_async("https://fake", ["IE2", "MISSING"], client))
+
+        assert len(results["IE2"]) == 7
+        assert isinstance(results["MISSING"], ValueError)
+
+    def test_room_legend(self):
+        rooms = asyncio.run(fetch_room_legend_async("https://fake/tabelar", _fixture_client()))
+        assert set(rooms) == {"2/I", "L338", "pi"}
@@ -0,0 +1,212 @@
+import asyncio
+import base64
+import json
+from pathlib import Path
+
+import pytest
+
+from fmi_cal.academic import AcademicCalendarRepository
+from fmi_cal.calendar_gen import iter_ics
+from fmi_cal.cli import SUBCOMMANDS
+from fmi_cal.models import Specialization
+from fmi_cal.scraper import parse_group_schedules
+from fmi_cal.server import (
+    CalendarSelection,
+    CalendarServer,
+    InvalidParams,
+    LRUCache,
+    Snapshot,
+    SpecData,
+    decode_b64_payload,
+    decode_cal_params,
+    deduplicate_entries,
+    filter_by_frequency,
+    filter_group_entries,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _b64(payload, urlsafe=False):
+    raw = json.dumps(payload).encode("utf-8")
+    if urlsafe:
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+    return base64.b64encode(raw).decode("ascii")
+
+
+@pytest.fixture
+def schedules():
+    return parse_group_schedules((FIXTURES / "IE2.html").read_bytes())
+
+
+@pytest.fixture
+def index():
+    content = (FIXTURES / "academic_calendar.html").read_bytes()
+    return AcademicCalendarRepository(content=content).teaching_index("romanian", 2)
+
+
+@pytest.fixture
+def server(schedules, index):
+    spec = Specialization(name="Informatica economica", year=2, code="IE2", href="IE2.html")
+    snapshot = Snapshot(specs={"IE2": SpecData(spec, schedules, index)}, room_legend={})
+    return CalendarServer(snapshot, cache_size=2)
+
+
+class TestDecodeParams:
+    def test_single_calendar_defaults(self):
+        params = decode_cal_params({"s": "IE2"})
+        assert params.freq == "all"
+        assert params.calendars == (CalendarSelection(year_code="IE2"),)
+
+    def test_multiple_calendars(self):
+        params = decode_cal_params({
+            "cals": [{"s": "IE2", "g": 1, "sg": "2"}, {"s": "MI1", "lo": {"Baze": "1"}}],
+            "f": "sapt. 1",
+        })
+        assert params.freq == "sapt. 1"
+        assert [c.year_code for c in params.calendars] == ["IE2", "MI1"]
+        assert params.calendars[0].group_index == 1
+        assert params.calendars[0].subgroup == "2"
+        assert params.calendars[1].lab_overrides == (("Baze", "1"),)
+
+    def test_missing_spec_code(self):
+        with pytest.raises(InvalidParams):
+            decode_cal_params({"g": 0})
+
+    def test_standard_and_urlsafe_base64(self):
+        payload = {"s": "IE2", "ex": ["Ăă|||Curs"]}
+        assert decode_b64_payload(_b64(payload)) == payload
+        assert decode_b64_payload(_b64(payload, urlsafe=True)) == payload
+
+    def test_plus_decoded_as_space_in_query(self):
+        encoded = _b64({"s": "IE2", "ex": ["???>>>"]})
+        assert "+" in encoded
+        assert decode_b64_payload(encoded.replace("+", " ")) == {"s": "IE2", "ex": ["???>>>"]}
+
+    def test_invalid_base64(self):
+        with pytest.raises(InvalidParams):
+            decode_b64_payload("not base64!")
+
+
+class TestFilters:
+    def test_subgroup(self, schedules):
+        group = schedules[0]
+        entries = filter_group_entries(
+            group.entries, group.group, CalendarSelection("IE2", subgroup="1")
+        )
+        formations = {e.formation for e in entries}
+        assert "921/1" in formations
+        assert "921/2" not in formations
+        assert "IE2" in formations
+
+    def test_types_and_exclusions(self, schedules):
+        group = schedules[0]
+        course = next(e for e in group.entries if e.event_type.value == "Curs")
+        entries = filter_group_entries(
+            group.entries,
+            group.group,
+            CalendarSelection(
+                "IE2",
+                unchecked_types=("Laborator",),
+                excluded=(f"{course.subject}|||Curs",),
+            ),
+        )
+        assert all(e.event_type.value != "Laborator" for e in entries)
+        assert all(
+            not (e.subject == course.subject and e.event_type.value == "Curs")
+            for e in entries
+        )
+
+    def test_lab_override_when_all_subgroups(self, schedules):
+        group = schedules[0]
+        lab = next(e for e in group.entries if e.formation == "921/1")
+        entries = filter_group_entries(
+            group.entries,
+            group.group,
+            CalendarSelection("IE2", lab_overrides=((lab.subject, "2"),)),
+        )
+        labs = {e.formation for e in entries if e.subject == lab.subject and "/" in e.formation}
+        assert labs == {"921/2"}
+        # Other subjects keep both subgroups
+        assert {"921/1", "921/2"} <= {e.formation for e in entries}
+
+    def test_frequency_and_dedup(self, schedules, index):
+        items = [(e, index) for e in schedules[0].entries]
+        week1 = filter_by_frequency(items, "sapt. 1")
+        assert {e.frequency.value for e, _ in week1} <= {"every", "sapt. 1"}
+        assert filter_by_frequency(items, "current") is items
+        assert deduplicate_entries(items + items) == deduplicate_entries(items)
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+
+
+class TestCalendarServer:
+    def test_matches_ics_generator(self, server, schedules, index):
+        group = schedules[0]
+        response = server.handle("GET", f"/ics/{_b64({'s': 'IE2'}, urlsafe=True)}.ics", {})
+        assert response.status == 200
+        entries = filter_group_entries(group.entries, group.group, CalendarSelection("IE2"))
+        assert response.body == b"".join(iter_ics(entries, index))
+
+    def test_query_form_and_cache(self, server):
+        path = f"/ics?c={_b64({'s': 'IE2', 'g': 2})}"
+        first = server.handle("GET", path, {})
+        second = server.handle("GET", path, {})
+        assert first.status == 200
+        assert second.body is first.body
+        assert server.cache.hits == 1
+
+    def test_etag_revalidation(self, server):
+        path = f"/ics?c={_b64({'s': 'IE2'})}"
+        etag = server.handle("GET", path, {}).headers["ETag"]
+        response = server.handle("GET", path, {"if-none-match": etag})
+        assert response.status == 304
+        assert response.body == b""
+
+    def test_errors(self, server):
+        assert server.handle("GET", "/ics?c=!!!", {}).status == 400
+        assert server.handle("GET", f"/ics?c={_b64({'s': 'IE2', 'g': 99})}", {}).status == 400
+        assert server.handle("GET", f"/ics?c={_b64({'s': 'XX9'})}", {}).status == 404
+        assert server.handle("GET", "/ics/abcdef0123.ics", {}).status == 404
+        assert server.handle("GET", "/other", {}).status == 404
+        assert server.handle("POST", "/ics", {}).status == 405
+
+    def test_replace_snapshot_clears_cache(self, server):
+        server.handle("GET", f"/ics?c={_b64({'s': 'IE2'})}", {})
+        server.replace_snapshot(server.snapshot)
+        assert len(server.cache) == 0
+
+    def test_serves_http(self, server):
+        async def run():
+            tcp = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+            port = tcp.sockets[0].getsockname()[1]
+            async with tcp:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                path = f"/ics/{_b64({'s': 'IE2'}, urlsafe=True)}.ics"
+                writer.write(
+                    f"GET {path} HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n".encode()
+                )
+                await writer.drain()
+                data = await reader.read()
+                writer.close()
+            return data
+
+        data = asyncio.run(run())
+        head, _, body = data.partition(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 200 OK")
+        assert b"ETag: " in head
+        assert body.startswith(b"BEGIN:VCALENDAR")
+
+
+def test_serve_is_a_cli_subcommand():
+    assert SUBCOMMANDS["serve"] == ".server"
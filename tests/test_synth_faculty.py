@@ -0,0 +1,80 @@
+import importlib.util
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from fmi_cal.academic import ACADEMIC_CALENDAR_URL, get_study_line, parse_academic_calendars
+from fmi_cal.http_client import HttpClient
+from fmi_cal.models import EventType
+from fmi_cal.scraper import (
+    available_parsers,
+    fetch_specializations,
+    parse_group_schedules,
+    parse_room_legend,
+    room_legend_url,
+    schedule_page_url,
+)
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "synth_faculty.py"
+_spec = importlib.util.spec_from_file_location("synth_faculty", SCRIPT)
+synth = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(synth)
+
+BASE = "https://www.cs.ubbcluj.ro/files/orar/2025-2/tabelar"
+SHAPE = synth.FacultyShape(programs=5, years=2, groups=3, entries=10, rooms=7, holidays=2)
+
+
+@pytest.fixture(scope="module")
+def pages():
+    return synth.build_faculty(2025, 2, SHAPE)
+
+
+class TestSynthFaculty:
+    def test_index_lists_every_spec(self, pages):
+        client = MagicMock()
+        client.fetch.return_value = pages[f"{BASE}/index.html"]
+        specs = fetch_specializations(BASE, client)
+        assert len(specs) == SHAPE.spec_count
+        assert {s.year for s in specs} == {1, 2}
+        assert {get_study_line(s.code, s.name) for s in specs} == {"romanian", "hungarian", "german"}
+        for spec in specs:
+            assert schedule_page_url(BASE, spec.code) in pages
+
+    @pytest.mark.parametrize("parser", available_parsers())
+    def test_schedule_pages_parse(self, pages, parser):
+        schedules = parse_group_schedules(pages[schedule_page_url(BASE, "SA1")], parser)
+        assert len(schedules) == SHAPE.groups
+        for gs in schedules:
+            assert len(gs.entries) == SHAPE.entries
+            courses = [e for e in gs.entries if e.event_type is EventType.CURS]
+            assert courses and all(e.formation == "SA1" for e in courses)
+            labs = {e.formation for e in gs.entries if e.event_type is EventType.LABORATOR}
+            assert labs == {f"{gs.group}/1", f"{gs.group}/2"}
+
+    def test_academic_calendar(self, pages):
+        calendars = parse_academic_calendars(pages[ACADEMIC_CALENDAR_URL])
+        assert set(calendars) >= {("romanian", 2), ("hungarian", 2)}
+        spring = calendars[("romanian", 2)]
+        assert len(spring.teaching_periods) == 2
+        assert len(spring.holidays) == SHAPE.holidays
+        assert all(
+            any(p.start <= d <= p.end for p in spring.teaching_periods) for d in spring.holidays
+        )
+
+    def test_room_legend(self, pages):
+        assert len(parse_room_legend(pages[room_legend_url(BASE)])) == SHAPE.rooms
+
+    def test_deterministic(self, pages):
+        assert synth.build_faculty(2025, 2, SHAPE) == pages
+        assert synth.build_faculty(2025, 2, SHAPE, seed=1) != pages
+
+    def test_scale_multiplies_programs(self):
+        specs = synth.make_specs(synth.FacultyShape(programs=2, years=3, scale=10))
+        assert len(specs) == 60
+        assert len({s.code for s in specs}) == 60
+
+    def test_seeded_cache_replays_offline(self, pages, tmp_path):
+        synth.seed_cache(pages, tmp_path)
+        with HttpClient(cache_dir=tmp_path, offline=True) as client:
+            assert client.fetch(ACADEMIC_CALENDAR_URL) == pages[ACADEMIC_CALENDAR_URL]
@@ -0,0 +1,105 @@
+import copy
+import pickle
+from pathlib import Path
+
+import pytest
+
+from fmi_cal.academic import AcademicCalendarRepository, build_teaching_index
+from fmi_cal.calendar_gen import filter_entries_for_student
+from fmi_cal.models import EventType, Frequency, GroupSchedule, ScheduleEntry
+from fmi_cal.scraper import available_parsers, parse_group_schedules, parse_spec_table
+from fmi_cal.table import SpecTable
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(scope="module")
+def ie2_html():
+    return (FIXTURES / "IE2.html").read_bytes()
+
+
+def _entry(formation, subject="Subj", day="Luni"):
+    return ScheduleEntry(
+        day=day, start_hour=8, end_hour=10, frequency=Frequency.EVERY_WEEK,
+        room="L1", formation=formation, event_type=EventType.CURS,
+        subject=subject, professor="Prof",
+    )
+
+
+class TestParseSpecTable:
+    @pytest.mark.parametrize("parser", available_parsers())
+    def test_matches_group_schedules(self, ie2_html, parser):
+        table = parse_spec_table(ie2_html, parser)
+
+        assert table.to_schedules() == parse_group_schedules(ie2_html, parser)
+        assert len(table) == sum(len(gs.entries) for gs in table.to_schedules())
+
+    def test_strings_are_stored_once(self, ie2_html):
+        table = parse_spec_table(ie2_html)
+
+        assert len(set(table.strings)) == len(table.strings)
+        assert table.day.typecode == "H"
+
+
+class TestStudentRows:
+    def test_match_filter_entries_for_student(self, ie2_html):
+        table = parse_spec_table(ie2_html)
+        for group_id, gs in enumerate(parse_group_schedules(ie2_html)):
+            for subgroup in ("1", "2", None):
+                rows = table.student_rows(group_id, subgroup)
+                assert table.entries(rows) == filter_entries_for_student(gs, gs.group, subgroup)
+
+    def test_rows_are_in_page_order_across_groups(self):
+        table = SpecTable.from_schedules([
+            GroupSchedule("921", [_entry("IE2"), _entry("921/2"), _entry("921/1")]),
+            GroupSchedule("922", [_entry("922/1"), _entry("IE2"), _entry("922")]),
+        ])
+
+        assert table.student_rows(0, "1") == [0, 2]
+        assert table.student_rows(1, "1") == [3, 4, 5]
+        assert table.student_rows(1, "2") == [4, 5]
+
+    def test_entries_are_built_once(self):
+        table = SpecTable.from_schedules([GroupSchedule("921", [_entry("IE2")])])
+
+        assert table.entries([0])[0] is table.entry(0)
+
+
+class TestDatesForRows:
+    def test_match_teaching_index(self, ie2_html):
+        calendar = AcademicCalendarRepository(
+            content=(FIXTURES / "academic_calendar.html").read_bytes()
+        ).get("romanian", 2)
+        index = build_teaching_index(calendar)
+        table = parse_spec_table(ie2_html)
+
+        dates = table.dates_for_rows(range(len(table)), index)
+
+        assert dates == [index.dates_for(table.entry(row)) for row in range(len(table))]
+        assert any(dates)
+
+    def test_unknown_day_has_no_dates(self):
+        table = SpecTable.from_schedules([GroupSchedule("921", [_entry("IE2", day="?")])])
+        calendar = AcademicCalendarRepository(
+            content=(FIXTURES / "academic_calendar.html").read_bytes()
+        ).get("romanian", 2)
+
+        assert table.dates_for_rows([0], build_teaching_index(calendar)) == [()]
+
+
+class TestPickling:
+    def test_round_trip_drops_memos(self, ie2_html):
+        table = parse_spec_table(ie2_html)
+        table.student_rows(0, "1")
+
+        clone = pickle.loads(pickle.dumps(table))
+
+        assert clone.to_schedules() == table.to_schedules()
+        assert clone.student_rows(0, "1") == table.student_rows(0, "1")
+        assert len(pickle.dumps(table)) < len(pickle.dumps(parse_group_schedules(ie2_html)))
+
+    def test_copy_has_fresh_memos(self):
+        table = SpecTable.from_schedules([GroupSchedule("921", [_entry("IE2")])])
+        entry = table.entry(0)
+
+        assert copy.copy(table).entry(0) is not entry
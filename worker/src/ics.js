@@ -64,18 +64,14 @@ function icsFold(line) {
   return parts.join('\r\n ');
 }
 
-export function generateICS(entries, rooms) {
+// DTSTAMP when the schedule data carries none. Never the wall clock, so the
+// same input always produces the same bytes (and the same ETag).
+export const DEFAULT_DTSTAMP = '19700101T000000Z';
+
+// dtstamp: the "dtstamp" field of the spec JSON (the schedule page's
+// Last-Modified time, see source_dtstamp in src/fmi_cal/ics.py)
+export function generateICS(entries, rooms, dtstamp = DEFAULT_DTSTAMP) {
   const PREFIX = { Curs: '[C]', Seminar: '[S]', Laborator: '[L]' };
-  const now = new Date();
-  const dtstamp =
-    now.getUTCFullYear().toString() +
-    String(now.getUTCMonth() + 1).padStart(2, '0') +
-    String(now.getUTCDate()).padStart(2, '0') +
-    'T' +
-    String(now.getUTCHours()).padStart(2, '0') +
-    String(now.getUTCMinutes()).padStart(2, '0') +
-    String(now.getUTCSeconds()).padStart(2, '0') +
-    'Z';
   const lines = [
     'BEGIN:VCALENDAR',
     'VERSION:2.0',
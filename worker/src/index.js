@@ -1,7 +1,7 @@
 // worker/src/index.js
 import { decodeCalParams } from './decode.js';
 import { filterGroupEntries, filterByFrequency, deduplicateEntries } from './filter.js';
-import { generateICS } from './ics.js';
+import { generateICS, DEFAULT_DTSTAMP } from './ics.js';
 
 const CORS_HEADERS = {
   'Access-Control-Allow-Origin': '*',
@@ -22,12 +22,29 @@ async function fetchJSON(url) {
   return res.json();
 }
 
+async function sha256Hex(text) {
+  const data = new TextEncoder().encode(text);
+  const buf = await crypto.subtle.digest('SHA-256', data);
+  return [...new Uint8Array(buf)].map((b) => b.toString(16).padStart(2, '0')).join('');
+}
+
 // SHA-256 hash → first 10 hex chars (40 bits of entropy)
 async function hashConfig(json) {
-  const data = new TextEncoder().encode(json);
-  const buf = await crypto.subtle.digest('SHA-256', data);
-  const hex = [...new Uint8Array(buf)].map((b) => b.toString(16).padStart(2, '0')).join('');
-  return hex.slice(0, 10);
+  return (await sha256Hex(json)).slice(0, 10);
+}
+
+// Strong ETag: generation is deterministic, so equal bodies mean equal input
+async function etagFor(body) {
+  return `"${(await sha256Hex(body)).slice(0, 32)}"`;
+}
+
+function ifNoneMatch(request, etag) {
+  const header = request.headers.get('If-None-Match');
+  if (!header) return false;
+  return header
+    .split(',')
+    .map((tag) => tag.trim().replace(/^W\//, ''))
+    .some((tag) => tag === etag || tag === '*');
 }
 
 async function handleConfig(request, env) {
@@ -126,6 +143,7 @@ async function handleICS(request, env) {
     const rooms = (await fetchJSON(`${ORIGIN}/data/rooms.json`)) || {};
 
     let allEntries = [];
+    let dtstamp = DEFAULT_DTSTAMP;
 
     for (const cal of params.calendars) {
       const specData = await fetchJSON(`${ORIGIN}/data/${cal.yearCode}.json`);
@@ -140,6 +158,9 @@ async function handleICS(request, env) {
         );
       }
 
+      // Same-format UTC stamps sort lexicographically; use the newest source
+      if (specData.dtstamp && specData.dtstamp > dtstamp) dtstamp = specData.dtstamp;
+
       const group = specData.groups[cal.groupIndex];
       const filtered = filterGroupEntries(group.entries, group.name, {
         subgroup: cal.subgroup,
@@ -154,9 +175,21 @@ async function handleICS(request, env) {
     allEntries = deduplicateEntries(allEntries);
     allEntries = filterByFrequency(allEntries, params.freq);
 
-    const ics = generateICS(allEntries, rooms);
+    const ics = generateICS(allEntries, rooms, dtstamp);
+    const etag = await etagFor(ics);
+
+    if (ifNoneMatch(request, etag)) {
+      return new Response(null, {
+        status: 304,
+        headers: {
+          ETag: etag,
+          'Cache-Control': ICS_HEADERS['Cache-Control'],
+          'Access-Control-Allow-Origin': '*',
+        },
+      });
+    }
 
-    return new Response(ics, { status: 200, headers: ICS_HEADERS });
+    return new Response(ics, { status: 200, headers: { ...ICS_HEADERS, ETag: etag } });
   } catch (e) {
     const empty = [
       'BEGIN:VCALENDAR',
@@ -1,6 +1,6 @@
 // worker/test/ics.test.js
 import { describe, it, expect } from 'vitest';
-import { generateICS } from '../src/ics.js';
+import { generateICS, DEFAULT_DTSTAMP } from '../src/ics.js';
 
 describe('generateICS', () => {
   it('returns valid calendar with events', () => {
@@ -97,4 +97,20 @@ describe('generateICS', () => {
       expect(encoder.encode(line).length).toBeLessThanOrEqual(75);
     }
   });
+
+  it('uses the given DTSTAMP and is byte-stable', () => {
+    const entries = [
+      { type: 'Curs', subject: 'Algebra', startHour: 8, endHour: 10, room: '', professor: '', dates: ['2026-02-23'] },
+    ];
+    const ics = generateICS(entries, {}, '20260223T000000Z');
+    expect(ics).toContain('DTSTAMP:20260223T000000Z');
+    expect(generateICS(entries, {}, '20260223T000000Z')).toBe(ics);
+  });
+
+  it('falls back to a fixed DTSTAMP, not the current time', () => {
+    const entries = [
+      { type: 'Curs', subject: 'Algebra', startHour: 8, endHour: 10, room: '', professor: '', dates: ['2026-02-23'] },
+    ];
+    expect(generateICS(entries, {})).toContain(`DTSTAMP:${DEFAULT_DTSTAMP}`);
+  });
 });
@@ -32,7 +32,7 @@ const ORIGIN = 'https://orar-fmi.rdobre.ro';
 
 const MOCK_DATA = {
   [`${ORIGIN}/data/M1.json`]: {
-    code: 'M1', name: 'Matematica', year: 1,
+    code: 'M1', name: 'Matematica', year: 1, dtstamp: '20260223T000000Z',
     groups: [{
       name: '111', hasSubgroups: true,
       entries: [
@@ -76,6 +76,48 @@ describe('Worker fetch handler', () => {
     expect(body).not.toContain('L002');
   });
 
+  it('stamps events from the schedule data and sets a strong ETag', async () => {
+    const c = encode({ s: 'M1', g: 0, sg: '1' });
+    const first = await worker.fetch(new Request(`https://cal.rdobre.ro/ics?c=${c}`), {});
+    const second = await worker.fetch(new Request(`https://cal.rdobre.ro/ics?c=${c}`), {});
+    const body = await first.text();
+    expect(body).toContain('DTSTAMP:20260223T000000Z');
+    expect(await second.text()).toBe(body);
+    const etag = first.headers.get('ETag');
+    expect(etag).toMatch(/^"[0-9a-f]{32}"$/);
+    expect(second.headers.get('ETag')).toBe(etag);
+  });
+
+  it('stamps a combined calendar with the newest schedule dtstamp', async () => {
+    globalThis.fetch = mockFetch({
+      ...MOCK_DATA,
+      [`${ORIGIN}/data/M2.json`]: {
+        ...MOCK_DATA[`${ORIGIN}/data/M1.json`], code: 'M2', dtstamp: '20260302T091500Z',
+      },
+    });
+    const c = encode({ cals: [{ s: 'M1', g: 0 }, { s: 'M2', g: 0 }] });
+    const res = await worker.fetch(new Request(`https://cal.rdobre.ro/ics?c=${c}`), {});
+    const body = await res.text();
+    expect(body).toContain('DTSTAMP:20260302T091500Z');
+    expect(body).not.toContain('DTSTAMP:20260223T000000Z');
+  });
+
+  it('returns 304 when If-None-Match matches', async () => {
+    const c = encode({ s: 'M1', g: 0, sg: '1' });
+    const url = `https://cal.rdobre.ro/ics?c=${c}`;
+    const etag = (await worker.fetch(new Request(url), {})).headers.get('ETag');
+
+    const res = await worker.fetch(new Request(url, { headers: { 'If-None-Match': etag } }), {});
+    expect(res.status).toBe(304);
+    expect(res.headers.get('ETag')).toBe(etag);
+    expect(await res.text()).toBe('');
+
+    const stale = await worker.fetch(
+      new Request(url, { headers: { 'If-None-Match': '"0000"' } }), {},
+    );
+    expect(stale.status).toBe(200);
+  });
+
   it('returns 502 when origin fetch fails', async () => {
     globalThis.fetch = mockFetch({});
     const c = encode({ s: 'INVALID', g: 0 });